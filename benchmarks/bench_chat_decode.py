@@ -0,0 +1,60 @@
+"""Compare decoding a chat page with the dataclasses_json models and the `__slots__` models.
+
+Run from the repository root: `python benchmarks/bench_chat_decode.py [messages]`.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, "src")
+
+from pyxplora_api.model import ChatsNew, FastChatsNew  # noqa: E402
+
+
+def make_page(messages: int) -> dict:
+    user = {"id": "u1", "userId": "1001", "name": "Parent", "phoneNumber": "0123456789"}
+    return {
+        "list": [
+            {
+                "id": f"id-{i}",
+                "msgId": f"msg-{i}",
+                "readFlag": "1",
+                "type": "TEXT",
+                "sender": user,
+                "receiver": {**user, "id": "w1", "name": "Watch"},
+                "data": {"tm": str(1700000000 + i), "text": f"message {i}", "emoticon_id": 1001, "delete_flag": 0},
+                "create": 1700000000 + i,
+            }
+            for i in range(messages)
+        ]
+    }
+
+
+def measure(name: str, decode, page: dict, rounds: int = 20) -> None:
+    messages = len(page["list"])
+    decode(page)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        decode(page)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = decode(page)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"{name:<24} {messages * rounds / elapsed:>12,.0f} chats/s {size / messages:>10,.0f} bytes/chat")
+
+
+def main() -> None:
+    page = make_page(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
+    measure("ChatsNew.from_dict", ChatsNew.from_dict, page)
+    measure("FastChatsNew.from_dict", FastChatsNew.from_dict, page)
+    measure("ChatsNew round trip", lambda raw: ChatsNew.from_dict(ChatsNew.from_dict(raw).to_dict()), page)
+    measure("FastChatsNew round trip", lambda raw: FastChatsNew.from_dict(raw).to_dict(), page)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Encode and decode cost of the request body of every operation in `gql_queries.py`, per JSON codec.
+
+Run from the repository root: `python benchmarks/bench_codec.py [rounds]`.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+
+sys.path.insert(0, "src")
+sys.path.insert(0, "benchmarks")
+
+from bench_chat_decode import make_page  # noqa: E402
+
+from pyxplora_api import gql_queries as gq  # noqa: E402
+from pyxplora_api.codec import CODEC_BACKENDS, _load_backend  # noqa: E402
+
+
+def cost(fn, payload, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(payload)
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    codecs = [codec for codec in map(_load_backend, CODEC_BACKENDS) if codec is not None]
+    bodies = {
+        f"{catalog}.{name}": {"query": query, "variables": {"uid": "wuid-1"}, "operationName": name}
+        for catalog in ("WATCH_Q", "UTILS_Q")
+        for name, query in getattr(gq, catalog).items()
+    }
+    bodies["response chats (200 messages)"] = {"data": {"chatsNew": make_page(200)}}
+
+    print(f"{'operation':<36} {'bytes':>8} " + " ".join(f"{codec.name + ' enc/dec us':>22}" for codec in codecs))
+    totals = {codec.name: 0.0 for codec in codecs}
+    for name, body in bodies.items():
+        columns = []
+        for codec in codecs:
+            encoded = codec.dumps(body)
+            encode, decode = cost(codec.dumps, body, rounds), cost(codec.loads, encoded, rounds)
+            totals[codec.name] += encode + decode
+            columns.append(f"{encode:>10.1f} /{decode:>10.1f}")
+        print(f"{name[:36]:<36} {len(encoded):>8} " + " ".join(columns))
+    print("total us: " + ", ".join(f"{name} {total:,.0f}" for name, total in totals.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Single-flight gate for logins and token refreshes, with a cooldown after failures."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from time import monotonic
+from typing import Any, TypeVar
+
+from .exception_classes import LoginCooldownError
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_LOGIN_COOLDOWN = 5.0
+DEFAULT_MAX_LOGIN_COOLDOWN = 300.0
+
+
+class AuthGate:
+    """Let exactly one login or refresh of an account run at a time.
+
+    Callers arriving while an attempt runs await its result instead of starting their own. After a failed attempt
+    (an exception or a falsy result) new attempts are refused with `LoginCooldownError` for `cooldown` seconds,
+    doubling with every consecutive failure up to `max_cooldown`.
+
+    Args:
+        cooldown (float, optional): Seconds to wait after the first failure. Defaults to DEFAULT_LOGIN_COOLDOWN.
+        max_cooldown (float, optional): Upper bound of the cooldown. Defaults to DEFAULT_MAX_LOGIN_COOLDOWN.
+
+    Attributes:
+        attempts (int): Number of attempts started.
+        successes (int): Number of attempts that succeeded.
+        failures (int): Number of attempts that failed.
+        coalesced (int): Number of callers that joined a running attempt.
+        refused (int): Number of callers refused during a cooldown.
+    """
+
+    def __init__(self, cooldown: float = DEFAULT_LOGIN_COOLDOWN, max_cooldown: float = DEFAULT_MAX_LOGIN_COOLDOWN) -> None:
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self._attempt: asyncio.Future[Any] | None = None
+        self._consecutive_failures = 0
+        self._blocked_until = 0.0
+        self.attempts = 0
+        self.successes = 0
+        self.failures = 0
+        self.coalesced = 0
+        self.refused = 0
+
+    def retry_after(self) -> float:
+        """Return the seconds left of the cooldown, 0 if attempts are allowed."""
+        return max(0.0, self._blocked_until - monotonic())
+
+    def reset(self) -> None:
+        """End the cooldown, e.g. after the credentials were changed."""
+        self._consecutive_failures = 0
+        self._blocked_until = 0.0
+
+    async def run(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn` unless an attempt is already running, then return the result of that attempt.
+
+        Raises:
+            LoginCooldownError: If the previous attempt failed less than the cooldown ago.
+        """
+        if self._attempt is not None:
+            self.coalesced += 1
+            return await asyncio.shield(self._attempt)
+        retry_after = self.retry_after()
+        if retry_after:
+            self.refused += 1
+            raise LoginCooldownError(retry_after)
+        self.attempts += 1
+        self._attempt = asyncio.ensure_future(fn())
+        self._attempt.add_done_callback(self._finished)
+        return await asyncio.shield(self._attempt)
+
+    def _finished(self, attempt: asyncio.Future[Any]) -> None:
+        if self._attempt is attempt:
+            self._attempt = None
+        if not attempt.cancelled() and attempt.exception() is None and attempt.result():
+            self.successes += 1
+            self.reset()
+            return
+        self.failures += 1
+        self._consecutive_failures += 1
+        delay = min(self.max_cooldown, self.cooldown * 2 ** (self._consecutive_failures - 1))
+        self._blocked_until = monotonic() + delay
+        _LOGGER.debug("Authentication failed %s times in a row, pausing for %.0fs", self._consecutive_failures, delay)
@@ -0,0 +1,221 @@
+"""TTL response cache for GraphQL queries with per-operation policies."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+import json
+import re
+from time import monotonic
+from typing import Any
+
+# Seconds a successful response of an operation stays valid, operations not listed use `default_ttl`.
+DEFAULT_CACHE_TTLS: dict[str, float] = {
+    "Countries": 86400,
+    "SafeZoneGroups": 86400,
+    "WatchGroups": 86400,
+    "GetAppVersion": 3600,
+    "Avatars": 3600,
+    "Watches": 3600,
+    "CheckWatchByQrCode": 3600,
+    "WatchLastLocate": 0,
+    "AskWatchLocate": 0,
+}
+
+# Reads of an entity that become stale when the mutation succeeds.
+MUTATION_INVALIDATIONS: dict[str, tuple[str, ...]] = {
+    "AddAlarm": ("Alarms",),
+    "ModifyAlarm": ("Alarms",),
+    "RemoveAlarm": ("Alarms",),
+    "AddSilentTime": ("SlientTimes",),
+    "ModifySilentTime": ("SlientTimes",),
+    "RemoveSilentTime": ("SlientTimes",),
+    "SetEnableSlientTime": ("SlientTimes",),
+    "AddSafeZone": ("SafeZones",),
+    "modifySafeZone": ("SafeZones",),
+    "RemoveSafeZone": ("SafeZones",),
+    "AddContact": ("Contacts",),
+    "ModifyContact": ("Contacts",),
+    "RemoveContact": ("Contacts",),
+    "AddWiFi": ("GetWifis",),
+    "ModifyWiFi": ("GetWifis",),
+    "RemoveWiFi": ("GetWifis",),
+    "SetWatchInfo": ("Watches", "WatchesDynamic"),
+    "UpdateWatch": ("Watches", "WatchesDynamic"),
+    "RemoveWatch": ("Watches", "WatchesDynamic"),
+    "ResetWatch": ("Watches", "WatchesDynamic"),
+    "AddWatchGroup": ("WatchGroups",),
+    "ModifyWatchGroup": ("WatchGroups",),
+    "RemoveWatchGroup": ("WatchGroups",),
+    "AddAvatar": ("Avatars",),
+    "ModifyAvatar": ("Avatars",),
+    "RemoveAvatar": ("Avatars",),
+    "SendChatText": ("Chats", "UnReadChatMsgCount"),
+    "DeleteChatMessage": ("Chats", "UnReadChatMsgCount"),
+    "setReadChatMsg": ("Chats", "UnReadChatMsgCount"),
+    "AddStep": ("UserSteps",),
+}
+
+# Reads answering the same for every account, one cache can serve all accounts of a process.
+SHARED_OPERATIONS = frozenset({"Countries", "WatchGroups", "GetAppVersion"})
+
+DEFAULT_CACHE_MAX_ENTRIES = 1024
+DEFAULT_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+_OPERATION_RE = re.compile(r"^\s*(query|mutation|subscription)\s+(\w+)")
+_bypass: ContextVar[bool] = ContextVar("pyxplora_cache_bypass", default=False)
+
+
+def operation_name_of(query: str) -> str:
+    """Return the operation name declared in a GraphQL document, or an empty string."""
+    match = _OPERATION_RE.match(query or "")
+    return match.group(2) if match else ""
+
+
+def is_query(query: str) -> bool:
+    """Return True if the GraphQL document is a query (and not a mutation or subscription)."""
+    return (query or "").lstrip().startswith(("query", "{"))
+
+
+def is_successful(data: dict[str, Any] | None) -> bool:
+    """Return True for a response carrying data and no errors."""
+    return bool(data) and "errors" not in data and bool(data.get("data"))
+
+
+@contextmanager
+def cache_bypass() -> Iterator[None]:
+    """Skip cache reads inside the block; fresh responses are still stored.
+
+    The flag is a context variable, so concurrent tasks outside the block keep using the cache.
+    """
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+class ResponseCache:
+    """In-memory LRU cache of GraphQL responses with a time-to-live per operation.
+
+    Subclass and override `get`, `set` and `invalidate` to plug in another storage.
+
+    Args:
+        ttls (dict[str, float], optional): TTL in seconds per operation name. Defaults to DEFAULT_CACHE_TTLS.
+        default_ttl (float, optional): TTL for operations not listed in `ttls`, 0 disables caching. Defaults to 0.
+        max_entries (int, optional): Maximum number of cached responses.
+        max_bytes (int, optional): Upper bound of the estimated size of all cached responses.
+
+    Attributes:
+        hits (int): Number of cache hits.
+        misses (int): Number of cache misses of cacheable operations.
+        evictions (int): Number of entries evicted to honour the memory bounds.
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, float] | None = None,
+        default_ttl: float = 0,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+    ) -> None:
+        self.ttls = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = 0
+        # key -> (expires_at, size, data)
+        self._entries: OrderedDict[tuple[str, str], tuple[float, int, dict[str, Any]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """Return the estimated size of all cached responses in bytes."""
+        return self._size
+
+    def ttl(self, operation_name: str) -> float:
+        """Return the TTL in seconds of an operation."""
+        return self.ttls.get(operation_name, self.default_ttl)
+
+    @staticmethod
+    def key(operation_name: str, variables: dict[str, Any] | None) -> tuple[str, str]:
+        return operation_name, json.dumps(variables or {}, sort_keys=True, default=str)
+
+    def get(self, operation_name: str, variables: dict[str, Any] | None = None) -> dict[str, Any] | None:
+        """Return the cached response of an operation, or None if missing, expired or bypassed.
+
+        The returned response is shared with the cache and must be treated as read-only.
+        """
+        if _bypass.get() or self.ttl(operation_name) <= 0:
+            return None
+        key = self.key(operation_name, variables)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] <= monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def set(self, operation_name: str, variables: dict[str, Any] | None, data: dict[str, Any]) -> None:
+        """Store a successful response if the operation is cacheable."""
+        ttl = self.ttl(operation_name)
+        if ttl <= 0 or not data or data.get("errors") or data.get("data") is None:
+            return
+        size = len(json.dumps(data, default=str))
+        if size > self.max_bytes:
+            return
+        key = self.key(operation_name, variables)
+        self._remove(key)
+        self._entries[key] = (monotonic() + ttl, size, data)
+        self._size += size
+        while self._entries and (len(self._entries) > self.max_entries or self._size > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, operation_name: str | None = None, wuid: str | None = None) -> int:
+        """Drop cached responses.
+
+        Args:
+            operation_name (str, optional): Only drop responses of this operation.
+            wuid (str, optional): Only drop responses whose `uid` variable is this watch user id.
+
+        Returns:
+            int: The number of dropped responses.
+        """
+        dropped = 0
+        for key in list(self._entries):
+            if operation_name is not None and key[0] != operation_name:
+                continue
+            if wuid is not None and json.loads(key[1]).get("uid") != wuid:
+                continue
+            self._remove(key)
+            dropped += 1
+        return dropped
+
+    def invalidate_for_mutation(self, operation_name: str, variables: dict[str, Any] | None = None) -> int:
+        """Drop the cached reads of the entity touched by a mutation.
+
+        Reads are limited to the mutated watch if the mutation has an `uid` variable.
+        """
+        wuid = (variables or {}).get("uid")
+        return sum(self.invalidate(read, wuid) for read in MUTATION_INVALIDATIONS.get(operation_name, ()))
+
+    def clear(self) -> None:
+        """Drop all cached responses."""
+        self._entries.clear()
+        self._size = 0
+
+    def _remove(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[1]
@@ -0,0 +1,222 @@
+"""Circuit breaker failing requests fast while the endpoint is degraded."""
+
+from __future__ import annotations
+
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable, Hashable
+from enum import Enum
+import logging
+import threading
+from time import monotonic
+from typing import Any, TypeVar
+
+from .exception_classes import CircuitOpenError
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_FAILURE_RATE = 0.5
+DEFAULT_SLOW_CALL_DURATION = 10.0
+DEFAULT_WINDOW_SIZE = 20
+DEFAULT_MIN_CALLS = 5
+DEFAULT_OPEN_TIMEOUT = 30.0
+DEFAULT_HALF_OPEN_CALLS = 1
+DEFAULT_LAST_GOOD_MAX_ENTRIES = 512
+
+
+class CircuitState(Enum):
+    """The states of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Stop sending requests for a while once too many of the recent ones failed or were slow.
+
+    The outcome of the last `window_size` calls is kept. When at least `min_calls` of them were made and the share
+    of failed calls (raised, judged a failure, or slower than `slow_call_duration`) reaches `failure_rate` the
+    circuit opens: calls fail at once with `CircuitOpenError` for `open_timeout` seconds. After that up to
+    `half_open_calls` probe calls are let through, the circuit closes when one succeeds and opens again when one fails.
+
+    Args:
+        failure_rate (float, optional): Share of failed calls opening the circuit. Defaults to DEFAULT_FAILURE_RATE.
+        slow_call_duration (float, optional): Seconds after which a call counts as failed. Defaults to
+            DEFAULT_SLOW_CALL_DURATION.
+        window_size (int, optional): Number of recent calls judged. Defaults to DEFAULT_WINDOW_SIZE.
+        min_calls (int, optional): Calls needed before the circuit may open. Defaults to DEFAULT_MIN_CALLS.
+        open_timeout (float, optional): Seconds the circuit stays open. Defaults to DEFAULT_OPEN_TIMEOUT.
+        half_open_calls (int, optional): Probe calls while half open. Defaults to DEFAULT_HALF_OPEN_CALLS.
+
+    Attributes:
+        opened (int): Number of times the circuit opened.
+        rejected (int): Number of calls failed fast while the circuit was open.
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        slow_call_duration: float = DEFAULT_SLOW_CALL_DURATION,
+        window_size: int = DEFAULT_WINDOW_SIZE,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        open_timeout: float = DEFAULT_OPEN_TIMEOUT,
+        half_open_calls: int = DEFAULT_HALF_OPEN_CALLS,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.min_calls = max(1, min_calls)
+        self.open_timeout = open_timeout
+        self.half_open_calls = max(1, half_open_calls)
+        self._outcomes: deque[bool] = deque(maxlen=max(1, window_size))
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        # the sync client may be used from several threads
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """The current state, an open circuit reports half open once its timeout passed."""
+        if self._state is CircuitState.OPEN and monotonic() - self._opened_at >= self.open_timeout:
+            return CircuitState.HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """Return the seconds until an open circuit lets a probe call through."""
+        if self._state is not CircuitState.OPEN:
+            return 0.0
+        return max(self.open_timeout - (monotonic() - self._opened_at), 0.0)
+
+    def before_call(self) -> None:
+        """Admit a call.
+
+        Raises:
+            CircuitOpenError: If the circuit is open or all probes of the half open circuit are in flight.
+        """
+        with self._lock:
+            if self._state is CircuitState.OPEN:
+                if monotonic() - self._opened_at < self.open_timeout:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.retry_after())
+                self._state, self._probes = CircuitState.HALF_OPEN, 0
+            if self._state is CircuitState.HALF_OPEN:
+                if self._probes >= self.half_open_calls:
+                    self.rejected += 1
+                    raise CircuitOpenError(0.0)
+                self._probes += 1
+
+    def record(self, success: bool, duration: float = 0.0) -> None:
+        """Record the outcome of an admitted call."""
+        failed = not success or duration >= self.slow_call_duration
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    _LOGGER.debug("Circuit closed")
+                    self._state = CircuitState.CLOSED
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if (
+                self._state is CircuitState.CLOSED
+                and len(self._outcomes) >= self.min_calls
+                and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate
+            ):
+                self._open()
+
+    def _release(self) -> None:
+        with self._lock:
+            if self._state is CircuitState.HALF_OPEN and self._probes:
+                self._probes -= 1
+
+    def _open(self) -> None:
+        _LOGGER.debug("Circuit opened for %.0fs", self.open_timeout)
+        self._state = CircuitState.OPEN
+        self._opened_at = monotonic()
+        self._outcomes.clear()
+        self.opened += 1
+
+    def call(self, fn: Callable[[], T], is_failure: Callable[[T], bool] | None = None) -> T:
+        """Call `fn` through the circuit, see `call_async`."""
+        self.before_call()
+        start = monotonic()
+        try:
+            result = fn()
+        except Exception:
+            self.record(False, monotonic() - start)
+            raise
+        except BaseException:
+            # cancelled, the call tells nothing about the endpoint
+            self._release()
+            raise
+        self.record(not (is_failure is not None and is_failure(result)), monotonic() - start)
+        return result
+
+    async def call_async(self, fn: Callable[[], Awaitable[T]], is_failure: Callable[[T], bool] | None = None) -> T:
+        """Await `fn()` through the circuit.
+
+        Args:
+            fn (Callable): The call.
+            is_failure (Callable, optional): Returns True for results counting as failed call.
+
+        Returns:
+            T: The result of `fn`.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, `fn` is not called then.
+        """
+        self.before_call()
+        start = monotonic()
+        try:
+            result = await fn()
+        except Exception:
+            self.record(False, monotonic() - start)
+            raise
+        except BaseException:
+            # cancelled, the call tells nothing about the endpoint
+            self._release()
+            raise
+        self.record(not (is_failure is not None and is_failure(result)), monotonic() - start)
+        return result
+
+
+class LastKnownGood:
+    """The last successful response per request, served while the circuit is open.
+
+    Args:
+        max_entries (int, optional): Responses kept, the least recently used are dropped. Defaults to
+            DEFAULT_LAST_GOOD_MAX_ENTRIES.
+
+    Attributes:
+        served (int): Number of responses served in place of a request.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_LAST_GOOD_MAX_ENTRIES) -> None:
+        self.max_entries = max(1, max_entries)
+        self._entries: OrderedDict[Hashable, dict[str, Any]] = OrderedDict()
+        self.served = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def set(self, key: Hashable, data: dict[str, Any]) -> None:
+        """Keep a response if it carries data and no errors."""
+        if not data or data.get("errors") or data.get("data") is None:
+            return
+        self._entries[key] = data
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: Hashable) -> dict[str, Any] | None:
+        """Return the last good response of a request, or None."""
+        data = self._entries.get(key)
+        if data is not None:
+            self._entries.move_to_end(key)
+            self.served += 1
+        return data
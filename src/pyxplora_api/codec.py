@@ -0,0 +1,95 @@
+"""JSON codecs for request and response bodies, using orjson or ujson when installed."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+import importlib
+import json
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# tried in this order when no backend is requested
+CODEC_BACKENDS = ("orjson", "ujson", "json")
+
+
+def _stdlib_dumps(obj: Any) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+@dataclass(frozen=True)
+class JsonCodec:
+    """Encode to and decode from UTF-8 JSON bytes.
+
+    Values the fast backend cannot encode (e.g. integers above 64 bit for orjson) are encoded with the
+    standard library instead.
+
+    Attributes:
+        name (str): The backend, one of `CODEC_BACKENDS`.
+        encode (Callable[[Any], bytes]): Serialise an object to JSON bytes.
+        decode (Callable[[bytes | str], Any]): Parse JSON bytes or text.
+    """
+
+    name: str
+    encode: Callable[[Any], bytes]
+    decode: Callable[[bytes | str], Any]
+
+    def dumps(self, obj: Any) -> bytes:
+        """Serialise `obj` to JSON bytes."""
+        try:
+            return self.encode(obj)
+        except (TypeError, OverflowError):
+            if self.encode is _stdlib_dumps:
+                raise
+            return _stdlib_dumps(obj)
+
+    def loads(self, data: bytes | str) -> Any:
+        """Parse JSON bytes or text.
+
+        Raises:
+            ValueError: If `data` is not valid JSON.
+        """
+        return self.decode(data)
+
+
+STDLIB_CODEC = JsonCodec("json", _stdlib_dumps, json.loads)
+
+
+def _load_backend(name: str) -> JsonCodec | None:
+    if name == "json":
+        return STDLIB_CODEC
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        return None
+    if name == "orjson":
+        return JsonCodec(name, module.dumps, module.loads)
+    return JsonCodec(name, lambda obj: module.dumps(obj, ensure_ascii=False).encode(), module.loads)
+
+
+def get_codec(codec: JsonCodec | str | None = None) -> JsonCodec:
+    """Return a codec by name, falling back to the next installed backend.
+
+    Args:
+        codec (JsonCodec | str, optional): A codec or backend name. Defaults to the fastest installed backend.
+
+    Returns:
+        JsonCodec: The codec.
+
+    Raises:
+        ValueError: If `codec` is not one of `CODEC_BACKENDS`, whether or not a module of that name is installed.
+    """
+    if isinstance(codec, JsonCodec):
+        return codec
+    if codec is not None and codec not in CODEC_BACKENDS:
+        raise ValueError(f"Unknown JSON codec {codec!r}, expected one of {', '.join(CODEC_BACKENDS)}")
+    names = CODEC_BACKENDS if codec is None else (codec, *CODEC_BACKENDS)
+    for name in names:
+        loaded = _load_backend(name)
+        if loaded is not None:
+            if codec is not None and name != codec:
+                _LOGGER.debug("JSON codec %s is not installed, using %s", codec, name)
+            return loaded
+    return STDLIB_CODEC
@@ -5,3 +5,16 @@ DEFAULT_TIMEOUT = 60
 DEFAULT_USER_AGENT = (
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.3"
 )
+DEFAULT_CONNECTOR_LIMIT = 100
+DEFAULT_CONNECTOR_LIMIT_PER_HOST = 30
+DEFAULT_DNS_CACHE_TTL = 300
+DEFAULT_KEEPALIVE_TIMEOUT = 30
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_LOCATE_TIMEOUT = 30
+DEFAULT_LOCATE_POLL_INTERVAL = 1.0
+DEFAULT_LOCATE_MAX_POLL_INTERVAL = 5.0
+DEFAULT_CHAT_PAGE_SIZE = 50
+DEFAULT_DEVICE_TIMEOUT = 30
+# below DEFAULT_DEVICE_TIMEOUT, a watch not reporting after the ask keeps its last known location
+DEFAULT_DEVICE_LOCATE_TIMEOUT = 10
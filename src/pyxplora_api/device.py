@@ -0,0 +1,294 @@
+"""Registry of the device fields of `PyXploraApi.device` and the upstream sources they are read from."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from datetime import datetime
+import logging
+from typing import Any
+
+from .const import DEFAULT_DEVICE_LOCATE_TIMEOUT
+from .exception_classes import Error, RateLimitError
+from .status import LocationType
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class DeviceSource:
+    """An upstream data group of a watch, fetched once per refresh however many fields read it.
+
+    Attributes:
+        name (str): The name of the source, also usable as selection.
+        operations (tuple[str, ...]): The GraphQL operations the source sends.
+        fetch (Callable): Coroutine function `(api, wuid, values)` returning the data of the source, `values` holds
+            the data of the sources in `requires`.
+        requires (tuple[str, ...]): Sources fetched before this one.
+    """
+
+    name: str
+    operations: tuple[str, ...]
+    fetch: Callable[[Any, str, dict[str, Any]], Awaitable[Any]]
+    requires: tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class DeviceField:
+    """A field of a device, read from the data of its source.
+
+    Attributes:
+        name (str): The key of the field in `PyXploraApi.device[wuid]`.
+        source (str): The name of the source.
+        extract (Callable): Returns the field from the data of the source.
+    """
+
+    name: str
+    source: str
+    extract: Callable[[Any], Any] = lambda data: data
+
+
+def _today() -> int:
+    return int(datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp())
+
+
+async def _profile(api: Any, wuid: str, values: dict[str, Any]) -> dict[str, Any]:
+    # read from the watches loaded at login, no request
+    return {"icon": api.getWatchUserIcons(wuid), "xcoin": api.getWatchUserXCoins(wuid)}
+
+
+async def _ask_locate(api: Any, wuid: str, values: dict[str, Any]) -> dict[str, Any]:
+    # the location before the ask, a new one is told apart by its `tm`
+    location = await api.loadWatchLocation(wuid, with_ask=False)
+    try:
+        asked = await api.askWatchLocate(wuid)
+    except RateLimitError:
+        raise
+    except Error as error:
+        # a failed ask reads like an offline watch, which keeps the last known location
+        _LOGGER.debug(error)
+        asked = False
+    return {"asked": asked, "location": location}
+
+
+async def _location(api: Any, wuid: str, values: dict[str, Any]) -> dict[str, Any]:
+    ask = values["askLocate"]
+    if not ask["asked"]:
+        return ask["location"]
+    return await api.waitForWatchLocation(wuid, ask["location"], timeout=DEFAULT_DEVICE_LOCATE_TIMEOUT)
+
+
+DEVICE_SOURCES: dict[str, DeviceSource] = {
+    source.name: source
+    for source in (
+        DeviceSource("alarms", ("Alarms",), lambda api, wuid, values: api.getWatchAlarm(wuid)),
+        # asked once per refresh, the location and the online status both read the answer
+        DeviceSource("askLocate", ("WatchLastLocate", "AskWatchLocate"), _ask_locate),
+        DeviceSource("location", ("WatchLastLocate",), _location, requires=("askLocate",)),
+        DeviceSource("safeZones", ("SafeZones",), lambda api, wuid, values: api.getWatchSafeZones(wuid)),
+        DeviceSource("silentTimes", ("SlientTimes",), lambda api, wuid, values: api.getSilentTime(wuid)),
+        DeviceSource("watches", ("Watches",), lambda api, wuid, values: api.getWatches(wuid)),
+        DeviceSource(
+            "swInfo",
+            ("CheckWatchByQrCode",),
+            lambda api, wuid, values: api.getSWInfo(wuid, watches=values["watches"]),
+            requires=("watches",),
+        ),
+        DeviceSource("steps", ("UserSteps",), lambda api, wuid, values: api.getWatchUserSteps(wuid, date=_today())),
+        DeviceSource(
+            "onlineStatus",
+            ("TrackWatch",),
+            lambda api, wuid, values: api.getWatchOnlineStatus(wuid, asked=values["askLocate"]["asked"]),
+            requires=("askLocate",),
+        ),
+        DeviceSource("profile", (), _profile),
+    )
+}
+
+DEVICE_FIELDS: dict[str, DeviceField] = {
+    field.name: field
+    for field in (
+        DeviceField("getWatchAlarm", "alarms"),
+        DeviceField("watch_battery", "location", lambda location: location.get("watch_battery", -1)),
+        DeviceField("watch_charging", "location", lambda location: location.get("watch_charging", False)),
+        DeviceField("locateType", "location", lambda location: location.get("locateType", LocationType.UNKNOWN.value)),
+        DeviceField(
+            "lastTrackTime",
+            "location",
+            lambda location: location.get("tm", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
+        ),
+        DeviceField("lat", "location", lambda location: location.get("lat", None)),
+        DeviceField("lng", "location", lambda location: location.get("lng", None)),
+        DeviceField("rad", "location", lambda location: location.get("rad", -1)),
+        DeviceField("step", "location", lambda location: location.get("watch_last_location", {}).get("step", 0)),
+        DeviceField("distance", "location", lambda location: location.get("watch_last_location", {}).get("distance", -1)),
+        DeviceField("isInSafeZone", "location", lambda location: location.get("isInSafeZone", False)),
+        DeviceField("safeZoneLabel", "location", lambda location: location.get("safeZoneLabel", "")),
+        DeviceField("getWatchSafeZones", "safeZones"),
+        DeviceField("getSilentTime", "silentTimes"),
+        DeviceField("getWatches", "watches"),
+        DeviceField("getSWInfo", "swInfo"),
+        DeviceField("getWatchUserSteps", "steps"),
+        DeviceField("getWatchOnlineStatus", "onlineStatus"),
+        DeviceField("getWatchUserIcons", "profile", lambda profile: profile["icon"]),
+        DeviceField("getWatchUserXCoins", "profile", lambda profile: profile["xcoin"]),
+    )
+}
+
+# selections naming several fields, besides the name of a source selecting all its fields
+DEVICE_GROUPS: dict[str, tuple[str, ...]] = {
+    "battery": ("watch_battery", "watch_charging"),
+    "position": ("lat", "lng", "rad", "lastTrackTime", "locateType"),
+    "safeZone": ("isInSafeZone", "safeZoneLabel", "getWatchSafeZones"),
+}
+
+
+def select_fields(selection: str | Iterable[str] | None = None) -> list[str]:
+    """Resolve field, group and source names to the fields of `DEVICE_FIELDS`.
+
+    Args:
+        selection (str | Iterable[str], optional): The names. Defaults to all fields.
+
+    Returns:
+        list[str]: The selected fields in registry order.
+
+    Raises:
+        ValueError: If a name is neither a field, a group nor a source.
+    """
+    if selection is None:
+        return list(DEVICE_FIELDS)
+    names = {selection} if isinstance(selection, str) else set(selection)
+    selected: set[str] = set()
+    for name in names:
+        if name in DEVICE_FIELDS:
+            selected.add(name)
+        elif name in DEVICE_GROUPS:
+            selected.update(DEVICE_GROUPS[name])
+        elif name in DEVICE_SOURCES:
+            selected.update(field.name for field in DEVICE_FIELDS.values() if field.source == name)
+        else:
+            raise ValueError(f"Unknown device field {name!r}")
+    return [name for name in DEVICE_FIELDS if name in selected]
+
+
+def sources_of(fields: Iterable[str]) -> list[str]:
+    """Return the sources needed for the fields, each once, required sources before the sources requiring them."""
+    sources: list[str] = []
+
+    def add(name: str) -> None:
+        if name in sources:
+            return
+        for required in DEVICE_SOURCES[name].requires:
+            add(required)
+        sources.append(name)
+
+    for field in fields:
+        add(DEVICE_FIELDS[field].source)
+    return sources
+
+
+def operations_of(sources: Iterable[str]) -> set[str]:
+    """Return the GraphQL operations sent for the sources."""
+    return {operation for source in sources for operation in DEVICE_SOURCES[source].operations}
+
+
+class DeviceSnapshot(dict[str, Any]):
+    """The fields of one watch, each with the source it was read from and the time it was fetched.
+
+    A dict of the fields fetched so far, so `json.dumps`, `copy` and mutation work like on the former device dict;
+    a field not fetched yet is missing. Fields are also readable as attributes, e.g. `snapshot.watch_battery`.
+    A refresh updates the snapshot in place.
+
+    `snapshot[name]` cannot await, so missing fields are loaded through the awaitable accessors instead:
+    `await snapshot.get_field(name)` or `await snapshot.load(...)`. The sources behind fields loaded at the same time
+    are fetched concurrently and each of them once.
+
+    Args:
+        wuid (str): The watch user id.
+        loader (Callable, optional): Coroutine function fetching and storing a list of fields, without it `load`
+            fetches nothing.
+
+    Attributes:
+        wuid (str): The watch user id.
+    """
+
+    __slots__ = ("wuid", "_loader", "_fetched_at", "_loading")
+
+    def __init__(self, wuid: str, loader: Callable[[list[str]], Awaitable[Any]] | None = None) -> None:
+        super().__init__()
+        self.wuid = wuid
+        self._loader = loader
+        self._fetched_at: dict[str, float] = {}
+        self._loading: dict[str, asyncio.Future[Any]] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name in DEVICE_FIELDS and name in self:
+            return self[name]
+        raise AttributeError(name)
+
+    def __repr__(self) -> str:
+        return f"DeviceSnapshot({self.wuid!r}, {dict(self)!r})"
+
+    @staticmethod
+    def source(name: str) -> str:
+        """Return the name of the source a field is read from."""
+        return DEVICE_FIELDS[name].source
+
+    def fetched_at(self, name: str) -> float | None:
+        """Return when a field was fetched (seconds since the epoch), or None if it was not fetched."""
+        return self._fetched_at.get(name) if name in self else None
+
+    def store(self, name: str, value: Any, fetched_at: float) -> None:
+        """Set a field fetched at `fetched_at`."""
+        self[name] = value
+        self._fetched_at[name] = fetched_at
+
+    async def get_field(self, name: str) -> Any:
+        """Return a field, fetching it first if it is missing.
+
+        Args:
+            name (str): The name of the field.
+
+        Returns:
+            Any: The value of the field.
+
+        Raises:
+            ValueError: If the field is unknown.
+            KeyError: If the field is missing and the snapshot has no loader, e.g. of a watch not of the account.
+            Error: The error the fetch raised, e.g. `RateLimitError` or `CircuitOpenError`, the field stays missing.
+        """
+        if name not in DEVICE_FIELDS:
+            raise ValueError(f"Unknown device field {name!r}")
+        await self.load(name)
+        return self[name]
+
+    async def load(self, *names: str) -> DeviceSnapshot:
+        """Fetch the fields not fetched yet.
+
+        Args:
+            *names (str): Names of fields, groups or sources, see `select_fields`. Defaults to all fields.
+
+        Returns:
+            DeviceSnapshot: The snapshot itself.
+
+        Raises:
+            ValueError: If a name is unknown.
+            Error: The error the fetch raised, see `get_field`.
+        """
+        fields = select_fields(names or None)
+        missing = [name for name in fields if name not in self and name not in self._loading]
+        if missing and self._loader is not None:
+            task = asyncio.ensure_future(self._loader(missing))
+            for name in missing:
+                self._loading[name] = task
+            task.add_done_callback(lambda done: self._loaded(missing, done))
+        waiting = {self._loading[name] for name in fields if name in self._loading}
+        # a cancelled reader must not cancel the fetch other readers wait for
+        await asyncio.gather(*(asyncio.shield(task) for task in waiting))
+        return self
+
+    def _loaded(self, names: list[str], task: asyncio.Future[Any]) -> None:
+        for name in names:
+            if self._loading.get(name) is task:
+                del self._loading[name]
@@ -96,3 +96,45 @@ class PhoneOrEmailFail(Error):
 
     def __str__(self) -> str:
         return f"{self.error_message}"
+
+
+class LoginCooldownError(LoginError):
+    """Exception raised when a login is refused because the previous attempts failed a moment ago."""
+
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        super().__init__(f"Login paused after failed attempts, retry in {retry_after:.0f}s.")
+
+
+class TokenStoreError(Error):
+    """Exception raised when a token store cannot be read or written."""
+
+    def __init__(self, path: str, reason: object) -> None:
+        self.path = path
+        self.reason = reason
+        super().__init__()
+
+    def __str__(self) -> str:
+        return f"Token store {self.path} failed: {self.reason}"
+
+
+class RateLimitError(Error):
+    """Exception raised when a request would have to wait longer than the rate limiter allows."""
+
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        super().__init__()
+
+    def __str__(self) -> str:
+        return f"Rate limit reached, retry in {self.retry_after:.1f}s."
+
+
+class CircuitOpenError(Error):
+    """Exception raised when a request is not sent because the circuit breaker of the endpoint is open."""
+
+    def __init__(self, retry_after: float) -> None:
+        self.retry_after = retry_after
+        super().__init__()
+
+    def __str__(self) -> str:
+        return f"Xplora API unavailable, retry in {self.retry_after:.0f}s."
@@ -0,0 +1,74 @@
+"""Bounded, fair fan-out of the per-watch requests of a device refresh."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass, field
+from typing import TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_MAX_IN_FLIGHT = 16
+DEFAULT_MAX_WATCHES = 4
+DEFAULT_MAX_REQUESTS_PER_WATCH = 4
+
+
+@dataclass
+class FanoutLimits:
+    """Concurrency limits of `PyXploraApi.setDevices`.
+
+    Waiting requests are served in the order they queued. As every watch queues at most `max_requests_per_watch`
+    requests at a time, a watch with many requests cannot crowd out the others.
+
+    Attributes:
+        max_in_flight (int): Requests of the account sent at a time, including those of other calls.
+        max_watches (int): Watches refreshed at a time.
+        max_requests_per_watch (int): Requests of one watch refresh sent at a time.
+    """
+
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT
+    max_watches: int = DEFAULT_MAX_WATCHES
+    max_requests_per_watch: int = DEFAULT_MAX_REQUESTS_PER_WATCH
+
+
+@dataclass
+class RefreshSummary:
+    """Outcome of a `PyXploraApi.streamDevices` run, filled while the devices are streamed.
+
+    Attributes:
+        completed (list[str]): The watches refreshed, in the order they finished.
+        timed_out (list[str]): The watches not refreshed within the timeout, they keep their previous data.
+        failed (dict[str, Exception]): The watches whose refresh raised, with the exception.
+    """
+
+    completed: list[str] = field(default_factory=list)
+    timed_out: list[str] = field(default_factory=list)
+    failed: dict[str, Exception] = field(default_factory=dict)
+
+
+async def gather_bounded(calls: Iterable[Callable[[], Awaitable[T]]], limit: int) -> list[T | Exception]:
+    """Await the calls with at most `limit` of them running, starting them in order.
+
+    A call is only started once a slot is free, a failing call does not cancel the others.
+
+    Args:
+        calls (Iterable[Callable]): Coroutine functions without arguments.
+        limit (int): Calls running at a time.
+
+    Returns:
+        list[T | Exception]: The result of every call in order, or the exception it raised.
+    """
+    pending = list(calls)
+    results: list[T | Exception] = [None] * len(pending)  # type: ignore[list-item]
+    queue = iter(range(len(pending)))
+
+    async def worker() -> None:
+        for index in queue:
+            try:
+                results[index] = await pending[index]()
+            except Exception as error:
+                results[index] = error
+
+    await asyncio.gather(*(worker() for _ in range(min(max(1, limit), len(pending)))))
+    return results
@@ -0,0 +1,417 @@
+"""Merge several GraphQL operations into one aliased document and split the response again."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from functools import lru_cache
+import logging
+import re
+from typing import Any
+
+from .exception_classes import Error
+
+_LOGGER = logging.getLogger(__name__)
+
+BATCH_OPERATION_NAME = "Batch"
+DEFAULT_BATCH_WINDOW = 0.005
+DEFAULT_MAX_BATCH_SIZE = 25
+DEFAULT_MAX_DOCUMENT_SIZE = 64 * 1024
+
+_HEADER_RE = re.compile(r"^\s*(query|mutation)\b\s*(\w*)\s*(?:\((.*)\))?\s*$", re.S)
+_VARIABLE_RE = re.compile(r"\$(\w+)")
+_NAME_RE = re.compile(r"[_A-Za-z]\w*")
+
+
+class BatchError(Error):
+    """Exception raised when a GraphQL document cannot be merged into a batch."""
+
+
+@dataclass(frozen=True)
+class ParsedOperation:
+    """A GraphQL operation split into the parts needed for merging.
+
+    Attributes:
+        kind (str): `query` or `mutation`.
+        name (str): The operation name.
+        variables (tuple[tuple[str, str], ...]): The variable definitions as (name, type and default).
+        fields (tuple[tuple[str, str], ...]): The root fields as (response key, field text without alias).
+        fragments (tuple[tuple[str, str], ...]): The fragment definitions as (name, definition).
+    """
+
+    kind: str
+    name: str
+    variables: tuple[tuple[str, str], ...]
+    fields: tuple[tuple[str, str], ...]
+    fragments: tuple[tuple[str, str], ...]
+
+
+@dataclass
+class MergedDocument:
+    """A merged GraphQL document and the aliases needed to split its response.
+
+    Attributes:
+        query (str): The merged document.
+        variables (dict[str, Any]): The renamed variables of all operations.
+        prefixes (list[str]): The alias prefix of every merged operation, in order.
+    """
+
+    query: str
+    variables: dict[str, Any] = field(default_factory=dict)
+    prefixes: list[str] = field(default_factory=list)
+
+
+def _closing(text: str, start: int, opening: str, closing: str) -> int:
+    """Return the index of the bracket closing the one at `start`, skipping string literals."""
+    depth = 0
+    i = start
+    while i < len(text):
+        char = text[i]
+        if char == '"':
+            i += 1
+            while i < len(text) and text[i] != '"':
+                i += 2 if text[i] == "\\" else 1
+        elif char == opening:
+            depth += 1
+        elif char == closing:
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise BatchError(f"Unbalanced '{opening}' in GraphQL document")
+
+
+def _split_fields(selection: str) -> tuple[tuple[str, str], ...]:
+    fields: list[tuple[str, str]] = []
+    i = 0
+    while i < len(selection):
+        if selection[i] in " \t\r\n,":
+            i += 1
+            continue
+        if selection.startswith("...", i):
+            raise BatchError("Fragment spreads on the root type cannot be aliased")
+        match = _NAME_RE.match(selection, i)
+        if match is None:
+            raise BatchError(f"Unexpected character {selection[i]!r} in selection")
+        key = match.group()
+        i = match.end()
+        while i < len(selection) and selection[i] in " \t\r\n":
+            i += 1
+        if i < len(selection) and selection[i] == ":":
+            i += 1
+            while i < len(selection) and selection[i] in " \t\r\n":
+                i += 1
+            match = _NAME_RE.match(selection, i)
+            if match is None:
+                raise BatchError("Alias without field name")
+            i = match.end()
+        start = match.start()
+        while True:
+            while i < len(selection) and selection[i] in " \t\r\n":
+                i += 1
+            if i < len(selection) and selection[i] == "(":
+                i = _closing(selection, i, "(", ")") + 1
+            elif i < len(selection) and selection[i] == "@":
+                directive = _NAME_RE.match(selection, i + 1)
+                if directive is None:
+                    raise BatchError("Directive without name")
+                i = directive.end()
+            elif i < len(selection) and selection[i] == "{":
+                i = _closing(selection, i, "{", "}") + 1
+                break
+            else:
+                break
+        fields.append((key, selection[start:i].strip()))
+    return tuple(fields)
+
+
+@lru_cache(maxsize=256)
+def parse_operation(document: str) -> ParsedOperation:
+    """Parse a GraphQL document with one operation and its fragments.
+
+    Args:
+        document (str): The GraphQL document.
+
+    Returns:
+        ParsedOperation: The parsed operation.
+
+    Raises:
+        BatchError: If the document cannot be merged with others.
+    """
+    body_start = document.find("{")
+    header = _HEADER_RE.match(document[:body_start]) if body_start >= 0 else None
+    if header is None:
+        raise BatchError("Only named query or mutation documents can be batched")
+    kind, name, definitions = header.group(1), header.group(2), header.group(3) or ""
+    variables = []
+    for definition in filter(None, (part.strip() for part in definitions.split(","))):
+        var_name, _, var_type = definition.partition(":")
+        variables.append((var_name.strip().lstrip("$"), var_type.strip()))
+    body_end = _closing(document, body_start, "{", "}")
+    fragments = []
+    rest = document[body_end + 1 :]
+    while rest.strip():
+        start = rest.find("fragment ")
+        if start < 0:
+            raise BatchError("Only fragment definitions may follow the operation")
+        end = _closing(rest, rest.index("{", start), "{", "}")
+        definition = rest[start : end + 1]
+        if "$" in definition:
+            raise BatchError("Fragments using operation variables cannot be shared")
+        fragments.append((definition.split()[1], definition))
+        rest = rest[end + 1 :]
+    return ParsedOperation(
+        kind=kind,
+        name=name,
+        variables=tuple(variables),
+        fields=_split_fields(document[body_start + 1 : body_end]),
+        fragments=tuple(fragments),
+    )
+
+
+def can_merge(operations: list[ParsedOperation], candidate: ParsedOperation) -> bool:
+    """Return True if `candidate` can join a batch of `operations` (same kind, no conflicting fragments)."""
+    if operations and operations[0].kind != candidate.kind:
+        return False
+    fragments = {name: definition for operation in operations for name, definition in operation.fragments}
+    return all(fragments.get(name, definition) == definition for name, definition in candidate.fragments)
+
+
+def merge_operations(
+    operations: list[tuple[str, dict[str, Any] | None]],
+    prefix: str = "b",
+    operation_name: str = BATCH_OPERATION_NAME,
+) -> MergedDocument:
+    """Merge several operations of the same kind into one aliased document.
+
+    Root fields of operation `i` are aliased `<prefix><i>_<key>` and its variables renamed `<name>_<prefix><i>`.
+    Fragments are emitted once.
+
+    Args:
+        operations (list[tuple[str, dict[str, Any] | None]]): The documents with their variables.
+        prefix (str, optional): The alias prefix. Defaults to "b".
+        operation_name (str, optional): The name of the merged operation. Defaults to "Batch".
+
+    Returns:
+        MergedDocument: The merged document.
+
+    Raises:
+        BatchError: If the operations cannot be merged.
+    """
+    merged = MergedDocument(query="")
+    definitions: list[str] = []
+    selections: list[str] = []
+    fragments: dict[str, str] = {}
+    parsed_operations: list[ParsedOperation] = []
+    for index, (document, variables) in enumerate(operations):
+        parsed = parse_operation(document)
+        if not can_merge(parsed_operations, parsed):
+            raise BatchError(f"{parsed.name} cannot be merged into this batch")
+        parsed_operations.append(parsed)
+        alias = f"{prefix}{index}"
+        suffix = f"_{alias}"
+        rename = lambda match: f"${match.group(1)}{suffix}"  # noqa: E731
+        for var_name, var_type in parsed.variables:
+            definitions.append(f"${var_name}{suffix}: {var_type}")
+            if variables and var_name in variables:
+                merged.variables[f"{var_name}{suffix}"] = variables[var_name]
+        for key, text in parsed.fields:
+            selections.append(f"  {alias}_{key}: {_VARIABLE_RE.sub(rename, text)}")
+        fragments.update(parsed.fragments)
+        merged.prefixes.append(f"{alias}_")
+    kind = parsed_operations[0].kind if parsed_operations else "query"
+    header = f"{kind} {operation_name}" + (f"({', '.join(definitions)})" if definitions else "")
+    merged.query = "\n".join([header + " {", *selections, "}", *fragments.values()])
+    return merged
+
+
+def split_response(merged: MergedDocument, response: dict[str, Any]) -> list[dict[str, Any]]:
+    """Split the response of a merged document into one response per merged operation.
+
+    Errors carrying a path are routed to the operation owning the aliased root field, all other errors are
+    attached to every operation.
+
+    Args:
+        merged (MergedDocument): The merged document.
+        response (dict[str, Any]): The response of the merged document.
+
+    Returns:
+        list[dict[str, Any]]: The responses, in the order of the merged operations.
+    """
+    data: dict[str, Any] = response.get("data") or {}
+    results: list[dict[str, Any]] = [{"data": {}} for _ in merged.prefixes]
+    for key, value in data.items():
+        for index, prefix in enumerate(merged.prefixes):
+            if key.startswith(prefix):
+                results[index]["data"][key[len(prefix) :]] = value
+                break
+    for error in response.get("errors") or []:
+        path = error.get("path") or []
+        owners = [i for i, prefix in enumerate(merged.prefixes) if path and str(path[0]).startswith(prefix)]
+        for index in owners or range(len(merged.prefixes)):
+            if owners:
+                error = {**error, "path": [str(path[0])[len(merged.prefixes[index]) :], *path[1:]]}
+            results[index].setdefault("errors", []).append(error)
+    return results
+
+
+def ward_documents(
+    query: str,
+    wuids: list[str],
+    variables: dict[str, Any] | None = None,
+    max_document_size: int = DEFAULT_MAX_DOCUMENT_SIZE,
+) -> list[tuple[list[str], MergedDocument]]:
+    """Fan a per-watch query out to several watches, aliased `w0_`, `w1_`, ... per watch.
+
+    Args:
+        query (str): A query of the `WATCH_Q` templates taking the watch user id as `$uid`.
+        wuids (list[str]): The watch user ids.
+        variables (dict[str, Any], optional): Further variables shared by all watches.
+        max_document_size (int, optional): Wards are split into several documents to stay below this size.
+
+    Returns:
+        list[tuple[list[str], MergedDocument]]: The watch user ids of every document with the document itself.
+    """
+    parsed = parse_operation(query)
+    fragments = sum(len(definition) + 1 for _, definition in parsed.fragments)
+    per_ward = len(merge_operations([(query, None)], prefix="w").query) - fragments
+    chunk_size = max(1, (max_document_size - fragments) // max(per_ward, 1))
+    documents = []
+    for start in range(0, len(wuids), chunk_size):
+        chunk = wuids[start : start + chunk_size]
+        operations = [(query, {**(variables or {}), "uid": wuid}) for wuid in chunk]
+        documents.append((chunk, merge_operations(operations, prefix="w", operation_name=f"{parsed.name}Wards")))
+    return documents
+
+
+def rejected(response: dict[str, Any]) -> bool:
+    """Return True if the server refused a merged document as a whole."""
+    if not response or response.get("data") is None:
+        return True
+    return any(not error.get("path") for error in response.get("errors") or [])
+
+
+@dataclass
+class _Pending:
+    query: str
+    variables: dict[str, Any] | None
+    operation_name: str | None
+    parsed: ParsedOperation
+    future: asyncio.Future[dict[str, Any]]
+
+
+class QueryBatcher:
+    """Collect queries issued within a short window and send them as merged documents.
+
+    Queries which cannot be merged are sent as they are. If the server rejects a merged document, its
+    operations are sent individually.
+
+    Args:
+        send (Callable): Coroutine function `(query, variables, operation_name)` sending one document.
+        window (float, optional): Seconds to wait for more queries before sending. Defaults to DEFAULT_BATCH_WINDOW.
+        max_batch_size (int, optional): Maximum number of operations per document. Defaults to DEFAULT_MAX_BATCH_SIZE.
+        max_document_size (int, optional): Maximum size of a merged document. Defaults to DEFAULT_MAX_DOCUMENT_SIZE.
+
+    Attributes:
+        batches (int): Number of merged documents sent.
+        batched (int): Number of operations sent inside merged documents.
+        fallbacks (int): Number of merged documents that were rejected and sent individually.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, dict[str, Any] | None, str | None], Awaitable[dict[str, Any]]],
+        window: float = DEFAULT_BATCH_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_document_size: int = DEFAULT_MAX_DOCUMENT_SIZE,
+    ) -> None:
+        self._send = send
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self.max_document_size = max_document_size
+        self._pending: list[_Pending] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.batches = 0
+        self.batched = 0
+        self.fallbacks = 0
+
+    async def submit(
+        self, query: str, variables: dict[str, Any] | None = None, operation_name: str | None = None
+    ) -> dict[str, Any]:
+        """Queue a query for the next batch and return its own response."""
+        try:
+            parsed = parse_operation(query)
+        except BatchError:
+            return await self._send(query, variables, operation_name)
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[dict[str, Any]] = loop.create_future()
+        self._pending.append(_Pending(query, variables, operation_name, parsed, future))
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self.flush)
+        return await future
+
+    def flush(self) -> None:
+        """Send all queued queries now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        for batch in self._group(pending):
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _group(self, pending: list[_Pending]) -> list[list[_Pending]]:
+        batches: list[list[_Pending]] = []
+        for item in pending:
+            for batch in batches:
+                size = sum(len(other.query) for other in batch) + len(item.query)
+                if (
+                    len(batch) < self.max_batch_size
+                    and size <= self.max_document_size
+                    and can_merge([other.parsed for other in batch], item.parsed)
+                ):
+                    batch.append(item)
+                    break
+            else:
+                batches.append([item])
+        return batches
+
+    async def _run(self, batch: list[_Pending]) -> None:
+        try:
+            if len(batch) == 1:
+                item = batch[0]
+                self._resolve(item, await self._send(item.query, item.variables, item.operation_name))
+                return
+            merged = merge_operations([(item.query, item.variables) for item in batch])
+            response = await self._send(merged.query, merged.variables, BATCH_OPERATION_NAME)
+            if rejected(response):
+                self.fallbacks += 1
+                _LOGGER.debug("Merged document rejected, sending %s operations individually", len(batch))
+                results = await asyncio.gather(
+                    *(self._send(item.query, item.variables, item.operation_name) for item in batch),
+                    return_exceptions=True,
+                )
+                for item, result in zip(batch, results):
+                    self._resolve(item, result)
+                return
+            self.batches += 1
+            self.batched += len(batch)
+            for item, result in zip(batch, split_response(merged, response)):
+                self._resolve(item, result)
+        except Exception as error:  # noqa: BLE001 - handed to every waiting caller
+            for item in batch:
+                self._resolve(item, error)
+
+    @staticmethod
+    def _resolve(item: _Pending, result: dict[str, Any] | BaseException) -> None:
+        if item.future.done():
+            return
+        if isinstance(result, BaseException):
+            item.future.set_exception(result)
+        else:
+            item.future.set_result(result)
@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+from collections.abc import Callable
 import logging
 from typing import Any
 
+import requests
+from requests.adapters import HTTPAdapter
+
 from . import gql_mutations as gm, gql_queries as gq
-from .const import ENDPOINT
-from .exception_classes import HandlerException, LoginError, NoAdminError
+from .cache import ResponseCache, is_query, operation_name_of
+from .const import DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_MAXSIZE, ENDPOINT
+from .exception_classes import CircuitOpenError, HandlerException, LoginError, NoAdminError
 from .graphql_client import GraphqlClient
 from .handler_gql import HandlerGQL
 from .model import Chats
+from .retry import RetryPolicy, is_retryable_response
+from .single_flight import SingleFlight
 from .status import EmailAndPhoneVerificationTypeV2, NormalStatus, UserContactType
+from .token_manager import token_times
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,6 +35,13 @@ class GQLHandler(HandlerGQL):
         timeZone (str): The time zone of the user.
         email (str, optional): The email of the user. Defaults to None.
         signup (bool, optional): Indicates if the user is signing up. Defaults to True.
+        pool_connections (int, optional): Number of connection pools to cache. Defaults to DEFAULT_POOL_CONNECTIONS.
+        pool_maxsize (int, optional): Maximum number of connections kept per pool. Defaults to DEFAULT_POOL_MAXSIZE.
+        cache (ResponseCache, optional): The response cache to use. Defaults to a new `ResponseCache`.
+        retry_policy (RetryPolicy, optional): The retry policy to use. Defaults to a new `RetryPolicy`.
+
+    The handler owns a `requests.Session` that is reused by every `runGqlQuery` call. Call `close()` or use the
+    handler as a context manager to release its sockets.
     """
 
     def __init__(
@@ -38,8 +53,31 @@ class GQLHandler(HandlerGQL):
         timeZone: str,
         email: str | None = None,
         signup: bool = True,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        cache: ResponseCache | None = None,
+        retry_policy: RetryPolicy | None = None,
     ) -> None:
         super().__init__(countryPhoneNumber, phoneNumber, password, userLang, timeZone, email, signup)
+        if cache is not None:
+            self.cache = cache
+        if retry_policy is not None:
+            self.retry_policy = retry_policy
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self._http_session = requests.Session()
+        self._http_session.mount("https://", adapter)
+        self._http_session.mount("http://", adapter)
+        self._gql_client = GraphqlClient(endpoint=ENDPOINT)
+
+    def __enter__(self) -> GQLHandler:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections of this handler."""
+        self._http_session.close()
 
     def runGqlQuery(
         self,
@@ -49,6 +87,11 @@ class GQLHandler(HandlerGQL):
     ) -> dict[str, Any]:
         """Execute a GraphQL query or mutation.
 
+        Query responses are served from `cache` while they are valid, successful mutations invalidate the
+        cached reads of the entity they touch. Failed requests of queries and idempotent mutations are retried
+        according to `retry_policy`. While the circuit of the client is open queries are answered with their last
+        successful response, if there is one.
+
         Args:
             query (str): The GraphQL query string to be executed.
             variables (dict, optional): The variables to be passed to the query. Defaults to None.
@@ -62,12 +105,51 @@ class GQLHandler(HandlerGQL):
         """
         if query is None:
             raise HandlerException("GraphQL query string MUST NOT be empty!")
+        name = operation_name or operation_name_of(query)
+        if not is_query(query):
+            data = self._retry(query, name, lambda: self._execute(query, variables, operation_name))
+            if data.get("data"):
+                self.cache.invalidate_for_mutation(name, variables)
+            return data
+        cached = self.cache.get(name, variables)
+        if cached is not None:
+            return cached
+        key = SingleFlight.key(name, variables)
+        try:
+            data = self._retry(query, name, lambda: self._execute(query, variables, operation_name))
+        except CircuitOpenError:
+            stale = self.lastKnownGood.get(key)
+            if stale is None:
+                raise
+            _LOGGER.debug("Circuit open, serving the last good %s", name)
+            return stale
+        self.cache.set(name, variables, data)
+        self.lastKnownGood.set(key, data)
+        return data
+
+    def _retry(self, query: str, name: str, send: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        if not self.retry_policy.allows(query, name):
+            return send()
+        return self.retry_policy.call(send, name, retry_if=is_retryable_response)
+
+    def _execute(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+        operation_name: str | None = None,
+    ) -> dict[str, Any]:
+        if self.rateLimiter is not None:
+            self.rateLimiter.acquire(self._account, operation_name)
         # Add Xplora® API headers
         requestHeaders = self.getRequestHeaders("application/json; charset=UTF-8")
-        # create GQLClient
-        gqlClient = GraphqlClient(endpoint=ENDPOINT, headers=requestHeaders)
         # execute QUERY|MUTATION
-        data: dict[str, Any] = gqlClient.execute(query=query, variables=variables, operation_name=operation_name)
+        data: dict[str, Any] = self._gql_client.execute(
+            query=query,
+            variables=variables,
+            operation_name=operation_name,
+            headers=requestHeaders,
+            session=self._http_session,
+        )
         return data
 
     def runAuthorizedGqlQuery(
@@ -105,6 +187,17 @@ class GQLHandler(HandlerGQL):
             the user is stored in the `Client` instance's `issueToken`, `sessionId`, `userId`, and `accessToken`
             properties.
         """
+        # one process of the account logs in at a time, the others take over its session from `tokenStore`
+        with self.sessionLock():
+            shared = self.sharedSession()
+            if shared is not None:
+                self.restoreSession(shared)
+                return self.issueToken
+            issueToken = self._signIn()
+            self.saveSession()
+            return issueToken
+
+    def _signIn(self) -> dict[str, Any]:
         dataAll = self.runGqlQuery(
             gm.SIGN_M.get("signInWithEmailOrPhoneM", ""),
             self.variables,
@@ -125,6 +218,8 @@ class GQLHandler(HandlerGQL):
         self.sessionId = self.issueToken["id"]
         self.userId = self.issueToken["user"]["id"]
         self.accessToken = self.issueToken["token"]
+        self.refreshToken = self.issueToken.get("refreshToken")
+        self.issuedAt, self.expiresAt = token_times(self.issueToken)
 
         return self.issueToken
 
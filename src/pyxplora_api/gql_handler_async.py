@@ -2,18 +2,35 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import AbstractAsyncContextManager, contextmanager, nullcontext
+from contextvars import ContextVar
 import logging
 from typing import Any
 
 import aiohttp
 
 from . import gql_mutations as gm, gql_queries as gq
+from .cache import SHARED_OPERATIONS, ResponseCache, is_query, is_successful, operation_name_of
 from .const import API_KEY, API_SECRET, ENDPOINT
-from .exception_classes import ErrorMSG, HandlerException, LoginError, NoAdminError
+from .exception_classes import CircuitOpenError, ErrorMSG, HandlerException, LoginError, NoAdminError
+from .gql_batch import (
+    DEFAULT_MAX_DOCUMENT_SIZE,
+    MergedDocument,
+    QueryBatcher,
+    merge_operations,
+    rejected,
+    split_response,
+    ward_documents,
+)
 from .graphql_client import GraphqlClient
 from .handler_gql import HandlerGQL
 from .model import Chats, ChatsNew
+from .retry import RetryPolicy, is_retryable_response
+from .single_flight import SingleFlight
 from .status import EmailAndPhoneVerificationTypeV2, NormalStatus, UserContactType
+from .token_manager import TOKEN_OPERATIONS, TokenManager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,10 +46,52 @@ class GQLHandler(HandlerGQL):
         email: str | None = None,
         signup: bool = True,
         session: aiohttp.ClientSession | None = None,
+        gql_client: GraphqlClient | None = None,
+        cache: ResponseCache | None = None,
+        batching: bool = False,
+        retry_policy: RetryPolicy | None = None,
     ) -> None:
         self._session = session
+        # one pooled client per handler unless a shared one is handed in
+        self._owns_client = gql_client is None
+        self._gql_client = GraphqlClient(endpoint=ENDPOINT) if gql_client is None else gql_client
         self.refreshToken = None
+        # concurrent identical queries share one request
+        self._single_flight = SingleFlight()
+        # queries issued within a few milliseconds are merged into one document
+        self._batcher = QueryBatcher(self._execute_a) if batching else None
+        # per-watch responses fetched ahead by `runWardQuery_a(prime=True)`, each served once within its `primeScope`
+        self._primed: ContextVar[dict[tuple[str, str], dict[str, Any]] | None] = ContextVar("primed", default=None)
+        # renews `accessToken` before it expires, requests wait while it is renewed
+        self.tokens = TokenManager(self)
         super().__init__(countryPhoneNumber, phoneNumber, password, userLang, timeZone, email, signup)
+        if cache is not None:
+            self.cache = cache
+        if retry_policy is not None:
+            self.retry_policy = retry_policy
+        # cache and coalesce the `SHARED_OPERATIONS` across all accounts of an `AccountManager`
+        self.sharedCache: ResponseCache | None = None
+        self.sharedFlight: SingleFlight | None = None
+        # bounds the requests of the account sent at a time, see `FanoutLimits.max_in_flight`
+        self.inFlight: asyncio.Semaphore | None = None
+
+    def exportSession(self) -> dict[str, Any]:
+        return {**super().exportSession(), "issuedAt": self.tokens.issued_at, "expiresAt": self.tokens.expires_at}
+
+    def restoreSession(self, state: dict[str, Any]) -> None:
+        super().restoreSession(state)
+        self.tokens.restore(self.issuedAt, self.expiresAt)
+
+    def sessionLock_a(self) -> AbstractAsyncContextManager[bool]:
+        """Like `sessionLock`, waiting for the lock without blocking the event loop."""
+        lock = self._lock()
+        return nullcontext(False) if lock is None else lock.hold_a()
+
+    async def aclose(self) -> None:
+        """Stop the background token refresh and release the pooled connections of the client owned by this handler."""
+        await self.tokens.aclose()
+        if self._owns_client:
+            await self._gql_client.aclose()
 
     async def runGqlQuery_a(
         self,
@@ -42,22 +101,186 @@ class GQLHandler(HandlerGQL):
     ) -> dict[str, Any]:
         if query is None:
             raise HandlerException("GraphQL query string MUST NOT be empty!")
-        # Add Xplora® API headers
-        requestHeaders = self.getRequestHeaders("application/json; charset=UTF-8")
-        # create GQLClient
-        gqlClient = GraphqlClient(endpoint=ENDPOINT, headers=requestHeaders)
-        # execute QUERY|MUTATION
-        if self._session:
-            data: dict[str, Any] = await gqlClient.ha_execute_async(
-                query=query,
-                variables=variables,
-                operation_name=operation_name,
-                session=self._session,
+        name = operation_name or operation_name_of(query)
+        if not is_query(query):
+            # never coalesce mutations, every call has to reach the server
+            data = await self._retry_a(query, name, lambda: self._execute_a(query, variables, operation_name))
+            if data.get("data"):
+                self.cache.invalidate_for_mutation(name, variables)
+                if self.sharedCache is not None:
+                    self.sharedCache.invalidate_for_mutation(name, variables)
+            return data
+        cache = self._cacheOf(name)
+        cached = cache.get(name, variables)
+        if cached is not None:
+            return cached
+        key = self._single_flight.key(name, variables)
+        primes = self._primed.get()
+        primed = None if primes is None else primes.pop(key, None)
+        if primed is not None:
+            return primed
+        try:
+            data = await self._flightOf(name).do(
+                key,
+                lambda: self._retry_a(query, name, lambda: self._send_a(query, variables, operation_name)),
             )
-        else:
-            data: dict[str, Any] = await gqlClient.execute_async(
-                query=query, variables=variables, operation_name=operation_name
+        except CircuitOpenError:
+            stale = self.lastKnownGood.get(key)
+            if stale is None:
+                raise
+            _LOGGER.debug("Circuit open, serving the last good %s", name)
+            return stale
+        cache.set(name, variables, data)
+        self.lastKnownGood.set(key, data)
+        return data
+
+    def _cacheOf(self, name: str) -> ResponseCache:
+        if self.sharedCache is not None and name in SHARED_OPERATIONS:
+            return self.sharedCache
+        return self.cache
+
+    def _flightOf(self, name: str) -> SingleFlight:
+        if self.sharedFlight is not None and name in SHARED_OPERATIONS:
+            return self.sharedFlight
+        return self._single_flight
+
+    async def runWardQuery_a(
+        self,
+        query: str,
+        wuids: list[str],
+        variables: dict[str, Any] | None = None,
+        operation_name: str | None = None,
+        max_document_size: int = DEFAULT_MAX_DOCUMENT_SIZE,
+        prime: bool = False,
+    ) -> dict[str, dict[str, Any]]:
+        """Run a per-watch query for several watches with one request per document.
+
+        Args:
+            query (str): A query of the `WATCH_Q` templates taking the watch user id as `$uid`.
+            wuids (list[str]): The watch user ids.
+            variables (dict[str, Any], optional): Further variables shared by all watches.
+            operation_name (str, optional): The operation name of `query`.
+            max_document_size (int, optional): Wards are split into several documents to stay below this size.
+            prime (bool, optional): Serve the successful responses to the next identical `runGqlQuery_a` of every
+                watch within the current `primeScope`.
+
+        Returns:
+            dict[str, dict[str, Any]]: The response of every watch, keyed by watch user id.
+        """
+        if query is None:
+            raise HandlerException("GraphQL query string MUST NOT be empty!")
+        name = operation_name or operation_name_of(query)
+
+        async def run(chunk: list[str], merged: MergedDocument) -> list[dict[str, Any]]:
+            response = await self._retry_a(
+                merged.query, name, lambda: self._execute_a(merged.query, merged.variables, f"{name}Wards")
+            )
+            if not rejected(response):
+                return split_response(merged, response)
+            _LOGGER.debug("Ward query %s rejected, sending it per watch", name)
+            return list(
+                await asyncio.gather(
+                    *(self.runGqlQuery_a(query, {**(variables or {}), "uid": wuid}, operation_name) for wuid in chunk)
+                )
             )
+
+        documents = ward_documents(query, wuids, variables, max_document_size)
+        results: dict[str, dict[str, Any]] = {}
+        for (chunk, _), responses in zip(documents, await asyncio.gather(*(run(*document) for document in documents))):
+            for wuid, data in zip(chunk, responses):
+                ward_variables = {**(variables or {}), "uid": wuid}
+                results[wuid] = data
+                if not is_successful(data):
+                    # a failed watch is read with its own request, retried and served from `lastKnownGood`
+                    continue
+                key = self._single_flight.key(name, ward_variables)
+                self.cache.set(name, ward_variables, data)
+                self.lastKnownGood.set(key, data)
+                primes = self._primed.get() if prime else None
+                if primes is not None:
+                    primes[key] = data
+        return results
+
+    @contextmanager
+    def primeScope(
+        self, primes: dict[tuple[str, str], dict[str, Any]] | None = None
+    ) -> Iterator[dict[tuple[str, str], dict[str, Any]]]:
+        """Collect the responses of `runWardQuery_a(prime=True)` run in the block and serve them to the reads in it.
+
+        The scope is a context variable, tasks started inside the block share it and overlapping scopes do not see
+        each other's responses. Responses not served are dropped with the scope.
+
+        Args:
+            primes (dict, optional): The responses shared with other scopes, e.g. of the tasks of one refresh.
+                Defaults to a new dict.
+
+        Yields:
+            dict: The primed responses, keyed like `SingleFlight.key`.
+        """
+        primes = {} if primes is None else primes
+        token = self._primed.set(primes)
+        try:
+            yield primes
+        finally:
+            self._primed.reset(token)
+
+    async def _retry_a(self, query: str, name: str, send: Callable[[], Awaitable[dict[str, Any]]]) -> dict[str, Any]:
+        if not self.retry_policy.allows(query, name):
+            return await send()
+        return await self.retry_policy.call_async(send, name, retry_if=is_retryable_response)
+
+    async def _send_a(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+        operation_name: str | None = None,
+    ) -> dict[str, Any]:
+        if self._batcher is not None:
+            return await self._batcher.submit(query, variables, operation_name)
+        return await self._execute_a(query, variables, operation_name)
+
+    async def _execute_a(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+        operation_name: str | None = None,
+    ) -> dict[str, Any]:
+        await self.tokens.ensure_valid(operation_name)
+        data = await self._post_a(query, variables, operation_name)
+        if operation_name not in TOKEN_OPERATIONS and self.tokens.expires_at and self._authFailed(data):
+            # the token was rejected before its expiry, renew it and send the request once more
+            await self.tokens.refresh()
+            data = await self._post_a(query, variables, operation_name)
+        return data
+
+    @staticmethod
+    def _authFailed(data: dict[str, Any]) -> bool:
+        return any(error.get("message") == ErrorMSG.AUTH_FAIL.value for error in (data or {}).get("errors") or [])
+
+    async def _post_a(
+        self,
+        query: str,
+        variables: dict[str, Any] | None = None,
+        operation_name: str | None = None,
+    ) -> dict[str, Any]:
+        if self.rateLimiter is not None:
+            await self.rateLimiter.acquire_a(self._account, operation_name)
+        async with nullcontext() if self.inFlight is None else self.inFlight:
+            # Add Xplora® API headers
+            requestHeaders = self.getRequestHeaders("application/json; charset=UTF-8")
+            # execute QUERY|MUTATION
+            if self._session:
+                data: dict[str, Any] = await self._gql_client.ha_execute_async(
+                    query=query,
+                    variables=variables,
+                    operation_name=operation_name,
+                    headers=requestHeaders,
+                    session=self._session,
+                )
+            else:
+                data: dict[str, Any] = await self._gql_client.execute_async(
+                    query=query, variables=variables, operation_name=operation_name, headers=requestHeaders
+                )
         return data
 
     async def runAuthorizedGqlQuery_a(
@@ -70,6 +293,17 @@ class GQLHandler(HandlerGQL):
         return await self.runGqlQuery_a(query, variables, operation_name)
 
     async def login_a(self, key, sec) -> tuple[dict[str, Any], Any]:
+        # one process of the account logs in at a time, the others take over its session from `tokenStore`
+        async with self.sessionLock_a():
+            shared = self.sharedSession()
+            if shared is not None:
+                self.restoreSession(shared)
+                return self.issueToken, self.refreshToken
+            login = await self._signIn_a(key, sec)
+            self.saveSession()
+            return login
+
+    async def _signIn_a(self, key, sec) -> tuple[dict[str, Any], Any]:
         if key and sec:
             self._API_KEY = key
             self._API_SECRET = sec
@@ -96,6 +330,7 @@ class GQLHandler(HandlerGQL):
         self.sessionId = self.issueToken.get("id")
         self.userId = self.issueToken.get("user", {"id": None}).get("id", None)
         self.accessToken = self.issueToken.get("token", None)
+        self.tokens.update(self.issueToken)
         w360: dict = self.issueToken.get("w360", None)
         if w360:
             if w360.get("token") and w360.get("secret"):
@@ -591,6 +826,34 @@ class GQLHandler(HandlerGQL):
             )
         ).get("data", {})
 
+    async def setReadChatMsgs_a(self, receipts: list[tuple[str, str, str]]) -> list[dict[str, Any]]:
+        """Mark several chat messages as read with one aliased mutation.
+
+        Args:
+            receipts (list[tuple[str, str, str]]): The messages as `(wuid, msgId, id)`.
+
+        Returns:
+            list[dict[str, Any]]: The `data` of every receipt, in order.
+        """
+        query = gm.WATCH_M.get("setReadChatMsgM", "")
+        operations = [(query, {"uid": wuid, "msgId": msgId, "id": _id}) for wuid, msgId, _id in receipts]
+        if len(operations) == 1:
+            return [(await self.runGqlQuery_a(query, operations[0][1], "setReadChatMsg")).get("data", {})]
+        merged = merge_operations(operations, prefix="r", operation_name="setReadChatMsgs")
+        response = await self._retry_a(
+            merged.query, "setReadChatMsg", lambda: self._execute_a(merged.query, merged.variables, "setReadChatMsgs")
+        )
+        if rejected(response):
+            _LOGGER.debug("Read receipts rejected, sending %s receipts individually", len(operations))
+            responses = await asyncio.gather(
+                *(self.runGqlQuery_a(query, variables, "setReadChatMsg") for _, variables in operations)
+            )
+        else:
+            responses = split_response(merged, response)
+            for wuid in dict.fromkeys(wuid for wuid, _, _ in receipts):
+                self.cache.invalidate_for_mutation("setReadChatMsg", {"uid": wuid})
+        return [data.get("data", {}) for data in responses]
+
     async def submitIncorrectLocationData_a(self, wuid: str, lat: str, lng: str, timestamp: str) -> dict[str, Any]:
         return (
             await self.runGqlQuery_a(
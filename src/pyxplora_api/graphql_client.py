@@ -2,41 +2,161 @@
 
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Mapping
 import logging
 from typing import Any, Optional
 
 import aiohttp
 import requests
 
-from .const import DEFAULT_TIMEOUT, DEFAULT_USER_AGENT
+from .circuit_breaker import CircuitBreaker
+from .codec import JsonCodec, get_codec
+from .const import (
+    DEFAULT_CONNECTOR_LIMIT,
+    DEFAULT_CONNECTOR_LIMIT_PER_HOST,
+    DEFAULT_DNS_CACHE_TTL,
+    DEFAULT_KEEPALIVE_TIMEOUT,
+    DEFAULT_TIMEOUT,
+    DEFAULT_USER_AGENT,
+)
+from .operations import PERSISTED_QUERY_NOT_SUPPORTED, Operation, operation_for, persisted_query_error, request_body
+from .rate_limit import RETRY_AFTER_STATUS, RateLimiter, parse_retry_after
+
+
+def _failed(data: Any) -> bool:
+    # failed requests are answered with an empty response
+    return not data
 
 
 class GraphqlClient:
-    """Class which represents the interface to make graphQL requests through."""
+    """Class which represents the interface to make graphQL requests through.
+
+    Asynchronous requests share one lazily created, connection pooled `aiohttp.ClientSession`
+    owned by the client. Call `aclose()` (or use the client as an async context manager) to
+    release the pooled connections.
+    """
 
-    def __init__(self, endpoint: str, headers: Optional[dict[str, str]] = None, **kwargs: Any):
-        """Instantiate the client."""
+    def __init__(
+        self,
+        endpoint: str,
+        headers: Optional[dict[str, str]] = None,
+        *,
+        limit: int = DEFAULT_CONNECTOR_LIMIT,
+        limit_per_host: int = DEFAULT_CONNECTOR_LIMIT_PER_HOST,
+        ttl_dns_cache: int | None = DEFAULT_DNS_CACHE_TTL,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE_TIMEOUT,
+        codec: JsonCodec | str | None = None,
+        persisted_queries: bool = False,
+        rate_limiter: RateLimiter | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        **kwargs: Any,
+    ):
+        """Instantiate the client.
+
+        Args:
+            endpoint (str): The graphQL endpoint.
+            headers (dict[str, str], optional): Headers sent with every request.
+            limit (int, optional): Total number of simultaneous pooled connections.
+            limit_per_host (int, optional): Number of simultaneous pooled connections per host.
+            ttl_dns_cache (int | None, optional): Seconds to cache DNS lookups, None caches forever.
+            keepalive_timeout (float, optional): Seconds an idle connection is kept alive.
+            codec (JsonCodec | str, optional): JSON codec or backend name (orjson, ujson, json) of the bodies.
+                Defaults to the fastest installed backend.
+            persisted_queries (bool, optional): Send only the sha256 of registered documents (automatic persisted
+                queries) and the full text when the server does not know the hash yet. Turned off again if the
+                server does not support persisted queries.
+            rate_limiter (RateLimiter, optional): Told about the `Retry-After` of 429/503 responses, so the requests
+                it throttles wait as long as the server asked.
+            circuit_breaker (CircuitBreaker, optional): Fails requests fast with `CircuitOpenError` while the
+                endpoint keeps failing or answering slowly. Defaults to a new `CircuitBreaker`, set the attribute
+                to None to send without one.
+            **kwargs: Extra options forwarded to `requests.post`.
+        """
         headers = {} if headers is None else headers
         self.logger = logging.getLogger(__name__)
         self.endpoint = endpoint
         self.headers = headers
         self.options = kwargs
+        self.codec = get_codec(codec)
+        self.persisted_queries = persisted_queries
+        self.rate_limiter = rate_limiter
+        self.circuit_breaker = CircuitBreaker() if circuit_breaker is None else circuit_breaker
+        # bytes of request bodies sent, to compare the upload with and without persisted queries
+        self.bytes_sent = 0
+        self._connector_options: dict[str, Any] = {
+            "limit": limit,
+            "limit_per_host": limit_per_host,
+            "ttl_dns_cache": ttl_dns_cache,
+            "use_dns_cache": True,
+            "keepalive_timeout": keepalive_timeout,
+        }
+        self._session: aiohttp.ClientSession | None = None
+        self._session_loop: asyncio.AbstractEventLoop | None = None
+
+    async def __aenter__(self) -> GraphqlClient:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session, creating it on first use in the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(**self._connector_options)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(DEFAULT_TIMEOUT),
+            )
+            self._session_loop = loop
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the pooled session and its connections."""
+        session, self._session, self._session_loop = self._session, None, None
+        if session is not None and not session.closed:
+            await session.close()
 
-    @staticmethod
     def __request_body(
-        query: str,
+        self,
+        operation: Operation,
         variables: dict[str, Any] | None = None,
         operation_name: str | None = None,
-    ) -> dict[str, Any]:
-        json: dict[str, Any] = {"query": query}
+        include_query: bool = True,
+    ) -> bytes:
+        body = request_body(operation, variables, operation_name, self.codec, include_query, self.persisted_queries)
+        self.bytes_sent += len(body)
+        return body
+
+    def _resend_with_query(self, response: Any) -> bool:
+        """Return True if a persisted query has to be sent again with its document."""
+        if not self.persisted_queries:
+            return False
+        error = persisted_query_error(response)
+        if error == PERSISTED_QUERY_NOT_SUPPORTED:
+            self.logger.debug("Persisted queries are not supported by %s", self.endpoint)
+            self.persisted_queries = False
+        return error is not None
 
-        if variables:
-            json.update({"variables": variables})
+    def _headers(self, headers: dict[str, str]) -> dict[str, str]:
+        merged = {**self.headers, **headers}
+        if not any(key.lower() == "content-type" for key in merged):
+            merged["Content-Type"] = "application/json"
+        return merged
 
-        if operation_name:
-            json.update({"operationName": operation_name})
+    def _throttled(self, status: int, headers: Mapping[str, str]) -> None:
+        # the server asks to slow down, pause the requests throttled by the limiter
+        if self.rate_limiter is None or status not in RETRY_AFTER_STATUS:
+            return
+        seconds = parse_retry_after(headers.get("Retry-After"))
+        if seconds is not None:
+            self.logger.debug("%s asked to retry after %.1fs", self.endpoint, seconds)
+            self.rate_limiter.retry_after(seconds)
 
-        return json
+    def _decode(self, body: bytes) -> Any:
+        # an empty body decodes to None like `aiohttp.ClientResponse.json`
+        return self.codec.loads(body) if body else None
 
     def execute(
         self,
@@ -44,23 +164,39 @@ class GraphqlClient:
         variables: dict[str, Any] | None = None,
         operation_name: str | None = None,
         headers: Optional[dict[str, str]] = None,
+        session: requests.Session | None = None,
     ):
-        """Make synchronous request to graphQL server."""
+        """Make synchronous request to graphQL server.
+
+        If a `requests.Session` is given its connection pool is reused, otherwise a one-off connection is made.
+        """
         headers = {} if headers is None else headers
-        request_body = self.__request_body(query=query, variables=variables, operation_name=operation_name)
+        operation = operation_for(query)
 
         if "user-agent" not in headers:
             headers["user-agent"] = DEFAULT_USER_AGENT
-        result = requests.post(
-            self.endpoint,
-            json=request_body,
-            headers={**self.headers, **headers},
-            **self.options,
-            timeout=DEFAULT_TIMEOUT,
-        )
+        post = requests.post if session is None else session.post
 
-        result.raise_for_status()
-        return result.json()
+        def send(include_query: bool) -> Any:
+            result = post(
+                self.endpoint,
+                data=self.__request_body(operation, variables, operation_name, include_query),
+                headers=self._headers(headers),
+                **self.options,
+                timeout=DEFAULT_TIMEOUT,
+            )
+            if self.rate_limiter is not None:
+                self._throttled(result.status_code, result.headers)
+            result.raise_for_status()
+            return self._decode(result.content)
+
+        def post_all() -> Any:
+            data = send(not self.persisted_queries)
+            return send(True) if self._resend_with_query(data) else data
+
+        if self.circuit_breaker is None:
+            return post_all()
+        return self.circuit_breaker.call(post_all, _failed)
 
     async def execute_async(
         self,
@@ -71,19 +207,10 @@ class GraphqlClient:
     ):
         """Make asynchronous request to graphQL server."""
         headers = {} if headers is None else headers
-        request_body = self.__request_body(query=query, variables=variables, operation_name=operation_name)
-
         if "user-agent" not in headers:
             headers["user-agent"] = DEFAULT_USER_AGENT
-        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(DEFAULT_TIMEOUT)) as session, session.post(
-            self.endpoint, json=request_body, headers={**self.headers, **headers}
-        ) as response:
-            try:
-                response.raise_for_status()
-                return await response.json()
-            except (aiohttp.ContentTypeError, aiohttp.ClientResponseError) as err:
-                self.logger.debug(err)
-                return {}
+        session = self._get_session()
+        return await self._post_async(session, query, variables, operation_name, headers)
 
     async def ha_execute_async(
         self,
@@ -95,8 +222,6 @@ class GraphqlClient:
     ):
         """Make asynchronous request to graphQL server."""
         headers = {} if headers is None else headers
-        request_body = self.__request_body(query=query, variables=variables, operation_name=operation_name)
-
         if "user-agent" not in headers:
             headers["user-agent"] = DEFAULT_USER_AGENT
         if session is None:
@@ -106,10 +231,44 @@ class GraphqlClient:
                 operation_name=operation_name,
                 headers=headers,
             )
-        async with session.post(self.endpoint, json=request_body, headers={**self.headers, **headers}) as response:
+        return await self._post_async(session, query, variables, operation_name, headers)
+
+    async def _post_async(
+        self,
+        session: aiohttp.ClientSession,
+        query: str,
+        variables: dict[str, Any] | None,
+        operation_name: str | None,
+        headers: dict[str, str],
+    ) -> dict[str, Any]:
+        operation = operation_for(query)
+
+        async def post_all() -> dict[str, Any]:
+            data = await self._send_async(session, operation, variables, operation_name, headers, not self.persisted_queries)
+            if self._resend_with_query(data):
+                data = await self._send_async(session, operation, variables, operation_name, headers, True)
+            return data
+
+        if self.circuit_breaker is None:
+            return await post_all()
+        return await self.circuit_breaker.call_async(post_all, _failed)
+
+    async def _send_async(
+        self,
+        session: aiohttp.ClientSession,
+        operation: Operation,
+        variables: dict[str, Any] | None,
+        operation_name: str | None,
+        headers: dict[str, str],
+        include_query: bool,
+    ) -> dict[str, Any]:
+        body = self.__request_body(operation, variables, operation_name, include_query)
+        async with session.post(self.endpoint, data=body, headers=self._headers(headers)) as response:
+            if self.rate_limiter is not None:
+                self._throttled(response.status, response.headers)
             try:
                 response.raise_for_status()
-                return await response.json()
-            except (aiohttp.ContentTypeError, aiohttp.ClientResponseError) as err:
+                return self._decode(await response.read())
+            except (ValueError, aiohttp.ClientResponseError) as err:
                 self.logger.debug(err)
                 return {}
@@ -1,9 +1,16 @@
 from __future__ import annotations
 
+from contextlib import AbstractContextManager, nullcontext
+import logging
 import sys
 from typing import Any
 
-from .exception_classes import HandlerException
+from .cache import ResponseCache, cache_bypass
+from .circuit_breaker import LastKnownGood
+from .exception_classes import HandlerException, TokenStoreError
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .token_store import ProcessLock, TokenStore, account_key
 
 if sys.version_info >= (3, 11):
     from datetime import UTC, datetime
@@ -16,6 +23,8 @@ from time import time
 from .const import API_KEY, API_SECRET
 from .status import ClientType
 
+_LOGGER = logging.getLogger(__name__)
+
 
 class HandlerGQL:
     """A class to handle GraphQL API requests for PyXplora.
@@ -27,14 +36,26 @@ class HandlerGQL:
         _API_KEY (str): The API key.
         _API_SECRET (str): The API secret.
         issueToken (dict[str, Any]): The issue token.
+        refreshToken (str | None): The token renewing `accessToken` through the `RefreshToken` mutation.
+        issuedAt (float): Timestamp the token was issued, 0 before the first login.
+        expiresAt (float): Timestamp the token expires, 0 before the first login.
+        tokenStore (TokenStore | None): The store sessions are shared through, consulted before every login.
+        rateLimiter (RateLimiter | None): The limiter every request waits for before it is sent.
         errors (list[Any]): A list of errors.
+        cache (ResponseCache): The response cache consulted before queries are sent.
+        retry_policy (RetryPolicy): The policy retrying failed requests of `runGqlQuery`/`runGqlQuery_a`.
     """
 
     accessToken: Any = None  # noqa: N815
     sessionId = None  # noqa: N815
     userId = None  # noqa: N815
     issueToken: dict[str, Any] | None = None  # noqa: N815
-    errors: list[Any] = []
+    refreshToken: str | None = None  # noqa: N815
+    issuedAt = 0.0  # noqa: N815
+    expiresAt = 0.0  # noqa: N815
+    tokenStore: TokenStore | None = None  # noqa: N815
+    rateLimiter: RateLimiter | None = None  # noqa: N815
+    errors: list[Any]
 
     def __init__(
         self,
@@ -76,6 +97,119 @@ class HandlerGQL:
             "client": ClientType.APP.value,
         }
         self.signup = signup
+        self.errors = []
+        self.cache = ResponseCache()
+        self.retry_policy = RetryPolicy()
+        # the last successful response per query, served while the circuit of the client is open
+        self.lastKnownGood = LastKnownGood()
+        self._account = account_key(countryPhoneNumber, phoneNumber, email)
+        self._sessionLock: ProcessLock | None = None
+
+    def bypass_cache(self) -> AbstractContextManager[None]:
+        """Return a context manager that skips cached responses for the queries run inside it.
+
+        Returns:
+            AbstractContextManager[None]: The bypass context.
+        """
+        return cache_bypass()
+
+    def invalidate_cache(self, operation_name: str | None = None, wuid: str | None = None) -> int:
+        """Drop cached responses.
+
+        Args:
+            operation_name (str, optional): Only drop responses of this operation.
+            wuid (str, optional): Only drop responses of this watch.
+
+        Returns:
+            int: The number of dropped responses.
+        """
+        return self.cache.invalidate(operation_name, wuid)
+
+    def exportSession(self) -> dict[str, Any]:
+        """Returns the session state needed to resume without a login, see `token_store`.
+
+        Returns:
+            dict[str, Any]: The issue token with the user tree, the refresh token and the API key and secret in use.
+        """
+        return {
+            "issueToken": self.issueToken,
+            "refreshToken": self.refreshToken,
+            "accessToken": self.accessToken,
+            "sessionId": self.sessionId,
+            "userId": self.userId,
+            "apiKey": self._API_KEY,
+            "apiSecret": self._API_SECRET,
+            "issuedAt": self.issuedAt,
+            "expiresAt": self.expiresAt,
+        }
+
+    def restoreSession(self, state: dict[str, Any]) -> None:
+        """Resumes a session exported by `exportSession`.
+
+        Args:
+            state (dict[str, Any]): The exported session.
+        """
+        self.issueToken = state.get("issueToken")
+        self.refreshToken = state.get("refreshToken")
+        self.accessToken = state.get("accessToken")
+        self.sessionId = state.get("sessionId")
+        self.userId = state.get("userId")
+        self._API_KEY = state.get("apiKey") or API_KEY
+        self._API_SECRET = state.get("apiSecret") or API_SECRET
+        self.issuedAt = float(state.get("issuedAt") or 0)
+        self.expiresAt = float(state.get("expiresAt") or 0)
+
+    def loadSession(self) -> dict[str, Any] | None:
+        """Returns the session saved to `tokenStore`, None without a store or if it failed.
+
+        Returns:
+            dict[str, Any] | None: The session as exported by `exportSession`.
+        """
+        if self.tokenStore is None:
+            return None
+        try:
+            return self.tokenStore.load(self._account)
+        except TokenStoreError as error:
+            _LOGGER.warning("Session not loaded: %s", error)
+            return None
+
+    def saveSession(self) -> None:
+        """Saves the session to `tokenStore`, a failing store is logged and otherwise ignored."""
+        if self.tokenStore is None or not self.issueToken:
+            return
+        try:
+            self.tokenStore.save(self._account, self.exportSession())
+        except TokenStoreError as error:
+            _LOGGER.warning("Session not saved: %s", error)
+
+    def sharedSession(self) -> dict[str, Any] | None:
+        """Returns the session another process saved to `tokenStore`, if it differs from this one and is valid.
+
+        Returns:
+            dict[str, Any] | None: The session to take over instead of logging in or refreshing.
+        """
+        state = self.loadSession()
+        if not state or not state.get("issueToken") or not state.get("accessToken"):
+            return None
+        if state["accessToken"] == self.accessToken or float(state.get("expiresAt") or 0) <= time():
+            return None
+        return state
+
+    def _lock(self) -> ProcessLock | None:
+        if self.tokenStore is None:
+            return None
+        if self._sessionLock is None:
+            self._sessionLock = self.tokenStore.lock(self._account)
+        return self._sessionLock
+
+    def sessionLock(self) -> AbstractContextManager[bool]:
+        """Returns a context manager holding the lock of the account across the processes sharing `tokenStore`.
+
+        Returns:
+            AbstractContextManager[bool]: The lock context, False if the lock is not shared or not taken in time.
+        """
+        lock = self._lock()
+        return nullcontext(False) if lock is None else lock.hold()
 
     def getApiKey(self):
         """Returns the API key.
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Union
+from collections.abc import Callable
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Any, ClassVar, Union, get_args, get_type_hints
 
 from dataclasses_json import DataClassJsonMixin, config, dataclass_json
 
@@ -94,3 +95,142 @@ class ChatsNew(DataClassJsonMixin):
 @dataclass
 class Chats(DataClassJsonMixin):
     chatsNew: Union[ChatsNew, None] = None  # noqa: N815
+
+
+# Fast decoding path for chat pages: `__slots__` classes with the fields of the models above, decoded by a
+# per-class decoder compiled once from the model's fields. It applies the same coercions as `from_dict`.
+
+
+class _SlotsModel:
+    __slots__ = ()
+
+    _decode: ClassVar[Callable[[dict[str, Any]], Any]]
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]):
+        return cls._decode(raw)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the same dict as `to_dict` of the matching dataclass model."""
+        return {name: _to_dict(getattr(self, name)) for name in self.__slots__}
+
+
+def _to_dict(value: Any) -> Any:
+    if isinstance(value, _SlotsModel):
+        return value.to_dict()
+    if isinstance(value, list):
+        return [_to_dict(item) for item in value]
+    return value
+
+
+def _coerce(kind: type) -> Callable[[Any], Any]:
+    def coerce(value: Any) -> Any:
+        return value if isinstance(value, kind) else kind(value)
+
+    return coerce
+
+
+def _compile_decoder(fast_cls: type[_SlotsModel], model_cls: type) -> Callable[[dict[str, Any]], Any]:
+    """Build the decoder of `fast_cls` from the fields, defaults and decoders of the dataclass `model_cls`."""
+    hints = get_type_hints(model_cls)
+    spec = []
+    for model_field in fields(model_cls):
+        decode = (model_field.metadata.get("dataclasses_json") or {}).get("decoder")
+        if decode is None:
+            kind = next((arg for arg in get_args(hints[model_field.name]) if arg is not type(None)), None)
+            if kind in _FAST_MODELS:
+                decode = _FAST_MODELS[kind].from_dict
+            elif kind in (str, int, float, bool):
+                decode = _coerce(kind)
+        default = None if model_field.default is MISSING else model_field.default
+        spec.append((model_field.name, default, decode, getattr(fast_cls, model_field.name).__set__))
+    steps = tuple(spec)
+    new = object.__new__
+
+    def decode_raw(raw: dict[str, Any]) -> Any:
+        obj = new(fast_cls)
+        get = raw.get
+        for name, default, decode, set_value in steps:
+            value = get(name, MISSING)
+            if value is MISSING:
+                value = default
+            elif value is not None and decode is not None:
+                value = decode(value)
+            set_value(obj, value)
+        return obj
+
+    return decode_raw
+
+
+@dataclass(slots=True)
+class FastSmallChat(_SlotsModel):
+    msgId: Union[str, None] = None  # noqa: N815
+    type: Union[str, None] = ChatType.UNKNOWN__.value
+    sender_id: Union[str, None] = None
+    sender_name: Union[str, None] = None
+    receiver_id: Union[str, None] = None
+    receiver_name: Union[str, None] = None
+    data_text: Union[str, None] = None
+    data_sender_name: Union[str, None] = None
+    create: Union[str, None] = None
+    emoticon_id: Union[str, None] = Emoticon.UNKNOWN__.value
+    delete_flag: int = 0
+
+
+@dataclass(slots=True)
+class FastUser(_SlotsModel):
+    id: Union[str, None] = None
+    userId: Union[str, None] = None  # noqa: N815
+    name: Union[str, None] = None
+    phoneNumber: Union[str, None] = None  # noqa: N815
+
+
+@dataclass(slots=True)
+class FastData(_SlotsModel):
+    tm: Union[int, None] = None
+    sender_name: Union[str, None] = None
+    text: Union[str, None] = None
+    Text: Union[str, None] = None
+    battery: Union[int, None] = None
+    poi: Union[str, None] = None
+    city: Union[str, None] = None
+    address: Union[str, None] = None
+    province: Union[str, None] = None
+    locate_type: Union[str, None] = None
+    emoticon_id: Union[str, int, None] = Emoticon.UNKNOWN__.value
+    emoji_id: Union[str, int, None] = Emoticon.UNKNOWN__.value
+    call_name: Union[str, None] = None
+    call_time: Union[int, None] = None
+    call_type: Union[int, None] = None
+    lat: Union[float, None] = None
+    lng: Union[float, None] = None
+    radius: Union[int, None] = None
+    delete_flag: Union[int, None] = 0
+
+
+@dataclass(slots=True)
+class FastSimpleChat(_SlotsModel):
+    id: Union[str, None] = None
+    msgId: Union[str, None] = None  # noqa: N815
+    readFlag: Union[int, None] = None  # noqa: N815
+    sender: Union[FastUser, None] = None
+    receiver: Union[FastUser, None] = None
+    data: Union[FastData, None] = None
+    create: Union[int, None] = None
+    type: Union[str, None] = ChatType.UNKNOWN__.value
+
+
+@dataclass(slots=True)
+class FastChatsNew(_SlotsModel):
+    list: list[FastSimpleChat] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> FastChatsNew:
+        decode = FastSimpleChat._decode
+        return cls([decode(item) for item in raw.get("list") or []])
+
+
+_FAST_MODELS: dict[type, type[_SlotsModel]] = {}
+for _fast_cls, _model_cls in ((FastSmallChat, SmallChat), (FastUser, User), (FastData, Data), (FastSimpleChat, SimpleChat)):
+    _FAST_MODELS[_model_cls] = _fast_cls
+    _fast_cls._decode = _compile_decoder(_fast_cls, _model_cls)
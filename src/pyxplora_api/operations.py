@@ -0,0 +1,114 @@
+"""Registry of the GraphQL documents, pre-encoded once with their sha256 hash for persisted queries."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from functools import lru_cache
+import hashlib
+from typing import Any
+
+from . import gql_mutations as gm, gql_queries as gq
+from .codec import STDLIB_CODEC, JsonCodec
+
+PERSISTED_QUERY_VERSION = 1
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+
+_ERROR_CODES = {
+    "PERSISTED_QUERY_NOT_FOUND": PERSISTED_QUERY_NOT_FOUND,
+    "PERSISTED_QUERY_NOT_SUPPORTED": PERSISTED_QUERY_NOT_SUPPORTED,
+}
+
+
+@dataclass(frozen=True)
+class Operation:
+    """A GraphQL document with its encoded parts.
+
+    Attributes:
+        query (str): The document.
+        sha256 (str): The hex sha256 of the document, the id of an automatic persisted query.
+        encoded_query (bytes): The document encoded as JSON string.
+        encoded_extensions (bytes): The `persistedQuery` extension referring to the document, encoded as JSON.
+    """
+
+    query: str
+    sha256: str
+    encoded_query: bytes
+    encoded_extensions: bytes
+
+    @classmethod
+    def build(cls, query: str) -> Operation:
+        """Encode a document and compute its hash."""
+        sha256 = hashlib.sha256(query.encode()).hexdigest()
+        extensions = {"persistedQuery": {"version": PERSISTED_QUERY_VERSION, "sha256Hash": sha256}}
+        return cls(query, sha256, STDLIB_CODEC.dumps(query), STDLIB_CODEC.dumps(extensions))
+
+
+def _documents() -> Iterator[str]:
+    for module in (gq, gm):
+        for name, table in vars(module).items():
+            if name.isupper() and isinstance(table, dict):
+                yield from (query for query in table.values() if isinstance(query, str) and query)
+
+
+# built at import, keyed by the document text handed to `GraphqlClient`
+REGISTRY: dict[str, Operation] = {query: Operation.build(query) for query in _documents()}
+
+
+@lru_cache(maxsize=256)
+def _build(query: str) -> Operation:
+    return Operation.build(query)
+
+
+def operation_for(query: str) -> Operation:
+    """Return the registered operation of a document, documents built at runtime (e.g. batches) are cached."""
+    operation = REGISTRY.get(query)
+    return operation if operation is not None else _build(query)
+
+
+def request_body(
+    operation: Operation,
+    variables: dict[str, Any] | None = None,
+    operation_name: str | None = None,
+    codec: JsonCodec = STDLIB_CODEC,
+    include_query: bool = True,
+    persisted: bool = False,
+) -> bytes:
+    """Encode a GraphQL request body from the pre-encoded parts of the operation.
+
+    Args:
+        operation (Operation): The operation.
+        variables (dict[str, Any], optional): The variables, omitted when empty.
+        operation_name (str, optional): The operation name, omitted when empty.
+        codec (JsonCodec, optional): The codec encoding the variables. Defaults to STDLIB_CODEC.
+        include_query (bool, optional): Send the document text. Defaults to True.
+        persisted (bool, optional): Send the `persistedQuery` extension. Defaults to False.
+
+    Returns:
+        bytes: The JSON body.
+    """
+    parts = []
+    if include_query or not persisted:
+        parts.append(b'"query":' + operation.encoded_query)
+    if variables:
+        parts.append(b'"variables":' + codec.dumps(variables))
+    if operation_name:
+        parts.append(b'"operationName":' + codec.dumps(operation_name))
+    if persisted:
+        parts.append(b'"extensions":' + operation.encoded_extensions)
+    return b"{" + b",".join(parts) + b"}"
+
+
+def persisted_query_error(response: Any) -> str | None:
+    """Return `PERSISTED_QUERY_NOT_FOUND` or `PERSISTED_QUERY_NOT_SUPPORTED` if the response reports it."""
+    if not isinstance(response, dict):
+        return None
+    for error in response.get("errors") or []:
+        message = error.get("message")
+        if message in (PERSISTED_QUERY_NOT_FOUND, PERSISTED_QUERY_NOT_SUPPORTED):
+            return message
+        code = _ERROR_CODES.get((error.get("extensions") or {}).get("code", ""))
+        if code is not None:
+            return code
+    return None
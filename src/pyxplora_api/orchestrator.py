@@ -0,0 +1,170 @@
+"""Run many accounts in one event loop, sharing one connection pool and the cache of account independent data."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable, Iterator
+import logging
+from typing import Any, TypeVar
+
+from .cache import ResponseCache
+from .const import ENDPOINT
+from .graphql_client import GraphqlClient
+from .pyxplora_api_async import PyXploraApi
+from .rate_limit import RateLimiter
+from .single_flight import SingleFlight
+from .token_store import TokenStore
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_ACCOUNT_CONCURRENCY = 8
+
+T = TypeVar("T")
+
+
+class AccountManager:
+    """Hold many `PyXploraApi` accounts with isolated state in one event loop.
+
+    All accounts send through one `GraphqlClient`, so they share its connection pool, and fetch and cache the
+    responses of `SHARED_OPERATIONS` (countries, watch groups, app version) once for all of them. Jobs started with
+    `run` are scheduled fairly: at most `max_concurrency` accounts are worked on at a time, waiting accounts are
+    served in order and every run starts one account further than the run before, so no account always comes last.
+
+    Args:
+        gql_client (GraphqlClient, optional): The client of all accounts. Defaults to a client owned by the manager.
+        shared_cache (ResponseCache, optional): The cache of the account independent responses. Defaults to a new cache.
+        max_concurrency (int, optional): Accounts worked on at a time. Defaults to DEFAULT_ACCOUNT_CONCURRENCY.
+        token_store (TokenStore, optional): The store the sessions of all accounts are saved to.
+        rate_limiter (RateLimiter, optional): The limiter all accounts wait for, with a bucket per account.
+            Defaults to a new `RateLimiter`.
+        **options: Further keyword arguments of `PyXploraApi` used for every account, e.g. `retry_policy`.
+
+    Attributes:
+        runs (int): Number of jobs run.
+        failures (int): Number of jobs which raised.
+    """
+
+    def __init__(
+        self,
+        gql_client: GraphqlClient | None = None,
+        shared_cache: ResponseCache | None = None,
+        max_concurrency: int = DEFAULT_ACCOUNT_CONCURRENCY,
+        token_store: TokenStore | None = None,
+        rate_limiter: RateLimiter | None = None,
+        **options: Any,
+    ) -> None:
+        self._owns_client = gql_client is None
+        self.gql_client = GraphqlClient(endpoint=ENDPOINT) if gql_client is None else gql_client
+        self.sharedCache = ResponseCache() if shared_cache is None else shared_cache
+        self._sharedFlight = SingleFlight()
+        self.tokenStore = token_store
+        self.rateLimiter = RateLimiter() if rate_limiter is None else rate_limiter
+        if self.gql_client.rate_limiter is None:
+            self.gql_client.rate_limiter = self.rateLimiter
+        self._options = options
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        self._accounts: dict[str, PyXploraApi] = {}
+        self._cursor = 0
+        self.runs = 0
+        self.failures = 0
+
+    async def __aenter__(self) -> AccountManager:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    def __len__(self) -> int:
+        return len(self._accounts)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._accounts
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(list(self._accounts))
+
+    def __getitem__(self, name: str) -> PyXploraApi:
+        return self._accounts[name]
+
+    def add(
+        self,
+        name: str,
+        countrycode: str = "",
+        phoneNumber: str = "",
+        password: str = "",
+        userLang: str = "",
+        timeZone: str = "",
+        **kwargs: Any,
+    ) -> PyXploraApi:
+        """Add an account, it is signed in by `init` or its first request.
+
+        Args:
+            name (str): The name the account is addressed by.
+            countrycode, phoneNumber, password, userLang, timeZone: As for `PyXploraApi`.
+            **kwargs: Further keyword arguments of `PyXploraApi`, overriding the options of the manager.
+
+        Returns:
+            PyXploraApi: The account.
+
+        Raises:
+            ValueError: If an account of this name was already added.
+        """
+        if name in self._accounts:
+            raise ValueError(f"Account {name!r} already added")
+        options = {"token_store": self.tokenStore, "rate_limiter": self.rateLimiter, **self._options, **kwargs}
+        api = PyXploraApi(countrycode, phoneNumber, password, userLang, timeZone, gql_client=self.gql_client, **options)
+        api._gql_handler.sharedCache = self.sharedCache
+        api._gql_handler.sharedFlight = self._sharedFlight
+        self._accounts[name] = api
+        return api
+
+    async def remove(self, name: str) -> None:
+        """Remove an account and stop its background work."""
+        api = self._accounts.pop(name, None)
+        if api is not None:
+            await api.aclose()
+
+    async def run(
+        self, job: Callable[[PyXploraApi], Awaitable[T]], names: Iterable[str] | None = None
+    ) -> dict[str, T | Exception]:
+        """Run a job for several accounts, bounded by `max_concurrency`.
+
+        Args:
+            job (Callable): Coroutine function taking the account.
+            names (Iterable[str], optional): The accounts. Defaults to all accounts.
+
+        Returns:
+            dict[str, T | Exception]: The result of every account, or the exception its job raised.
+        """
+        order = list(self._accounts) if names is None else [name for name in names if name in self._accounts]
+        if order:
+            start = self._cursor % len(order)
+            order = order[start:] + order[:start]
+            self._cursor = start + 1
+        results = await asyncio.gather(*(self._run(name, job) for name in order))
+        return dict(zip(order, results))
+
+    async def _run(self, name: str, job: Callable[[PyXploraApi], Awaitable[T]]) -> T | Exception:
+        async with self._semaphore:
+            self.runs += 1
+            try:
+                return await job(self._accounts[name])
+            except Exception as error:
+                self.failures += 1
+                _LOGGER.debug("Job of account %s failed: %s", name, error)
+                return error
+
+    async def init(self, forceLogin: bool = False, names: Iterable[str] | None = None) -> dict[str, None | Exception]:
+        """Sign in the accounts and load their watches."""
+        return await self.run(lambda api: api.init(forceLogin), names)
+
+    async def refresh(self, names: Iterable[str] | None = None) -> dict[str, list[str] | Exception]:
+        """Reload the devices of the accounts, see `PyXploraApi.setDevices`."""
+        return await self.run(lambda api: api.setDevices(), names)
+
+    async def aclose(self) -> None:
+        """Close all accounts and the shared client if the manager owns it."""
+        accounts, self._accounts = self._accounts, {}
+        await asyncio.gather(*(api.aclose() for api in accounts.values()), return_exceptions=True)
+        if self._owns_client:
+            await self.gql_client.aclose()
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from time import time
+from datetime import datetime
+from time import sleep, time
 from typing import Any
 
 from .exception_classes import ChildNoError, ErrorMSG, XTypeError
+from .model import FastSimpleChat
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .status import Emoji
+from .token_store import TokenStore
 
 
 class PyXplora:
@@ -15,18 +20,22 @@ class PyXplora:
     error_message (str): A string representing the error message, if Any.
     tokenExpiresAfter (int): An integer representing the time in seconds after which the token will expire.
     maxRetries (int): The maximum number of retries in case of API failure.
-    retryDelay (int): The time in seconds to wait between retries.
-    device (dict[str, Any]): A dictionary representing the device details, if Any.
+    retryDelay (int): The time in seconds to wait before the first retry, later retries back off exponentially.
+    retryPolicy (RetryPolicy): The backoff policy of the retries, built from `maxRetries` and `retryDelay`.
+    tokenStore (TokenStore | None): The store the session is saved to and resumed from, if Any.
+    rateLimiter (RateLimiter | None): The limiter throttling the requests, if Any.
+    device (dict[str, Any]): A dictionary representing the device details, if Any, a `DeviceSnapshot` per watch in
+        the async client.
     watchs (list[Any]): A list of dictionaries representing the watch details, if Any.
     """
 
-    _gql_handler: Any = None
+    _gql_handler: Any
     error_message: str | ErrorMSG = ""
     tokenExpiresAfter = 240  # noqa: N815
     maxRetries = 3  # noqa: N815
     retryDelay = 2  # noqa: N815
-    device: dict[str, Any] = {}
-    watchs: list[Any] = []
+    device: dict[str, Any]
+    watchs: list[Any]
 
     def __init__(
         self,
@@ -38,6 +47,7 @@ class PyXplora:
         childPhoneNumber: list[str] | None = None,
         wuid: str | list | None = None,
         email: str | None = None,
+        token_store: TokenStore | None = None,
     ) -> None:
         """Initialize the instance with the user's account information.
 
@@ -50,10 +60,16 @@ class PyXplora:
             childPhoneNumber (list[str], optional): A list of phone numbers for the children of the user.
             wuid (str | list | None, optional): The ID of the watch or a list of IDs for the watches.
             email (str | None, optional): The email address of the user.
+            token_store (TokenStore | None, optional): Saves the session after a login, so a restart resumes it.
 
         Returns:
             None
         """
+        # per instance, several accounts may live in one process
+        self._gql_handler = None
+        self.device = {}
+        self.watchs = []
+
         self._countrycode = countrycode
         self._phoneNumber = phoneNumber
         self._email = email
@@ -65,7 +81,12 @@ class PyXplora:
 
         self._wuid = wuid
 
-        self.dtIssueToken = int(time()) - (self.tokenExpiresAfter * 1000)
+        self.retryPolicy = RetryPolicy.from_settings(self.maxRetries, self.retryDelay)
+
+        self.dtIssueToken = int(time()) - self.tokenExpiresAfter
+
+        self.tokenStore = token_store
+        self.rateLimiter: RateLimiter | None = None
 
         self._logoff()
 
@@ -92,21 +113,50 @@ class PyXplora:
         Returns:
             bool: True if the token has expired, False otherwise.
         """
-        return (int(time()) - self.dtIssueToken) > (self.tokenExpiresAfter * 1000)
+        return (int(time()) - self.dtIssueToken) > self.tokenExpiresAfter
+
+    def _useRateLimiter(self) -> None:
+        """Throttle the requests of the handler with `rateLimiter` and tell it the `Retry-After` of the server.
+
+        Returns:
+            None
+        """
+        if self.rateLimiter is None:
+            return
+        self._gql_handler.rateLimiter = self.rateLimiter
+        client = self._gql_handler._gql_client
+        if client.rate_limiter is None:
+            client.rate_limiter = self.rateLimiter
+
+    def _restoreSession(self) -> bool:
+        """Resume the session saved to the token store by an earlier process.
+
+        Returns:
+            bool: True if a session was restored, it may have expired meanwhile.
+        """
+        if self.tokenStore is None or not self._gql_handler:
+            return False
+        state = self._gql_handler.loadSession()
+        if not state or not state.get("issueToken") or not state.get("accessToken"):
+            return False
+        self._gql_handler.restoreSession(state)
+        self._issueToken = self._gql_handler.issueToken
+        self.dtIssueToken = int(self._gql_handler.issuedAt)
+        return True
 
     @staticmethod
     def delay(duration_in_seconds):
         """Delay the execution for a specified duration.
 
+        The calling thread sleeps, so waiting does not use any CPU.
+
         Args:
-            duration_in_seconds (int): The duration to delay in seconds.
+            duration_in_seconds (float): The duration to delay in seconds.
 
         Returns:
             None
         """
-        end_time = datetime.now() + timedelta(seconds=duration_in_seconds)
-        while datetime.now() < end_time:
-            pass
+        sleep(max(duration_in_seconds, 0))
 
     def getDevice(self, wuid: str):
         """Get the information for a specific watch.
@@ -427,3 +477,34 @@ class PyXplora:
         hours = str(int(t) // 60).zfill(2)
         minutes = str(int(t) % 60).zfill(2)
         return f"{hours}:{minutes}"
+
+    @staticmethod
+    def _isChatKept(chat: FastSimpleChat) -> bool:
+        """Return True if a message was not deleted."""
+        return chat.data is None or chat.data.delete_flag == 0
+
+    @staticmethod
+    def _decodeChatPage(raw: dict[str, Any], show_del_msg: bool = True, with_emoji_id: bool = True) -> list[FastSimpleChat]:
+        """Decode one page of the `Chats` query into `FastSimpleChat` objects.
+
+        Args:
+            raw (dict[str, Any]): The `data` of the `Chats` query.
+            show_del_msg (bool): Keep deleted messages.
+            with_emoji_id (bool): Replace the emoticon id with the emoji, the id is kept in `data.emoji_id`.
+
+        Returns:
+            list[FastSimpleChat]: The messages of the page, newest first.
+        """
+        chats: list[FastSimpleChat] = []
+        for item in ((raw or {}).get("chatsNew") or {}).get("list") or []:
+            chat = FastSimpleChat.from_dict(item)
+            if chat.data is not None:
+                if not show_del_msg and not PyXplora._isChatKept(chat):
+                    continue
+                if with_emoji_id:
+                    emoji = Emoji.__members__.get(f"M{chat.data.emoticon_id}")
+                    chat.data.emoji_id = chat.data.emoticon_id
+                    if emoji is not None:
+                        chat.data.emoticon_id = emoji.value
+            chats.append(chat)
+        return chats
@@ -1,22 +1,26 @@
 from __future__ import annotations
 
+from collections.abc import Iterator
 from datetime import datetime
 import logging
 from time import time
 from typing import Any, Optional
 
+from .const import DEFAULT_CHAT_PAGE_SIZE
 from .const_version import VERSION, VERSION_APP
-from .exception_classes import Error, ErrorMSG, LoginError, NoAdminError
+from .exception_classes import Error, ErrorMSG, LoginError, NoAdminError, RateLimitError
 from .gql_handler import GQLHandler
-from .model import Chats, ChatsNew, SmallChat, SmallChatList
+from .model import ChatsNew, FastChatsNew, FastSimpleChat, SmallChat, SmallChatList
 from .pyxplora import PyXplora
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
 from .status import (
-    Emoji,
     LocationType,
     NormalStatus,
     UserContactType,
     WatchOnlineStatus,
 )
+from .token_store import TokenStore
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -34,6 +38,9 @@ class PyXploraApi(PyXplora):
         childPhoneNumber: list[str] = None,
         wuid: str | list | None = None,
         email: str | None = None,
+        retry_policy: RetryPolicy | None = None,
+        token_store: TokenStore | None = None,
+        rate_limiter: RateLimiter | None = None,
     ) -> None:
         super().__init__(
             countrycode,
@@ -44,9 +51,25 @@ class PyXploraApi(PyXplora):
             childPhoneNumber,
             wuid,
             email,
+            token_store,
         )
+        if retry_policy is not None:
+            self.retryPolicy = retry_policy
+        self.rateLimiter = rate_limiter
+
+    def __enter__(self) -> PyXploraApi:
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the pooled HTTP connections held by this instance."""
+        if self._gql_handler is not None:
+            self._gql_handler.close()
 
     def initHandler(self, sign_up):
+        self.close()
         self._gql_handler: GQLHandler = GQLHandler(
             self._countrycode,
             self._phoneNumber,
@@ -55,25 +78,23 @@ class PyXploraApi(PyXplora):
             self._timeZone,
             self._email,
             sign_up,
+            retry_policy=self.retryPolicy,
         )
+        self._gql_handler.tokenStore = self.tokenStore
+        self._useRateLimiter()
 
     def _login(self, force_login: bool = False, sign_up: bool = True) -> dict[str, Any]:
+        if not force_login and not self._isConnected() and self._restoreSession() and not self._hasTokenExpired():
+            # resumed the session of an earlier process from the token store
+            return self._issueToken
         if not self._isConnected() or self._hasTokenExpired() or force_login:
-            retryCounter = 0
-            while not self._isConnected() and (retryCounter < self.maxRetries + 2):
-                retryCounter += 1
-
-                # Try to login
-                try:
-                    self._issueToken = self._gql_handler.login()
-                except LoginError as error:
-                    self.error_message = error.error_message
-                    retryCounter = self.maxRetries + 2
-                except Error:
-                    if retryCounter == self.maxRetries + 2:
-                        self.error_message = ErrorMSG.SERVER_ERR
-                    else:
-                        self.delay(self.retryDelay)
+            # failed requests are retried by the handler according to `retryPolicy`
+            try:
+                self._issueToken = self._gql_handler.login()
+            except LoginError as error:
+                self.error_message = error.error_message
+            except Error:
+                self.error_message = ErrorMSG.SERVER_ERR
 
             if self._issueToken:
                 self.dtIssueToken = int(time())
@@ -140,119 +161,99 @@ class PyXploraApi(PyXplora):
 
     ##### Contact Info #####
     def getWatchUserContacts(self, wuid: str) -> list[dict[str, Any]]:
-        retries = 0
         contacts = []
-        while retries < self.maxRetries + 2:
-            try:
-                raw_contacts = self._gql_handler.getWatchUserContacts(wuid)
-                raw_contacts = raw_contacts.get("contacts", {})
-                if not raw_contacts:
-                    continue
-                raw_contacts = raw_contacts.get("contacts", [])
-                for contact in raw_contacts:
-                    contactUser = contact.get("contactUser", {})
-                    if contactUser:
-                        xcoin = contactUser.get("xcoin", -1)
-                        id = contactUser.get("id", None)
-                        contacts.append(
-                            {
-                                "id": id,
-                                "guardianType": contact["guardianType"],
-                                "create": datetime.fromtimestamp(contact["create"]).strftime("%Y-%m-%d %H:%M:%S"),
-                                "update": datetime.fromtimestamp(contact["update"]).strftime("%Y-%m-%d %H:%M:%S"),
-                                "name": contact["name"],
-                                "phoneNumber": f'+{contact["countryPhoneNumber"]}{contact["phoneNumber"]}',
-                                "xcoin": xcoin,
-                            }
-                        )
-                break
-            except (Error, TypeError) as error:
-                _LOGGER.debug(error)
-                self.delay(self.retryDelay)
+        try:
+            raw_contacts = self._gql_handler.getWatchUserContacts(wuid).get("contacts", {})
+            for contact in (raw_contacts or {}).get("contacts", []):
+                contactUser = contact.get("contactUser", {})
+                if contactUser:
+                    xcoin = contactUser.get("xcoin", -1)
+                    id = contactUser.get("id", None)
+                    contacts.append(
+                        {
+                            "id": id,
+                            "guardianType": contact["guardianType"],
+                            "create": datetime.fromtimestamp(contact["create"]).strftime("%Y-%m-%d %H:%M:%S"),
+                            "update": datetime.fromtimestamp(contact["update"]).strftime("%Y-%m-%d %H:%M:%S"),
+                            "name": contact["name"],
+                            "phoneNumber": f'+{contact["countryPhoneNumber"]}{contact["phoneNumber"]}',
+                            "xcoin": xcoin,
+                        }
+                    )
+        except RateLimitError:
+            raise
+        except (Error, TypeError) as error:
+            _LOGGER.debug(error)
         return contacts
 
     def getWatchAlarm(self, wuid: str) -> list[dict[str, Any]]:
-        retry_counter = 0
         alarms: list[dict[str, Any]] = []
-
-        while retry_counter < self.maxRetries + 2:
-            try:
-                alarms_raw = self._gql_handler.getAlarmTime(wuid)
-                raw_alarms = alarms_raw.get("alarms", [])
-                if not raw_alarms:
-                    return []
-                for alarm in raw_alarms:
-                    alarms.append(
-                        {
-                            "id": alarm["id"],
-                            "vendorId": alarm["vendorId"],
-                            "name": alarm["name"],
-                            "start": self._helperTime(alarm["occurMin"]),
-                            "weekRepeat": alarm["weekRepeat"],
-                            "status": alarm["status"],
-                        }
-                    )
-                break
-            except Error as error:
-                retry_counter += 1
-                _LOGGER.debug(error)
-                self.delay(self.retryDelay)
+        try:
+            for alarm in self._gql_handler.getAlarmTime(wuid).get("alarms", []) or []:
+                alarms.append(
+                    {
+                        "id": alarm["id"],
+                        "vendorId": alarm["vendorId"],
+                        "name": alarm["name"],
+                        "start": self._helperTime(alarm["occurMin"]),
+                        "weekRepeat": alarm["weekRepeat"],
+                        "status": alarm["status"],
+                    }
+                )
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return alarms
 
     def loadWatchLocation(self, wuid: str = "", with_ask: bool = True) -> dict[str, Any]:
-        retry_counter = 0
         watch_location = {}
-        while retry_counter < self.maxRetries + 1:
-            try:
-                if with_ask:
-                    self.askWatchLocate(wuid)
-                location_raw = self._gql_handler.getWatchLastLocation(wuid)
-                _watch_last_locate = location_raw.get("watchLastLocate", {})
-                if not _watch_last_locate:
-                    return watch_location
-
-                _tm = 31532399 if _watch_last_locate.get("tm") is None else _watch_last_locate.get("tm")
-                _lat = _watch_last_locate.get("lat", "0.0")
-                _lng = _watch_last_locate.get("lng", "0.0")
-                _rad = _watch_last_locate.get("rad", -1)
-                _poi = _watch_last_locate.get("poi", "")
-                _city = _watch_last_locate.get("city", "")
-                _province = _watch_last_locate.get("province", "")
-                _country = _watch_last_locate.get("country", "")
-                _locate_type = (
-                    LocationType.UNKNOWN.value
-                    if _watch_last_locate.get("locateType") is None
-                    else _watch_last_locate.get("locateType")
-                )
-                _is_in_safe_zone = _watch_last_locate.get("isInSafeZone", False)
-                _safe_zone_label = _watch_last_locate.get("safeZoneLabel", "")
-                _watch_battery = _watch_last_locate.get("battery", -1)
-                _watch_charging = _watch_last_locate.get("isCharging", False)
-
-                watch_location = {
-                    "tm": datetime.fromtimestamp(_tm).strftime("%Y-%m-%d %H:%M:%S"),
-                    "lat": _lat,
-                    "lng": _lng,
-                    "rad": _rad,
-                    "poi": _poi,
-                    "city": _city,
-                    "province": _province,
-                    "country": _country,
-                    "locateType": _locate_type,
-                    "isInSafeZone": _is_in_safe_zone,
-                    "safeZoneLabel": _safe_zone_label,
-                    "watch_battery": _watch_battery,
-                    "watch_charging": _watch_charging,
-                    "watch_last_location": _watch_last_locate,
-                }
+        try:
+            if with_ask:
+                self.askWatchLocate(wuid)
+            location_raw = self._gql_handler.getWatchLastLocation(wuid)
+            _watch_last_locate = location_raw.get("watchLastLocate", {})
+            if not _watch_last_locate:
                 return watch_location
 
-            except Error as error:
-                _LOGGER.debug(error)
-                retry_counter += 1
-
-                self.delay(self.retryDelay)
-
+            _tm = 31532399 if _watch_last_locate.get("tm") is None else _watch_last_locate.get("tm")
+            _lat = _watch_last_locate.get("lat", "0.0")
+            _lng = _watch_last_locate.get("lng", "0.0")
+            _rad = _watch_last_locate.get("rad", -1)
+            _poi = _watch_last_locate.get("poi", "")
+            _city = _watch_last_locate.get("city", "")
+            _province = _watch_last_locate.get("province", "")
+            _country = _watch_last_locate.get("country", "")
+            _locate_type = (
+                LocationType.UNKNOWN.value
+                if _watch_last_locate.get("locateType") is None
+                else _watch_last_locate.get("locateType")
+            )
+            _is_in_safe_zone = _watch_last_locate.get("isInSafeZone", False)
+            _safe_zone_label = _watch_last_locate.get("safeZoneLabel", "")
+            _watch_battery = _watch_last_locate.get("battery", -1)
+            _watch_charging = _watch_last_locate.get("isCharging", False)
+
+            watch_location = {
+                "tm": datetime.fromtimestamp(_tm).strftime("%Y-%m-%d %H:%M:%S"),
+                "lat": _lat,
+                "lng": _lng,
+                "rad": _rad,
+                "poi": _poi,
+                "city": _city,
+                "province": _province,
+                "country": _country,
+                "locateType": _locate_type,
+                "isInSafeZone": _is_in_safe_zone,
+                "safeZoneLabel": _safe_zone_label,
+                "watch_battery": _watch_battery,
+                "watch_charging": _watch_charging,
+                "watch_last_location": _watch_last_locate,
+            }
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return watch_location
 
     def getWatchBattery(self, wuid: str) -> int:
@@ -264,20 +265,15 @@ class PyXploraApi(PyXplora):
         return watch_c.get("watch_charging", False)
 
     def getWatchOnlineStatus(self, wuid: str) -> str:
-        retries = 0
         status = WatchOnlineStatus.UNKNOWN
-
-        while status is WatchOnlineStatus.UNKNOWN and retries < self.maxRetries + 2:
-            try:
-                ask_raw = self.askWatchLocate(wuid)
-                track_raw = self.getTrackWatchInterval(wuid)
-                status = WatchOnlineStatus.ONLINE if ask_raw or track_raw != -1 else WatchOnlineStatus.OFFLINE
-            except Error as error:
-                _LOGGER.debug(error)
-                retries += 1
-            if status is WatchOnlineStatus.UNKNOWN:
-                self.delay(self.retryDelay)
-
+        try:
+            ask_raw = self.askWatchLocate(wuid)
+            track_raw = self.getTrackWatchInterval(wuid)
+            status = WatchOnlineStatus.ONLINE if ask_raw or track_raw != -1 else WatchOnlineStatus.OFFLINE
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return status.value
 
     def getWatchUnReadChatMsgCount(self, wuid: str) -> int:
@@ -286,6 +282,8 @@ class PyXploraApi(PyXplora):
             if isinstance(unread_count, dict):
                 return unread_count.get("unReadChatMsgCount", -1)
             return -1
+        except RateLimitError:
+            raise
         except Error as e:
             _LOGGER.error("Error getting unread chat message count: %s", e)
             return -1
@@ -299,43 +297,34 @@ class PyXploraApi(PyXplora):
         show_del_msg: bool = True,
         asObject=False,
     ) -> list[dict[str, Any]] | SmallChatList:
-        retry_counter = 0
         chats: list[dict[str, Any]] = []
-
-        while not chats and retry_counter < self.maxRetries + 2:
-            retry_counter += 1
-            try:
-                _chats_new = self.getWatchChatsRaw(wuid, offset, limit, msgId, show_del_msg, asObject)
-                if isinstance(_chats_new, dict):
-                    _chats_new = ChatsNew.from_dict(_chats_new)
-
-                _list = _chats_new.list
-                if not _list:
-                    continue
-
-                for chat in _list:
-                    _chat = {
-                        "msgId": chat.msgId,
-                        "type": chat.type,
-                        "sender_id": chat.sender.id,
-                        "sender_name": chat.sender.name,
-                        "receiver_id": chat.receiver.id,
-                        "receiver_name": chat.receiver.name,
-                        "data_text": chat.data.text,
-                        "data_sender_name": chat.data.sender_name,
-                        "create": datetime.fromtimestamp(chat.create).strftime("%Y-%m-%d %H:%M:%S"),
-                        "delete_flag": chat.data.delete_flag,
-                        "emoticon_id": chat.data.emoticon_id,
-                    }
-                    if asObject:
-                        chats.append(SmallChat.from_dict(_chat))
-                    else:
-                        chats.append(_chat)
-            except Error as error:
-                _LOGGER.debug(error)
-
-            if not chats:
-                self.delay(self.retryDelay)
+        try:
+            _chats_new = self.getWatchChatsRaw(wuid, offset, limit, msgId, show_del_msg, asObject)
+            if isinstance(_chats_new, dict):
+                _chats_new = FastChatsNew.from_dict(_chats_new)
+
+            for chat in _chats_new.list or []:
+                _chat = {
+                    "msgId": chat.msgId,
+                    "type": chat.type,
+                    "sender_id": chat.sender.id,
+                    "sender_name": chat.sender.name,
+                    "receiver_id": chat.receiver.id,
+                    "receiver_name": chat.receiver.name,
+                    "data_text": chat.data.text,
+                    "data_sender_name": chat.data.sender_name,
+                    "create": datetime.fromtimestamp(chat.create).strftime("%Y-%m-%d %H:%M:%S"),
+                    "delete_flag": chat.data.delete_flag,
+                    "emoticon_id": chat.data.emoticon_id,
+                }
+                if asObject:
+                    chats.append(SmallChat.from_dict(_chat))
+                else:
+                    chats.append(_chat)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
 
         if asObject:
             return SmallChatList(chats)
@@ -351,39 +340,53 @@ class PyXploraApi(PyXplora):
         asObject=False,
         with_emoji_id=True,
     ) -> dict | ChatsNew:
-        retry_counter = 0
         chats_new: dict = {}
-        while not chats_new and retry_counter < self.maxRetries + 2:
-            retry_counter += 1
-            try:
-                result = self._gql_handler.chats(wuid, offset, limit, msgId, asObject)
-                if not result:
-                    continue
-                if isinstance(result, dict):
-                    result = ChatsNew.from_dict(result.get("chatsNew", None))
-                elif isinstance(result, Chats):
-                    result = result.chatsNew
-
-                if result is None:
-                    continue
-
-                if with_emoji_id:
-                    for d in result.list:
-                        d.data.emoji_id = d.data.emoticon_id
-                        d.data.emoticon_id = Emoji[f"M{d.data.emoticon_id}"].value
-
-                result = ChatsNew.from_dict(result)
-
-                filtered_chats = [chat for chat in result.list if show_del_msg or chat.data.delete_flag == 0]
-                chats_new = ChatsNew(filtered_chats).to_dict()
-            except Error as error:
-                _LOGGER.debug(error)
-
-            if not chats_new:
-                self.delay(self.retryDelay)
+        try:
+            result = self._gql_handler.chats(wuid, offset, limit, msgId)
+            if isinstance(result, dict) and result.get("chatsNew"):
+                chats = self._decodeChatPage(result, with_emoji_id=with_emoji_id)
+                chats_new = {"list": [chat.to_dict() for chat in chats if show_del_msg or self._isChatKept(chat)]}
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
 
         return ChatsNew.from_dict(chats_new, infer_missing=True) if asObject else chats_new
 
+    def iterWatchChats(
+        self,
+        wuid: str,
+        page_size: int = DEFAULT_CHAT_PAGE_SIZE,
+        show_del_msg: bool = True,
+        with_emoji_id: bool = True,
+    ) -> Iterator[FastSimpleChat]:
+        """Iterate over the whole chat history of a watch, newest message first.
+
+        Pages are requested with the `msgId` of the last message as cursor, only one page is held in memory.
+
+        Args:
+            wuid (str): The watch user id.
+            page_size (int, optional): Messages per request. Defaults to DEFAULT_CHAT_PAGE_SIZE.
+            show_del_msg (bool, optional): Yield deleted messages too. Defaults to True.
+            with_emoji_id (bool, optional): Replace the emoticon id with the emoji. Defaults to True.
+
+        Yields:
+            FastSimpleChat: The messages.
+        """
+        cursor = ""
+        while True:
+            raw = self._gql_handler.chats(wuid, 0, page_size, cursor)
+            page = ((raw or {}).get("chatsNew") or {}).get("list") or []
+            if not page:
+                return
+            for chat in self._decodeChatPage({"chatsNew": {"list": page}}, show_del_msg, with_emoji_id):
+                if chat.msgId != cursor:
+                    yield chat
+            last = page[-1].get("msgId") or ""
+            if len(page) < page_size or last == cursor:
+                return
+            cursor = last
+
     ##### Watch Location Info #####
     def getWatchLastLocation(self, wuid: str, withAsk: bool = False) -> dict[str, Any]:
         loc = self.loadWatchLocation(wuid, withAsk)
@@ -403,31 +406,24 @@ class PyXploraApi(PyXplora):
         return self.getWatchLocate(wuid).get("safeZoneLabel", "")
 
     def getWatchSafeZones(self, wuid: str) -> list[dict[str, Any]]:
-        retry_counter = 0
         safe_zones = []
-        while retry_counter < self.maxRetries + 2:
-            try:
-                safe_zones_raw = self._gql_handler.safeZones(wuid)
-                _safe_zones = safe_zones_raw.get("safeZones", [])
-                if not _safe_zones:
-                    return []
-                safe_zones = [
-                    {
-                        "vendorId": sz["vendorId"],
-                        "groupName": sz["groupName"],
-                        "name": sz["name"],
-                        "lat": sz["lat"],
-                        "lng": sz["lng"],
-                        "rad": sz["rad"],
-                        "address": sz["address"],
-                    }
-                    for sz in _safe_zones
-                ]
-                break
-            except Error as error:
-                _LOGGER.debug(error)
-                retry_counter += 1
-                self.delay(self.retryDelay)
+        try:
+            safe_zones = [
+                {
+                    "vendorId": sz["vendorId"],
+                    "groupName": sz["groupName"],
+                    "name": sz["name"],
+                    "lat": sz["lat"],
+                    "lng": sz["lng"],
+                    "rad": sz["rad"],
+                    "address": sz["address"],
+                }
+                for sz in self._gql_handler.safeZones(wuid).get("safeZones", []) or []
+            ]
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return safe_zones
 
     def getTrackWatchInterval(self, wuid: str) -> int:
@@ -438,67 +434,44 @@ class PyXploraApi(PyXplora):
 
     ##### Feature #####
     def getSilentTime(self, wuid: str) -> list[dict[str, Any]]:
-        retry_counter = 0
-        data_ok: list[dict[str, Any]] = []
-        silent_times_raw: dict[str, Any] = {}
         school_silent_mode: list[dict[str, Any]] = []
-        while not data_ok and (retry_counter < self.maxRetries + 2):
-            retry_counter += 1
-            try:
-                silent_times_raw = self._gql_handler.silentTimes(wuid)
-                _silent_times = silent_times_raw.get("silentTimes", [])
-                if not _silent_times:
-                    data_ok.append({})
-                    return school_silent_mode
-                for silent_time in _silent_times:
-                    school_silent_mode.append(
-                        {
-                            "id": silent_time["id"],
-                            "vendorId": silent_time["vendorId"],
-                            "start": self._helperTime(silent_time["start"]),
-                            "end": self._helperTime(silent_time["end"]),
-                            "weekRepeat": silent_time["weekRepeat"],
-                            "status": silent_time["status"],
-                        }
-                    )
-            except Error as error:
-                _LOGGER.debug(error)
-            data_ok = school_silent_mode
-            if not data_ok:
-                self.delay(self.retryDelay)
+        try:
+            for silent_time in self._gql_handler.silentTimes(wuid).get("silentTimes", []) or []:
+                school_silent_mode.append(
+                    {
+                        "id": silent_time["id"],
+                        "vendorId": silent_time["vendorId"],
+                        "start": self._helperTime(silent_time["start"]),
+                        "end": self._helperTime(silent_time["end"]),
+                        "weekRepeat": silent_time["weekRepeat"],
+                        "status": silent_time["status"],
+                    }
+                )
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return school_silent_mode
 
     def setEnableSilentTime(self, silent_id: str) -> bool:
-        retries = 0
-        result = ""
-
-        while not result and retries < self.maxRetries + 2:
-            retries += 1
-            try:
-                response = self._gql_handler.setEnableSilentTime(silent_id)
-                result = response.get("setEnableSilentTime", False)
-            except Error as error:
-                _LOGGER.debug(error)
-
-            if not result:
-                self.delay(self.retryDelay)
-
+        result = False
+        try:
+            result = self._gql_handler.setEnableSilentTime(silent_id).get("setEnableSilentTime", False)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return bool(result)
 
     def setDisableSilentTime(self, silent_id: str) -> bool:
-        retry_counter = 0
-        result = ""
-
-        while not result and retry_counter < self.maxRetries + 2:
-            retry_counter += 1
-            try:
-                disable_raw = self._gql_handler.setEnableSilentTime(silent_id, NormalStatus.DISABLE.value)
-                result = disable_raw.get("setEnableSilentTime", False)
-            except Error as error:
-                _LOGGER.debug(error)
-            if not result:
-                self.delay(self.retryDelay)
-
+        result = False
+        try:
+            disable_raw = self._gql_handler.setEnableSilentTime(silent_id, NormalStatus.DISABLE.value)
+            result = disable_raw.get("setEnableSilentTime", False)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return bool(result)
 
     def setAllEnableSilentTime(self, wuid: str) -> list[bool]:
@@ -517,20 +490,13 @@ class PyXploraApi(PyXplora):
         return results
 
     def setAlarmTime(self, alarm_id: str, status: NormalStatus) -> bool:
-        retryCounter = 0
-        result = ""
-        while not result and (retryCounter < self.maxRetries + 2):
-            retryCounter += 1
-            try:
-                raw = self._gql_handler.setEnableAlarmTime(alarm_id, status.value)
-                modifyAlarm = raw.get("modifyAlarm", -1)
-                if not modifyAlarm:
-                    return False
-                result = modifyAlarm
-            except Error as error:
-                _LOGGER.debug(error)
-            if not result:
-                self.delay(self.retryDelay)
+        result = False
+        try:
+            result = self._gql_handler.setEnableAlarmTime(alarm_id, status.value).get("modifyAlarm", False)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return bool(result)
 
     def setEnableAlarmTime(self, alarm_id: str) -> bool:
@@ -575,28 +541,20 @@ class PyXploraApi(PyXplora):
         return c.get("followRequestWatchCount", 0)
 
     def getWatches(self, wuid: str) -> dict[str, Any]:
-        retryCounter = 0
-        watches_raw: dict[str, Any] = {}
         watch: dict[str, Any] = {}
-        while not watch and (retryCounter < self.maxRetries + 2):
-            retryCounter += 1
-            try:
-                watches_raw = self._gql_handler.getWatches(wuid)
-                _watches: list[dict[str, Any]] = watches_raw.get("watches", [])
-                if not _watches:
-                    return watch
+        try:
+            _watches: list[dict[str, Any]] = self._gql_handler.getWatches(wuid).get("watches", [])
+            if _watches:
                 watch = {
                     "imei": _watches[0]["swKey"],
                     "osVersion": _watches[0]["osVersion"],
                     "qrCode": _watches[0]["qrCode"],
                     "model": _watches[0]["groupName"],
                 }
-                if watch:
-                    return watch
-            except Error as error:
-                _LOGGER.debug(error)
-            if not watch:
-                self.delay(self.retryDelay)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return watch
 
     def getSWInfo(self, wuid: str, watches: Optional[dict[str, Any]] = None) -> dict[str, Any]:
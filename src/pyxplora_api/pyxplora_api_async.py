@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import AsyncIterator, Iterable
 from datetime import datetime
 import json
 import logging
@@ -9,28 +10,53 @@ from typing import Any, Optional
 
 import aiohttp
 
+from . import gql_queries as gq
+from .cache import ResponseCache
+from .const import (
+    DEFAULT_CHAT_PAGE_SIZE,
+    DEFAULT_DEVICE_TIMEOUT,
+    DEFAULT_LOCATE_MAX_POLL_INTERVAL,
+    DEFAULT_LOCATE_POLL_INTERVAL,
+    DEFAULT_LOCATE_TIMEOUT,
+)
 from .const_version import VERSION, VERSION_APP
-from .exception_classes import Error, ErrorMSG, LoginError, NoAdminError
+from .device import DEVICE_FIELDS, DEVICE_SOURCES, DeviceSnapshot, operations_of, select_fields, sources_of
+from .exception_classes import Error, ErrorMSG, LoginError, NoAdminError, RateLimitError
+from .fanout import FanoutLimits, RefreshSummary, gather_bounded
 from .gql_handler_async import GQLHandler
-from .model import Chats, ChatsNew, SmallChat, SmallChatList
+from .graphql_client import GraphqlClient
+from .model import ChatsNew, FastChatsNew, FastSimpleChat, SmallChat, SmallChatList
 from .pyxplora import PyXplora
+from .rate_limit import RateLimiter
+from .read_receipts import ReadReceiptQueue
+from .retry import RetryPolicy
 from .status import (
-    Emoji,
     LocationType,
     NormalStatus,
     UserContactType,
     WatchOnlineStatus,
 )
+from .token_manager import TokenManager
+from .token_store import TokenStore
 
 _LOGGER = logging.getLogger(__name__)
 
 LIST_DICT: list[dict[str, Any]] = []
 
+# per-watch queries of `_setDevice` fetched for all watches at once (query key -> operation name)
+WARD_PREFETCH_QUERIES: dict[str, str] = {
+    "alarmsQ": "Alarms",
+    "safeZonesQ": "SafeZones",
+    "silentTimesQ": "SlientTimes",
+    "watchesQ": "Watches",
+}
+
 
 class PyXploraApi(PyXplora):
     inter_error: dict[str, Any] | None = None
     _refresh_token: str | None = None
     _issueToken: dict[str, Any] | None = None  # noqa: N815
+    device: dict[str, DeviceSnapshot]
 
     def __init__(
         self,
@@ -44,6 +70,13 @@ class PyXploraApi(PyXplora):
         email: str | None = None,
         sign_up: bool = True,
         session: aiohttp.ClientSession | None = None,
+        gql_client: GraphqlClient | None = None,
+        cache: ResponseCache | None = None,
+        batching: bool = False,
+        retry_policy: RetryPolicy | None = None,
+        token_store: TokenStore | None = None,
+        rate_limiter: RateLimiter | None = None,
+        fanout_limits: FanoutLimits | None = None,
     ) -> None:
         self.inter_error = None
         super().__init__(
@@ -55,7 +88,11 @@ class PyXploraApi(PyXplora):
             childPhoneNumber,
             wuid,
             email,
+            token_store,
         )
+        if retry_policy is not None:
+            self.retryPolicy = retry_policy
+        self.rateLimiter = rate_limiter
         self._gql_handler: GQLHandler = GQLHandler(
             self._countrycode,
             self._phoneNumber,
@@ -65,31 +102,82 @@ class PyXploraApi(PyXplora):
             self._email,
             sign_up,
             session,
+            gql_client,
+            cache,
+            batching,
+            self.retryPolicy,
         )
+        self._gql_handler.tokens = TokenManager(self._gql_handler, login=self._relogin, lifetime=self.tokenExpiresAfter)
+        self._gql_handler.tokenStore = token_store
+        self._useRateLimiter()
+        self.fanoutLimits = FanoutLimits() if fanout_limits is None else fanout_limits
+        self._gql_handler.inFlight = asyncio.Semaphore(max(1, self.fanoutLimits.max_in_flight))
+        # resolved when sending, so a replaced handler method is picked up
+        self._read_receipts = ReadReceiptQueue(lambda receipts: self._gql_handler.setReadChatMsgs_a(receipts))
 
-    async def _login(self, force_login: bool = False, key=None, sec=None) -> tuple[dict[str, Any] | None, str | None]:
-        if not self._isConnected() or self._hasTokenExpired() or force_login:
-            retryCounter = 0
-            while not self._isConnected() and (retryCounter < self.maxRetries + 2):
-                retryCounter += 1
-                self._refresh_token = ""
+    async def __aenter__(self) -> PyXploraApi:
+        return self
 
-                # Try to login
-                try:
-                    self._issueToken, self._refresh_token = await self._gql_handler.login_a(key, sec)
-                except LoginError as error:
-                    self.error_message = error.error_message
-                    await asyncio.sleep(self.retryDelay)
-                except Error:
-                    if retryCounter == self.maxRetries + 2:
-                        self.error_message = ErrorMSG.SERVER_ERR
-                    else:
-                        await asyncio.sleep(self.retryDelay)
-
-            if self._issueToken:
-                self.dtIssueToken = int(time())
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Send the queued read receipts and close the pooled HTTP connections held by this instance."""
+        await self._read_receipts.aclose()
+        await self._gql_handler.aclose()
+
+    async def flushReadReceipts(self) -> None:
+        """Send the read receipts queued by `getWatchChatsRaw` and wait for them."""
+        await self._read_receipts.drain()
+
+    async def _login(self, force_login: bool = False, key=None, sec=None) -> tuple[dict[str, Any] | None, str | None]:
+        if not force_login and not self._isConnected() and self._restoreSession() and not self._hasTokenExpired():
+            # resumed the session of an earlier process from the token store, an expired one is refreshed below
+            self._gql_handler.tokens.start()
+        if not self._isConnected() or force_login:
+            self._refresh_token = ""
+            # one login per account at a time, concurrent callers share its result
+            try:
+                await self._gql_handler.tokens.gate.run(lambda: self._signIn(key, sec))
+            except LoginError as error:
+                self.error_message = error.error_message
+            except Error:
+                self.error_message = ErrorMSG.SERVER_ERR
+        elif self._hasTokenExpired():
+            # renew the session with `RefreshToken`, a full login is only made if that fails
+            await self._gql_handler.tokens.refresh()
+            self._issueToken, self._refresh_token = self._gql_handler.issueToken, self._gql_handler.refreshToken
+            self.dtIssueToken = int(self._gql_handler.tokens.issued_at)
         return self._issueToken, self._refresh_token
 
+    async def _signIn(self, key=None, sec=None) -> dict[str, Any] | None:
+        # failed requests are retried by the handler according to `retryPolicy`
+        self._issueToken, self._refresh_token = await self._gql_handler.login_a(key, sec)
+        if self._issueToken:
+            self.dtIssueToken = int(self._gql_handler.tokens.issued_at or time())
+            self._gql_handler.tokens.start()
+        return self._issueToken
+
+    async def _relogin(self) -> dict[str, Any] | None:
+        # full login of the token manager once a refresh failed, it already holds the gate
+        self._issueToken = None
+        try:
+            return await self._signIn()
+        except LoginError as error:
+            self.error_message = error.error_message
+        except Error:
+            self.error_message = ErrorMSG.SERVER_ERR
+        return None
+
+    def _hasTokenExpired(self) -> bool:
+        return self._gql_handler.tokens.expired()
+
+    def _restoreSession(self) -> bool:
+        if not super()._restoreSession():
+            return False
+        self._refresh_token = self._gql_handler.refreshToken
+        return True
+
     async def init(self, forceLogin: bool = False, signup: bool = True, key=None, sec=None) -> None:
         # self.initHandler(signup)
         token, refresh_token = await self._login(forceLogin, key, sec)
@@ -103,7 +191,8 @@ class PyXploraApi(PyXplora):
                 # print("Current Time =", current_time)
                 # print(self.error_message)
                 raise LoginError(self.error_message)
-            return await self.init(forceLogin, signup, key, sec)
+            # calling init again would recurse for as long as the server is down
+            raise LoginError(ErrorMSG.SERVER_ERR)
 
         if isinstance(token, dict):
             user = token.get("user", None)
@@ -121,205 +210,402 @@ class PyXploraApi(PyXplora):
     def version() -> str:
         return f"{VERSION}-{VERSION_APP}"
 
-    async def setDevices(self, ids: str | list[str] | None = None) -> list[str]:
+    async def _renewRejectedSession(self) -> None:
         if self.inter_error is not None:
-            self.__init__(
-                countrycode=self._countrycode,
-                phoneNumber=self._phoneNumber,
-                password=self._password,
-                userLang=self._userLang,
-                timeZone=self._timeZone,
-                email=self._email,
-            )
-            await self.init()
+            # the server rejected the session, renew the token instead of logging in from scratch
+            self.inter_error = None
+            await self._gql_handler.tokens.refresh()
+
+    async def setDevices(self, ids: str | list[str] | None = None, fields: str | Iterable[str] | None = None) -> list[str]:
+        """Refresh `device` of the watches.
+
+        Args:
+            ids (str | list[str], optional): The watch user ids. Defaults to all watches of the account.
+            fields (str | Iterable[str], optional): Names of `DEVICE_FIELDS`, `DEVICE_GROUPS` or `DEVICE_SOURCES` to
+                refresh, only the requests behind them are sent. Defaults to all fields.
+
+        Returns:
+            list[str]: The watch user ids.
+
+        Raises:
+            ValueError: If a field name is unknown.
+            RateLimitError: If the rate limiter refused requests of a watch, once the other watches are refreshed.
+        """
+        selected = select_fields(fields)
+        await self._renewRejectedSession()
         if isinstance(ids, str):
             ids = [ids]
-        return await self._setDevices(ids or [])
+        return await self._setDevices(ids or [], selected)
+
+    async def streamDevices(
+        self,
+        ids: str | list[str] | None = None,
+        timeout: float | None = DEFAULT_DEVICE_TIMEOUT,
+        summary: RefreshSummary | None = None,
+        fields: str | Iterable[str] | None = None,
+    ) -> AsyncIterator[tuple[str, DeviceSnapshot]]:
+        """Refresh the devices like `setDevices` and yield each one as soon as its watch is done.
+
+        A slow or offline watch only delays itself. Watches are refreshed within the `fanoutLimits`, a watch not
+        done within `timeout` seconds of its start is given up and keeps its previous data in `device`.
+
+        Args:
+            ids (str | list[str], optional): The watch user ids. Defaults to all watches of the account.
+            timeout (float, optional): Seconds per watch, None waits for ever. Defaults to DEFAULT_DEVICE_TIMEOUT.
+            summary (RefreshSummary, optional): Filled with the completed, timed out and failed watches.
+            fields (str | Iterable[str], optional): The fields to refresh, see `setDevices`. Defaults to all fields.
+
+        Yields:
+            tuple[str, DeviceSnapshot]: The watch user id and its entry of `device`.
+        """
+        selected = select_fields(fields)
+        await self._renewRejectedSession()
+        summary = RefreshSummary() if summary is None else summary
+        wuids = [ids] if isinstance(ids, str) else list(ids or self.getWatchUserIDs())
+        # the ward prefetch runs alongside, every watch waits for it within its own timeout
+        primes: dict[tuple[str, str], dict[str, Any]] = {}
+        prefetch = asyncio.ensure_future(self._prefetchScoped(wuids, selected, primes)) if len(wuids) > 1 else None
+        semaphore = asyncio.Semaphore(max(1, self.fanoutLimits.max_watches))
+
+        async def setDevice(wuid: str) -> None:
+            if prefetch is not None:
+                await asyncio.shield(prefetch)
+            await self._setDevice(wuid, selected)
+
+        async def refresh(wuid: str) -> tuple[str, Exception | None]:
+            async with semaphore:
+                try:
+                    with self._gql_handler.primeScope(primes):
+                        await asyncio.wait_for(setDevice(wuid), timeout)
+                except Exception as error:
+                    return wuid, error
+            return wuid, None
 
-    async def _setDevices(self, ids: list[str] | None = None) -> list[str]:
+        tasks = [asyncio.ensure_future(refresh(wuid)) for wuid in wuids]
+        try:
+            for done in asyncio.as_completed(tasks):
+                wuid, error = await done
+                if error is None:
+                    summary.completed.append(wuid)
+                    yield wuid, self.device[wuid]
+                elif isinstance(error, asyncio.TimeoutError):
+                    summary.timed_out.append(wuid)
+                else:
+                    _LOGGER.debug("Refreshing watch %s failed: %s", wuid, error)
+                    summary.failed[wuid] = error
+        finally:
+            # the consumer may stop early
+            for task in [*tasks, *([prefetch] if prefetch is not None else [])]:
+                task.cancel()
+            await asyncio.gather(*tasks, *([prefetch] if prefetch is not None else []), return_exceptions=True)
+
+    async def _setDevices(self, ids: list[str] | None = None, fields: list[str] | None = None) -> list[str]:
         wuids = ids if ids else self.getWatchUserIDs()
-        tasks = [self._setDevice(wuid) for wuid in wuids]
-        await asyncio.gather(*tasks)
+        # the primes of this refresh, not served to concurrent ones
+        with self._gql_handler.primeScope():
+            if len(wuids) > 1:
+                await self._prefetchWards(wuids, fields)
+            results = await gather_bounded(
+                [lambda wuid=wuid: self._setDevice(wuid, fields) for wuid in wuids], self.fanoutLimits.max_watches
+            )
+        for wuid, result in zip(wuids, results):
+            if isinstance(result, Exception):
+                # the other watches are refreshed anyway, this one keeps its previous data
+                _LOGGER.debug("Refreshing watch %s failed: %s", wuid, result)
+        throttled = next((result for result in results if isinstance(result, RateLimitError)), None)
+        if throttled is not None:
+            raise throttled
         return wuids
 
-    async def _setDevice(self, wuid: str) -> None:
-        tasks = [
-            self.getWatchAlarm(wuid),
-            self.loadWatchLocation(wuid),
-            self.getWatchBattery(wuid),
-            self.getWatchIsCharging(wuid),
-            self.getWatchLocateType(wuid),
-            self.getWatchSafeZoneLabel(wuid),
-            self.getWatchSafeZones(wuid),
-            self.getWatchIsInSafeZone(wuid),
-            self.getSilentTime(wuid),
-            self.getWatches(wuid),
-            self.getSWInfo(wuid, watches=await self.getWatches(wuid)),
-            self.getWatchUserSteps(
-                wuid,
-                date=int(datetime.now().replace(hour=0, minute=0, second=0, microsecond=0).timestamp()),
+    async def _prefetchScoped(
+        self, wuids: list[str], fields: list[str], primes: dict[tuple[str, str], dict[str, Any]]
+    ) -> None:
+        with self._gql_handler.primeScope(primes):
+            await self._prefetchWards(wuids, fields)
+
+    async def _prefetchWards(self, wuids: list[str], fields: list[str] | None = None) -> None:
+        # one aliased request per query for all watches instead of one per watch
+        operations = operations_of(sources_of(select_fields() if fields is None else fields))
+        results = await asyncio.gather(
+            *(
+                self._gql_handler.runWardQuery_a(gq.WATCH_Q.get(query, ""), wuids, operation_name=name, prime=True)
+                for query, name in WARD_PREFETCH_QUERIES.items()
+                if name in operations
             ),
-            self.getWatchOnlineStatus(wuid),
-        ]
-        results = await asyncio.gather(*tasks)
-        (
-            watch_alarm,
-            watch_location,
-            battery,
-            isCharging,
-            locateType,
-            safeZoneLabel,
-            watch_safe_zones,
-            isInSafeZone,
-            silent_time,
-            watches,
-            sw_info,
-            user_steps,
-            online_status,
-        ) = results
-        self.device[wuid] = {
-            "getWatchAlarm": watch_alarm,
-            "watch_battery": battery,
-            "watch_charging": isCharging,
-            "locateType": locateType,
-            "lastTrackTime": watch_location.get("tm", datetime.now().strftime("%Y-%m-%d %H:%M:%S")),
-            "lat": watch_location.get("lat", None),
-            "lng": watch_location.get("lng", None),
-            "rad": watch_location.get("rad", -1),
-            "step": watch_location.get("watch_last_location", {}).get("step", 0),
-            "distance": watch_location.get("watch_last_location", {}).get("distance", -1),
-            "isInSafeZone": isInSafeZone,
-            "safeZoneLabel": safeZoneLabel,
-            "getWatchSafeZones": watch_safe_zones,
-            "getSilentTime": silent_time,
-            "getWatches": watches,
-            "getSWInfo": sw_info,
-            "getWatchUserSteps": user_steps,
-            "getWatchOnlineStatus": online_status,
-            "getWatchUserIcons": self.getWatchUserIcons(wuid),
-            "getWatchUserXCoins": self.getWatchUserXCoins(wuid),
-        }
+            return_exceptions=True,
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                _LOGGER.debug(result)
+
+    async def _setDevice(self, wuid: str, fields: list[str] | None = None) -> None:
+        fields = select_fields() if fields is None else fields
+        # every source is fetched once, however many of the fields read it, and only once its required sources are
+        # fetched; concurrent AskWatchLocate queries of different sources are coalesced by the handler
+        pending = sources_of(fields)
+        values: dict[str, Any] = {}
+        fetched_at: dict[str, float] = {}
+        while pending:
+            ready = [name for name in pending if all(required in values for required in DEVICE_SOURCES[name].requires)]
+            results = await gather_bounded(
+                [lambda name=name: DEVICE_SOURCES[name].fetch(self, wuid, values) for name in ready],
+                self.fanoutLimits.max_requests_per_watch,
+            )
+            for name, result in zip(ready, results):
+                if isinstance(result, Exception):
+                    raise result
+                values[name] = result
+                fetched_at[name] = time()
+            pending = [name for name in pending if name not in values]
+        # updated in place, unselected fields keep their previous values
+        snapshot = self._snapshotOf(wuid)
+        for name in fields:
+            field = DEVICE_FIELDS[name]
+            snapshot.store(name, field.extract(values[field.source]), fetched_at[field.source])
+
+    def _snapshotOf(self, wuid: str) -> DeviceSnapshot:
+        snapshot = self.device.get(wuid)
+        if not isinstance(snapshot, DeviceSnapshot):
+            previous = snapshot or {}
+            snapshot = self.device[wuid] = DeviceSnapshot(wuid, lambda fields: self._setDevice(wuid, fields))
+            # the entries of a former device dict are kept until they are refreshed
+            snapshot.update(previous)
+        return snapshot
+
+    def getDevice(self, wuid: str) -> DeviceSnapshot:
+        """Get the snapshot of a watch, the fields not fetched yet are loaded with `await snapshot.get_field(name)`.
+
+        Args:
+            wuid (str): The ID of the watch.
+
+        Returns:
+            DeviceSnapshot: The fields of the watch, a dict. For a watch not of the account an empty snapshot which
+                loads nothing and is not added to `device`.
+        """
+        if wuid in self.device or wuid in self.getWatchUserIDs():
+            return self._snapshotOf(wuid)
+        return DeviceSnapshot(wuid)
 
     ##### Contact Info #####
     async def getWatchUserContacts(self, wuid: str) -> list[dict[str, Any]]:
-        retries = 0
         contacts = []
-        while retries < self.maxRetries + 2:
-            retries += 1
-            try:
-                raw_contacts = await self._gql_handler.getWatchUserContacts_a(wuid)
-                raw_contacts = raw_contacts.get("contacts", {})
-                if not raw_contacts:
-                    continue
-                raw_contacts = raw_contacts.get("contacts", [])
-                for contact in raw_contacts:
-                    contactUser = contact.get("contactUser", {})
-                    if contactUser:
-                        xcoin = contactUser.get("xcoin", -1)
-                        _id = contactUser.get("id", None)
-                        contacts.append(
-                            {
-                                "id": _id,
-                                "guardianType": contact["guardianType"],
-                                "create": datetime.fromtimestamp(contact["create"]).strftime("%Y-%m-%d %H:%M:%S"),
-                                "update": datetime.fromtimestamp(contact["update"]).strftime("%Y-%m-%d %H:%M:%S"),
-                                "name": contact["name"],
-                                "phoneNumber": f'+{contact["countryPhoneNumber"]}{contact["phoneNumber"]}',
-                                "xcoin": xcoin,
-                            }
-                        )
-                break
-            except (Error, TypeError) as error:
-                _LOGGER.debug(error)
-                await asyncio.sleep(self.retryDelay)
+        try:
+            raw_contacts = (await self._gql_handler.getWatchUserContacts_a(wuid)).get("contacts", {})
+            for contact in (raw_contacts or {}).get("contacts", []):
+                contactUser = contact.get("contactUser", {})
+                if contactUser:
+                    xcoin = contactUser.get("xcoin", -1)
+                    _id = contactUser.get("id", None)
+                    contacts.append(
+                        {
+                            "id": _id,
+                            "guardianType": contact["guardianType"],
+                            "create": datetime.fromtimestamp(contact["create"]).strftime("%Y-%m-%d %H:%M:%S"),
+                            "update": datetime.fromtimestamp(contact["update"]).strftime("%Y-%m-%d %H:%M:%S"),
+                            "name": contact["name"],
+                            "phoneNumber": f'+{contact["countryPhoneNumber"]}{contact["phoneNumber"]}',
+                            "xcoin": xcoin,
+                        }
+                    )
+        except RateLimitError:
+            raise
+        except (Error, TypeError) as error:
+            _LOGGER.debug(error)
         return contacts
 
     async def getWatchAlarm(self, wuid: str) -> list[dict[str, Any]]:
-        retry_counter = 0
         alarms: list[dict[str, Any]] = []
-
-        while retry_counter < self.maxRetries + 2:
-            try:
-                alarms_raw = await self._gql_handler.getAlarmTime_a(wuid)
-                raw_alarms = alarms_raw.get("alarms", [])
-                if not raw_alarms:
-                    return []
-                for alarm in raw_alarms:
-                    alarms.append(
-                        {
-                            "id": alarm["id"],
-                            "vendorId": alarm["vendorId"],
-                            "name": alarm["name"],
-                            "start": self._helperTime(alarm["occurMin"]),
-                            "weekRepeat": alarm["weekRepeat"],
-                            "status": alarm["status"],
-                        }
-                    )
-                break
-            except Error as error:
-                retry_counter += 1
-                _LOGGER.debug(error)
-                await asyncio.sleep(self.retryDelay)
+        try:
+            for alarm in (await self._gql_handler.getAlarmTime_a(wuid)).get("alarms", []) or []:
+                alarms.append(
+                    {
+                        "id": alarm["id"],
+                        "vendorId": alarm["vendorId"],
+                        "name": alarm["name"],
+                        "start": self._helperTime(alarm["occurMin"]),
+                        "weekRepeat": alarm["weekRepeat"],
+                        "status": alarm["status"],
+                    }
+                )
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return alarms
 
-    async def loadWatchLocation(self, wuid: str = "", with_ask: bool = True) -> dict[str, Any]:
-        retry_counter = 0
+    async def loadWatchLocation(
+        self,
+        wuid: str = "",
+        with_ask: bool = True,
+        timeout: float = 0,
+        poll_interval: float = DEFAULT_LOCATE_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_LOCATE_MAX_POLL_INTERVAL,
+    ) -> dict[str, Any]:
         watch_location = {}
-        while retry_counter < self.maxRetries + 1:
-            try:
-                if with_ask:
-                    await self.askWatchLocate(wuid)
-                    await asyncio.sleep(1)
-                location_raw = await self._gql_handler.getWatchLastLocation_a(wuid)
-                if location_raw.get("message", None):
-                    # _LOGGER.error(location_raw)
-                    self.inter_error = location_raw
-                _watch_last_locate = location_raw.get("watchLastLocate", {})
-                if not _watch_last_locate:
-                    return watch_location
-                _tm = 31532399 if _watch_last_locate.get("tm") is None else _watch_last_locate.get("tm")
-                _lat = _watch_last_locate.get("lat", "0.0")
-                _lng = _watch_last_locate.get("lng", "0.0")
-                _rad = _watch_last_locate.get("rad", -1)
-                _poi = _watch_last_locate.get("poi", "")
-                _city = _watch_last_locate.get("city", "")
-                _province = _watch_last_locate.get("province", "")
-                _country = _watch_last_locate.get("country", "")
-                _locate_type = (
-                    LocationType.UNKNOWN.value
-                    if _watch_last_locate.get("locateType") is None
-                    else _watch_last_locate.get("locateType")
-                )
-                _is_in_safe_zone = _watch_last_locate.get("isInSafeZone", False)
-                _safe_zone_label = _watch_last_locate.get("safeZoneLabel", "")
-                _watch_battery = _watch_last_locate.get("battery", None)
-                _watch_charging = _watch_last_locate.get("isCharging", False)
-
-                watch_location = {
-                    "tm": datetime.fromtimestamp(_tm).strftime("%Y-%m-%d %H:%M:%S"),
-                    "lat": _lat,
-                    "lng": _lng,
-                    "rad": _rad,
-                    "poi": _poi,
-                    "city": _city,
-                    "province": _province,
-                    "country": _country,
-                    "locateType": _locate_type,
-                    "isInSafeZone": _is_in_safe_zone,
-                    "safeZoneLabel": _safe_zone_label,
-                    "watch_battery": _watch_battery,
-                    "watch_charging": _watch_charging,
-                    "watch_last_location": _watch_last_locate,
-                }
+        try:
+            if with_ask and timeout > 0:
+                # opt-in: wait up to `timeout` seconds for the location the watch reports after the ask
+                watch_location = self._parseWatchLocation(await self._gql_handler.getWatchLastLocation_a(wuid))
+                if await self.askWatchLocate(wuid):
+                    watch_location = await self.waitForWatchLocation(
+                        wuid, watch_location, timeout, poll_interval, max_poll_interval
+                    )
                 return watch_location
+            if with_ask:
+                await self.askWatchLocate(wuid)
+            watch_location = self._parseWatchLocation(await self._gql_handler.getWatchLastLocation_a(wuid))
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
+        return watch_location
 
-            except Error as error:
-                _LOGGER.debug(error)
-                retry_counter += 1
+    async def waitForWatchLocation(
+        self,
+        wuid: str,
+        last: dict[str, Any],
+        timeout: float = DEFAULT_LOCATE_TIMEOUT,
+        poll_interval: float = DEFAULT_LOCATE_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_LOCATE_MAX_POLL_INTERVAL,
+    ) -> dict[str, Any]:
+        """Poll the location of a watch asked to locate itself until it reported a new one.
+
+        Polled like `streamWatchLocations`, bypassing the cache: the interval grows from `poll_interval` to
+        `max_poll_interval` until the `tm` of the location differs from the one of `last`.
+
+        Args:
+            wuid (str): The watch user id.
+            last (dict[str, Any]): The location read before the ask, as returned by `loadWatchLocation`.
+            timeout (float, optional): Seconds to wait for the watch. Defaults to DEFAULT_LOCATE_TIMEOUT.
+            poll_interval (float, optional): Seconds before the first poll. Defaults to DEFAULT_LOCATE_POLL_INTERVAL.
+            max_poll_interval (float, optional): Upper bound of the poll interval. Defaults to
+                DEFAULT_LOCATE_MAX_POLL_INTERVAL.
+
+        Returns:
+            dict[str, Any]: The new location, or the last known one if the watch did not report within `timeout`.
+        """
+        baseline = last.get("watch_last_location", {}).get("tm")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        interval = poll_interval
+        while loop.time() < deadline:
+            await asyncio.sleep(max(0.0, min(interval, deadline - loop.time())))
+            with self._gql_handler.bypass_cache():
+                location = self._parseWatchLocation(await self._gql_handler.getWatchLastLocation_a(wuid))
+            tm = location.get("watch_last_location", {}).get("tm")
+            if location:
+                last = location
+            if tm is not None and tm != baseline:
+                break
+            interval = min(interval * 1.5, max_poll_interval)
+        return last
+
+    def _parseWatchLocation(self, location_raw: dict[str, Any]) -> dict[str, Any]:
+        if location_raw.get("message", None):
+            # _LOGGER.error(location_raw)
+            self.inter_error = location_raw
+        _watch_last_locate = location_raw.get("watchLastLocate", {})
+        if not _watch_last_locate:
+            return {}
+        _tm = 31532399 if _watch_last_locate.get("tm") is None else _watch_last_locate.get("tm")
+        _lat = _watch_last_locate.get("lat", "0.0")
+        _lng = _watch_last_locate.get("lng", "0.0")
+        _rad = _watch_last_locate.get("rad", -1)
+        _poi = _watch_last_locate.get("poi", "")
+        _city = _watch_last_locate.get("city", "")
+        _province = _watch_last_locate.get("province", "")
+        _country = _watch_last_locate.get("country", "")
+        _locate_type = (
+            LocationType.UNKNOWN.value
+            if _watch_last_locate.get("locateType") is None
+            else _watch_last_locate.get("locateType")
+        )
+        _is_in_safe_zone = _watch_last_locate.get("isInSafeZone", False)
+        _safe_zone_label = _watch_last_locate.get("safeZoneLabel", "")
+        _watch_battery = _watch_last_locate.get("battery", None)
+        _watch_charging = _watch_last_locate.get("isCharging", False)
+
+        return {
+            "tm": datetime.fromtimestamp(_tm).strftime("%Y-%m-%d %H:%M:%S"),
+            "lat": _lat,
+            "lng": _lng,
+            "rad": _rad,
+            "poi": _poi,
+            "city": _city,
+            "province": _province,
+            "country": _country,
+            "locateType": _locate_type,
+            "isInSafeZone": _is_in_safe_zone,
+            "safeZoneLabel": _safe_zone_label,
+            "watch_battery": _watch_battery,
+            "watch_charging": _watch_charging,
+            "watch_last_location": _watch_last_locate,
+        }
 
-            await asyncio.sleep(self.retryDelay)
+    async def streamWatchLocations(
+        self,
+        wuids: list[str] | None = None,
+        timeout: float = DEFAULT_LOCATE_TIMEOUT,
+        poll_interval: float = DEFAULT_LOCATE_POLL_INTERVAL,
+        max_poll_interval: float = DEFAULT_LOCATE_MAX_POLL_INTERVAL,
+    ) -> AsyncIterator[tuple[str, dict[str, Any]]]:
+        """Ask all watches to locate themselves and yield each location as soon as the watch reported it.
+
+        The last known locations are read first, then `askWatchLocate` is sent to all watches at once. The
+        locations of the watches still waiting are polled with one request per round, the interval grows from
+        `poll_interval` to `max_poll_interval`. A watch is yielded once its `tm` advanced; watches which did not
+        report within `timeout` seconds are yielded with their last known location.
+
+        Args:
+            wuids (list[str], optional): The watch user ids. Defaults to all watches of the account.
+            timeout (float, optional): Seconds to wait for the watches. Defaults to DEFAULT_LOCATE_TIMEOUT.
+            poll_interval (float, optional): Seconds before the first poll. Defaults to DEFAULT_LOCATE_POLL_INTERVAL.
+            max_poll_interval (float, optional): Upper bound of the poll interval. Defaults to
+                DEFAULT_LOCATE_MAX_POLL_INTERVAL.
+
+        Yields:
+            tuple[str, dict[str, Any]]: The watch user id and its location as returned by `loadWatchLocation`.
+        """
+        pending = list(wuids or self.getWatchUserIDs())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        last = await self._readWatchLocations(pending)
+        baseline = {wuid: last[wuid].get("watch_last_location", {}).get("tm") for wuid in pending}
+        await asyncio.gather(*(self.askWatchLocate(wuid) for wuid in pending), return_exceptions=True)
+        interval = poll_interval
+        while pending:
+            await asyncio.sleep(max(0.0, min(interval, deadline - loop.time())))
+            last.update(await self._readWatchLocations(pending))
+            for wuid in list(pending):
+                tm = last[wuid].get("watch_last_location", {}).get("tm")
+                if tm is not None and tm != baseline[wuid]:
+                    pending.remove(wuid)
+                    yield wuid, last[wuid]
+            if loop.time() >= deadline:
+                break
+            interval = min(interval * 1.5, max_poll_interval)
+        for wuid in pending:
+            yield wuid, last[wuid]
 
-        return watch_location
+    async def _readWatchLocations(self, wuids: list[str]) -> dict[str, dict[str, Any]]:
+        # one aliased WatchLastLocate request for all watches
+        locations: dict[str, dict[str, Any]] = {wuid: {} for wuid in wuids}
+        try:
+            results = await self._gql_handler.runWardQuery_a(
+                gq.WATCH_Q.get("locateQ", ""), wuids, operation_name="WatchLastLocate"
+            )
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
+            return locations
+        for wuid, data in results.items():
+            errors = data.get("errors") or []
+            if errors and errors[0].get("message") == ErrorMSG.AUTH_FAIL.value:
+                locations[wuid] = self._parseWatchLocation(errors[0])
+            else:
+                locations[wuid] = self._parseWatchLocation(data.get("data") or {})
+        return locations
 
     async def getWatchBattery(self, wuid: str) -> int:
         tasks = [self.loadWatchLocation(wuid)]
@@ -335,21 +621,17 @@ class PyXploraApi(PyXplora):
             return results[0].get("watch_charging", False)
         return False
 
-    async def getWatchOnlineStatus(self, wuid: str) -> str:
-        retries = 0
+    async def getWatchOnlineStatus(self, wuid: str, asked: bool | None = None) -> str:
         status = WatchOnlineStatus.UNKNOWN
-
-        while status is WatchOnlineStatus.UNKNOWN and retries < self.maxRetries + 2:
-            try:
-                ask_raw = await self.askWatchLocate(wuid)
-                track_raw = await self.getTrackWatchInterval(wuid)
-                status = WatchOnlineStatus.ONLINE if ask_raw or track_raw != -1 else WatchOnlineStatus.OFFLINE
-            except Error as error:
-                _LOGGER.debug(error)
-                retries += 1
-            if status is WatchOnlineStatus.UNKNOWN:
-                await asyncio.sleep(self.retryDelay)
-
+        try:
+            # the answer of an ask already sent, e.g. by the device refresh, is not asked again
+            ask_raw = await self.askWatchLocate(wuid) if asked is None else asked
+            track_raw = await self.getTrackWatchInterval(wuid)
+            status = WatchOnlineStatus.ONLINE if ask_raw or track_raw != -1 else WatchOnlineStatus.OFFLINE
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return status.value
 
     async def getWatchUnReadChatMsgCount(self, wuid: str) -> int:
@@ -358,6 +640,8 @@ class PyXploraApi(PyXplora):
             if isinstance(unread_count, dict):
                 return unread_count.get("unReadChatMsgCount", -1)
             return -1
+        except RateLimitError:
+            raise
         except Error as e:
             _LOGGER.error("Error getting unread chat message count: %s", e)
             return -1
@@ -371,43 +655,34 @@ class PyXploraApi(PyXplora):
         show_del_msg: bool = True,
         asObject=False,
     ) -> list[dict[str, Any]] | SmallChatList:
-        retry_counter = 0
         chats: list[dict[str, Any]] = []
-
-        while not chats and retry_counter < self.maxRetries + 2:
-            retry_counter += 1
-            try:
-                _chats_new = await self.getWatchChatsRaw(wuid, offset, limit, msgId, show_del_msg, asObject)
-                if isinstance(_chats_new, dict):
-                    _chats_new = ChatsNew.from_dict(_chats_new)
-
-                _list = _chats_new.list
-                if not _list:
-                    continue
-
-                for chat in _list:
-                    _chat = {
-                        "msgId": chat.msgId,
-                        "type": chat.type,
-                        "sender_id": chat.sender.id,
-                        "sender_name": chat.sender.name,
-                        "receiver_id": chat.receiver.id,
-                        "receiver_name": chat.receiver.name,
-                        "data_text": chat.data.text,
-                        "data_sender_name": chat.data.sender_name,
-                        "create": datetime.fromtimestamp(chat.create).strftime("%Y-%m-%d %H:%M:%S"),
-                        "delete_flag": chat.data.delete_flag,
-                        "emoticon_id": chat.data.emoticon_id,
-                    }
-                    if asObject:
-                        chats.append(SmallChat.from_dict(_chat))
-                    else:
-                        chats.append(_chat)
-            except Error as error:
-                _LOGGER.debug(error)
-
-            if not chats:
-                await asyncio.sleep(self.retryDelay)
+        try:
+            _chats_new = await self.getWatchChatsRaw(wuid, offset, limit, msgId, show_del_msg, asObject)
+            if isinstance(_chats_new, dict):
+                _chats_new = FastChatsNew.from_dict(_chats_new)
+
+            for chat in _chats_new.list or []:
+                _chat = {
+                    "msgId": chat.msgId,
+                    "type": chat.type,
+                    "sender_id": chat.sender.id,
+                    "sender_name": chat.sender.name,
+                    "receiver_id": chat.receiver.id,
+                    "receiver_name": chat.receiver.name,
+                    "data_text": chat.data.text,
+                    "data_sender_name": chat.data.sender_name,
+                    "create": datetime.fromtimestamp(chat.create).strftime("%Y-%m-%d %H:%M:%S"),
+                    "delete_flag": chat.data.delete_flag,
+                    "emoticon_id": chat.data.emoticon_id,
+                }
+                if asObject:
+                    chats.append(SmallChat.from_dict(_chat))
+                else:
+                    chats.append(_chat)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
 
         if asObject:
             return SmallChatList(chats)
@@ -423,52 +698,72 @@ class PyXploraApi(PyXplora):
         asObject=False,
         with_emoji_id=True,
     ) -> dict | ChatsNew:
-        retry_counter = 0
         chats_new: dict = {}
-        while not chats_new and retry_counter < self.maxRetries + 2:
-            retry_counter += 1
-            try:
-                result: dict[str, Any] | Chats | ChatsNew | str | None = await self._gql_handler.chats_a(
-                    wuid, offset, limit, msgId, asObject
-                )
-
-                if not result:
-                    continue
-
-                if result == "":
-                    result = ChatsNew()
-
-                if isinstance(result, str):
-                    result = json.loads(result)
-
-                if isinstance(result, dict):
-                    if result.get("chatsNew", None):
-                        result = ChatsNew.from_dict(result.get("chatsNew", None))
-                    else:
-                        result = ChatsNew()
-
-                if isinstance(result, Chats):
-                    result = result.chatsNew
+        try:
+            result: dict[str, Any] | str | None = await self._gql_handler.chats_a(wuid, offset, limit, msgId)
 
-                if result is None:
-                    continue
+            if isinstance(result, str):
+                result = json.loads(result) if result else None
 
-                if with_emoji_id:
-                    for d in result.list:
-                        d.data.emoji_id = d.data.emoticon_id
-                        d.data.emoticon_id = Emoji[f"M{d.data.emoticon_id}"].value
-                        await self.set_read_chat_msg(wuid, d.msgId, d.id)
+            if result is None:
+                return ChatsNew() if asObject else chats_new
 
-                filtered_chats = [chat for chat in result.list if show_del_msg or chat.data.delete_flag == 0]
-                chats_new = ChatsNew(filtered_chats).to_dict()
-            except Error as error:
-                _LOGGER.debug(error)
+            chats = self._decodeChatPage(result, with_emoji_id=with_emoji_id)
+            if with_emoji_id:
+                for chat in chats:
+                    # sent in the background, see `flushReadReceipts`
+                    self._read_receipts.mark(wuid, chat.msgId, chat.id)
 
-            if not chats_new:
-                await asyncio.sleep(self.retryDelay)
+            chats_new = {"list": [chat.to_dict() for chat in chats if show_del_msg or self._isChatKept(chat)]}
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
 
         return ChatsNew.from_dict(chats_new, infer_missing=True) if asObject else chats_new
 
+    async def iterWatchChats(
+        self,
+        wuid: str,
+        page_size: int = DEFAULT_CHAT_PAGE_SIZE,
+        show_del_msg: bool = True,
+        with_emoji_id: bool = True,
+    ) -> AsyncIterator[FastSimpleChat]:
+        """Iterate over the whole chat history of a watch, newest message first.
+
+        Pages are requested with the `msgId` of the last message as cursor. The next page is fetched while the
+        current one is consumed, so at most two pages are held in memory.
+
+        Args:
+            wuid (str): The watch user id.
+            page_size (int, optional): Messages per request. Defaults to DEFAULT_CHAT_PAGE_SIZE.
+            show_del_msg (bool, optional): Yield deleted messages too. Defaults to True.
+            with_emoji_id (bool, optional): Replace the emoticon id with the emoji. Defaults to True.
+
+        Yields:
+            FastSimpleChat: The messages.
+        """
+
+        async def fetch(cursor: str) -> list[dict[str, Any]]:
+            raw = await self._gql_handler.chats_a(wuid, 0, page_size, cursor)
+            return ((raw or {}).get("chatsNew") or {}).get("list") or []
+
+        cursor = ""
+        page = await fetch(cursor)
+        while page:
+            last = page[-1].get("msgId") or ""
+            # fetch the next page while the caller works through this one
+            prefetch = asyncio.ensure_future(fetch(last)) if len(page) >= page_size and last != cursor else None
+            try:
+                for chat in self._decodeChatPage({"chatsNew": {"list": page}}, show_del_msg, with_emoji_id):
+                    if chat.msgId != cursor:
+                        yield chat
+                page = await prefetch if prefetch is not None else []
+            finally:
+                if prefetch is not None and not prefetch.done():
+                    prefetch.cancel()
+            cursor = last
+
     ##### Watch Location Info #####
     async def getWatchLastLocation(self, wuid: str) -> dict[str, Any]:
         tasks = [self.loadWatchLocation(wuid)]
@@ -495,31 +790,24 @@ class PyXploraApi(PyXplora):
         return (await self.getWatchLocate(wuid)).get("safeZoneLabel", "")
 
     async def getWatchSafeZones(self, wuid: str) -> list[dict[str, Any]]:
-        retry_counter = 0
         safe_zones = []
-        while retry_counter < self.maxRetries + 2:
-            try:
-                safe_zones_raw = await self._gql_handler.safeZones_a(wuid)
-                _safe_zones = safe_zones_raw.get("safeZones", [])
-                if not _safe_zones:
-                    return []
-                safe_zones = [
-                    {
-                        "vendorId": sz["vendorId"],
-                        "groupName": sz["groupName"],
-                        "name": sz["name"],
-                        "lat": sz["lat"],
-                        "lng": sz["lng"],
-                        "rad": sz["rad"],
-                        "address": sz["address"],
-                    }
-                    for sz in _safe_zones
-                ]
-                break
-            except Error as error:
-                _LOGGER.debug(error)
-                retry_counter += 1
-                await asyncio.sleep(self.retryDelay)
+        try:
+            safe_zones = [
+                {
+                    "vendorId": sz["vendorId"],
+                    "groupName": sz["groupName"],
+                    "name": sz["name"],
+                    "lat": sz["lat"],
+                    "lng": sz["lng"],
+                    "rad": sz["rad"],
+                    "address": sz["address"],
+                }
+                for sz in (await self._gql_handler.safeZones_a(wuid)).get("safeZones", []) or []
+            ]
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return safe_zones
 
     async def getTrackWatchInterval(self, wuid: str) -> int:
@@ -530,67 +818,44 @@ class PyXploraApi(PyXplora):
 
     ##### Feature #####
     async def getSilentTime(self, wuid: str) -> list[dict[str, Any]]:
-        retry_counter = 0
-        data_ok: list[dict[str, Any]] = []
-        silent_times_raw: dict[str, Any] = {}
         school_silent_mode: list[dict[str, Any]] = []
-        while not data_ok and (retry_counter < self.maxRetries + 2):
-            retry_counter += 1
-            try:
-                silent_times_raw = await self._gql_handler.silentTimes_a(wuid)
-                _silent_times = silent_times_raw.get("silentTimes", [])
-                if not _silent_times:
-                    data_ok.append({})
-                    return school_silent_mode
-                for silent_time in _silent_times:
-                    school_silent_mode.append(
-                        {
-                            "id": silent_time["id"],
-                            "vendorId": silent_time["vendorId"],
-                            "start": self._helperTime(silent_time["start"]),
-                            "end": self._helperTime(silent_time["end"]),
-                            "weekRepeat": silent_time["weekRepeat"],
-                            "status": silent_time["status"],
-                        }
-                    )
-            except Error as error:
-                _LOGGER.debug(error)
-            data_ok = school_silent_mode
-            if not data_ok:
-                await asyncio.sleep(self.retryDelay)
+        try:
+            for silent_time in (await self._gql_handler.silentTimes_a(wuid)).get("silentTimes", []) or []:
+                school_silent_mode.append(
+                    {
+                        "id": silent_time["id"],
+                        "vendorId": silent_time["vendorId"],
+                        "start": self._helperTime(silent_time["start"]),
+                        "end": self._helperTime(silent_time["end"]),
+                        "weekRepeat": silent_time["weekRepeat"],
+                        "status": silent_time["status"],
+                    }
+                )
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return school_silent_mode
 
     async def setEnableSilentTime(self, silent_id: str) -> bool:
-        retries = 0
-        result = ""
-
-        while not result and retries < self.maxRetries + 2:
-            retries += 1
-            try:
-                response = await self._gql_handler.setEnableSilentTime_a(silent_id)
-                result = response.get("setEnableSilentTime", False)
-            except Error as error:
-                _LOGGER.debug(error)
-
-            if not result:
-                await asyncio.sleep(self.retryDelay)
-
+        result = False
+        try:
+            result = (await self._gql_handler.setEnableSilentTime_a(silent_id)).get("setEnableSilentTime", False)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return bool(result)
 
     async def setDisableSilentTime(self, silent_id: str) -> bool:
-        retry_counter = 0
-        result = ""
-
-        while not result and retry_counter < self.maxRetries + 2:
-            retry_counter += 1
-            try:
-                disable_raw = await self._gql_handler.setEnableSilentTime_a(silent_id, NormalStatus.DISABLE.value)
-                result = disable_raw.get("setEnableSilentTime", False)
-            except Error as error:
-                _LOGGER.debug(error)
-            if not result:
-                await asyncio.sleep(self.retryDelay)
-
+        result = False
+        try:
+            disable_raw = await self._gql_handler.setEnableSilentTime_a(silent_id, NormalStatus.DISABLE.value)
+            result = disable_raw.get("setEnableSilentTime", False)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return bool(result)
 
     async def setAllEnableSilentTime(self, wuid: str) -> list[bool]:
@@ -609,20 +874,13 @@ class PyXploraApi(PyXplora):
         return results
 
     async def setAlarmTime(self, alarm_id: str, status: NormalStatus) -> bool:
-        retryCounter = 0
-        result = ""
-        while not result and (retryCounter < self.maxRetries + 2):
-            retryCounter += 1
-            try:
-                raw = await self._gql_handler.setEnableAlarmTime_a(alarm_id, status.value)
-                modifyAlarm = raw.get("modifyAlarm", -1)
-                if not modifyAlarm:
-                    return False
-                result = modifyAlarm
-            except Error as error:
-                _LOGGER.debug(error)
-            if not result:
-                await asyncio.sleep(self.retryDelay)
+        result = False
+        try:
+            result = (await self._gql_handler.setEnableAlarmTime_a(alarm_id, status.value)).get("modifyAlarm", False)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return bool(result)
 
     async def setEnableAlarmTime(self, alarm_id: str) -> bool:
@@ -667,28 +925,20 @@ class PyXploraApi(PyXplora):
         return c.get("followRequestWatchCount", 0)
 
     async def getWatches(self, wuid: str) -> dict[str, Any]:
-        retryCounter = 0
-        watches_raw: dict[str, Any] = {}
         watch: dict[str, Any] = {}
-        while not watch and (retryCounter < self.maxRetries + 2):
-            retryCounter += 1
-            try:
-                watches_raw = await self._gql_handler.getWatches_a(wuid)
-                _watches: list[dict[str, Any]] = watches_raw.get("watches", [])
-                if not _watches:
-                    return watch
+        try:
+            _watches: list[dict[str, Any]] = (await self._gql_handler.getWatches_a(wuid)).get("watches", [])
+            if _watches:
                 watch = {
                     "imei": _watches[0]["swKey"],
                     "osVersion": _watches[0]["osVersion"],
                     "qrCode": _watches[0]["qrCode"],
                     "model": _watches[0]["groupName"],
                 }
-                if watch:
-                    return watch
-            except Error as error:
-                _LOGGER.debug(error)
-            if not watch:
-                await asyncio.sleep(self.retryDelay)
+        except RateLimitError:
+            raise
+        except Error as error:
+            _LOGGER.debug(error)
         return watch
 
     async def getSWInfo(self, wuid: str, watches: Optional[dict[str, Any]] = None) -> dict[str, Any]:
@@ -0,0 +1,188 @@
+"""Client-side rate limiting with token buckets, shared by the sync and async clients."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+import logging
+import threading
+import time
+from typing import Any
+
+from .exception_classes import RateLimitError
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_GLOBAL_RATE = 20.0
+DEFAULT_GLOBAL_BURST = 40
+DEFAULT_ACCOUNT_RATE = 5.0
+DEFAULT_ACCOUNT_BURST = 20
+DEFAULT_MAX_WAIT = 30.0
+
+# responses whose `Retry-After` header pauses the requests
+RETRY_AFTER_STATUS = frozenset({429, 503})
+
+# Expensive operations get their own bucket per account: (requests per second, burst). A device refresh asks every
+# watch of the account to locate itself once, the burst covers a full refresh of an account with up to 10 watches.
+DEFAULT_OPERATION_LIMITS: dict[str, tuple[float, int]] = {
+    "AskWatchLocate": (0.5, 10),
+    "signInWithEmailOrPhone": (0.1, 2),
+}
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Return the seconds of a `Retry-After` header, given as seconds or as HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Allow `rate` requests per second with bursts of up to `burst` requests.
+
+    Reservations may overdraw the bucket, a caller then waits until its token has been refilled. Callers are served
+    in the order they reserved.
+
+    Args:
+        rate (float): Tokens refilled per second.
+        burst (int): Capacity of the bucket.
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def delay(self, now: float) -> float:
+        """Return the seconds until a token would be available."""
+        self._refill(now)
+        wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+        return max(wait, self._blocked_until - now)
+
+    def take(self, now: float) -> None:
+        """Take a token, the bucket may go into debt."""
+        self._refill(now)
+        self._tokens -= 1
+
+    def block(self, until: float) -> None:
+        """Hand out no token before `until` (monotonic time), e.g. after a `Retry-After`."""
+        self._blocked_until = max(self._blocked_until, until)
+
+
+@dataclass
+class RateLimiter:
+    """Token buckets for all requests, per account and per account and expensive operation.
+
+    A request waits until every bucket it passes has a token. Waits longer than `max_wait` are refused with
+    `RateLimitError` instead of queueing. `retry_after` pauses all requests after the server answered 429/503
+    with a `Retry-After` header. Share one limiter between clients to limit them together.
+
+    Attributes:
+        global_rate (float): Requests per second of all accounts.
+        global_burst (int): Burst of all accounts.
+        account_rate (float): Requests per second of one account.
+        account_burst (int): Burst of one account.
+        operation_limits (dict[str, tuple[float, int]]): Rate and burst per operation and account.
+        max_wait (float): Longest wait in seconds before a request is refused.
+        throttled (int): Number of requests which waited.
+        throttled_time (float): Seconds all requests waited.
+        rejected (int): Number of requests refused with `RateLimitError`.
+        retry_afters (int): Number of `Retry-After` answers of the server.
+    """
+
+    global_rate: float = DEFAULT_GLOBAL_RATE
+    global_burst: int = DEFAULT_GLOBAL_BURST
+    account_rate: float = DEFAULT_ACCOUNT_RATE
+    account_burst: int = DEFAULT_ACCOUNT_BURST
+    operation_limits: dict[str, tuple[float, int]] = field(default_factory=lambda: dict(DEFAULT_OPERATION_LIMITS))
+    max_wait: float = DEFAULT_MAX_WAIT
+    throttled: int = field(default=0, init=False, compare=False)
+    throttled_time: float = field(default=0.0, init=False, compare=False)
+    rejected: int = field(default=0, init=False, compare=False)
+    retry_afters: int = field(default=0, init=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._global = TokenBucket(self.global_rate, self.global_burst)
+        self._buckets: dict[tuple[str, str], TokenBucket] = {}
+        # reservations of sync callers from several threads
+        self._lock = threading.Lock()
+
+    def _bucket(self, account: str, operation: str) -> TokenBucket | None:
+        key = (account, operation)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if operation:
+                if operation not in self.operation_limits:
+                    return None
+                rate, burst = self.operation_limits[operation]
+            else:
+                rate, burst = self.account_rate, self.account_burst
+            bucket = self._buckets[key] = TokenBucket(rate, burst)
+        return bucket
+
+    def reserve(self, account: str = "", operation: str | None = None) -> float:
+        """Reserve a request and return the seconds to wait before sending it.
+
+        Raises:
+            RateLimitError: If the wait would exceed `max_wait`, nothing is reserved then.
+        """
+        with self._lock:
+            now = time.monotonic()
+            buckets = [self._global, self._bucket(account, "")]
+            operation_bucket = self._bucket(account, operation) if operation else None
+            if operation_bucket is not None:
+                buckets.append(operation_bucket)
+            wait = max(bucket.delay(now) for bucket in buckets)
+            if wait > self.max_wait:
+                self.rejected += 1
+                raise RateLimitError(wait)
+            for bucket in buckets:
+                bucket.take(now)
+            if wait > 0:
+                self.throttled += 1
+                self.throttled_time += wait
+            return wait
+
+    def acquire(self, account: str = "", operation: str | None = None) -> None:
+        """Wait until a request may be sent, blocking the thread."""
+        wait = self.reserve(account, operation)
+        if wait > 0:
+            _LOGGER.debug("Throttling %s for %.2fs", operation, wait)
+            time.sleep(wait)
+
+    async def acquire_a(self, account: str = "", operation: str | None = None) -> None:
+        """Wait until a request may be sent, without blocking the event loop."""
+        wait = self.reserve(account, operation)
+        if wait > 0:
+            _LOGGER.debug("Throttling %s for %.2fs", operation, wait)
+            await asyncio.sleep(wait)
+
+    def retry_after(self, seconds: float) -> None:
+        """Pause all requests for `seconds`, as asked by the server."""
+        with self._lock:
+            self.retry_afters += 1
+            self._global.block(time.monotonic() + seconds)
+
+    def metrics(self) -> dict[str, Any]:
+        """Return the counters as dict."""
+        return {
+            "throttled": self.throttled,
+            "throttled_time": self.throttled_time,
+            "rejected": self.rejected,
+            "retry_afters": self.retry_afters,
+        }
@@ -0,0 +1,107 @@
+"""Deferred mark-as-read of chat messages, sent in the background as aliased batches."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+import logging
+from typing import Any
+
+from .gql_batch import DEFAULT_MAX_BATCH_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_READ_RECEIPT_WINDOW = 0.05
+DEFAULT_READ_RECEIPT_CONCURRENCY = 4
+
+Receipt = tuple[str, str, str]
+
+
+class ReadReceiptQueue:
+    """Collect read receipts and send them in the background.
+
+    Receipts are coalesced per watch (a message marked twice is sent once) and, after `window` seconds
+    without being flushed, sent in chunks of `max_batch_size` with at most `max_concurrency` requests in flight.
+
+    Args:
+        send (Callable): Coroutine function taking a list of `(wuid, msgId, id)` receipts and sending them.
+        window (float, optional): Seconds to collect receipts before sending. Defaults to DEFAULT_READ_RECEIPT_WINDOW.
+        max_batch_size (int, optional): Maximum receipts per request. Defaults to DEFAULT_MAX_BATCH_SIZE.
+        max_concurrency (int, optional): Maximum requests in flight. Defaults to DEFAULT_READ_RECEIPT_CONCURRENCY.
+
+    Attributes:
+        marked (int): Number of receipts queued, including duplicates.
+        coalesced (int): Number of duplicate receipts dropped.
+        sent (int): Number of receipts sent.
+        failed (int): Number of receipts whose request raised.
+        batches (int): Number of requests made.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[list[Receipt]], Awaitable[Any]],
+        window: float = DEFAULT_READ_RECEIPT_WINDOW,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_concurrency: int = DEFAULT_READ_RECEIPT_CONCURRENCY,
+    ) -> None:
+        self._send = send
+        self.window = window
+        self.max_batch_size = max(1, max_batch_size)
+        self._semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        # wuid -> msgId -> id, insertion ordered
+        self._pending: dict[str, dict[str, str]] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task[None]] = set()
+        self.marked = 0
+        self.coalesced = 0
+        self.sent = 0
+        self.failed = 0
+        self.batches = 0
+
+    def __len__(self) -> int:
+        return sum(len(messages) for messages in self._pending.values())
+
+    def mark(self, wuid: str, msgId: str, _id: str = "") -> None:
+        """Queue a message as read, must be called from a running event loop."""
+        self.marked += 1
+        messages = self._pending.setdefault(wuid, {})
+        if msgId in messages:
+            self.coalesced += 1
+        messages[msgId] = _id
+        if len(self) >= self.max_batch_size:
+            self.flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self) -> None:
+        """Start sending all queued receipts now."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, {}
+        receipts = [(wuid, msgId, _id) for wuid, messages in pending.items() for msgId, _id in messages.items()]
+        for start in range(0, len(receipts), self.max_batch_size):
+            task = asyncio.ensure_future(self._run(receipts[start : start + self.max_batch_size]))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def drain(self) -> None:
+        """Send all queued receipts and wait until every request finished."""
+        self.flush()
+        while self._tasks:
+            await asyncio.gather(*self._tasks)
+
+    async def aclose(self) -> None:
+        """Flush the queue before the connections are closed."""
+        await self.drain()
+
+    async def _run(self, receipts: list[Receipt]) -> None:
+        async with self._semaphore:
+            self.batches += 1
+            try:
+                await self._send(receipts)
+            except Exception as error:
+                self.failed += len(receipts)
+                _LOGGER.debug("Sending %s read receipts failed: %s", len(receipts), error)
+            else:
+                self.sent += len(receipts)
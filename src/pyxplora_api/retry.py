@@ -0,0 +1,206 @@
+"""Retry policies with exponential backoff and jitter shared by the sync and async clients."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from dataclasses import dataclass, field
+import logging
+import random
+import time
+from typing import Any, TypeVar
+
+import aiohttp
+import requests
+
+from .cache import is_query
+
+_LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_MAX_ELAPSED = 60.0
+
+# Mutations that can be sent twice without a different outcome, all other mutations are never retried.
+IDEMPOTENT_MUTATIONS: frozenset[str] = frozenset(
+    {
+        "signInWithEmailOrPhone",
+        "RefreshToken",
+        "ModifyAlarm",
+        "SetEnableSlientTime",
+        "setReadChatMsg",
+    }
+)
+
+_RETRYABLE_STATUS = frozenset({408, 429, 500, 502, 503, 504})
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    """Return True for transport failures worth retrying: connection problems, timeouts, 408/429/5xx responses."""
+    if isinstance(error, (asyncio.TimeoutError, aiohttp.ClientConnectionError, requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in _RETRYABLE_STATUS
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code in _RETRYABLE_STATUS
+    return False
+
+
+def is_retryable_response(data: Any) -> bool:
+    """Return True for an empty response, the async client returns `{}` when a request failed."""
+    return not data
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter, bounded by attempts and elapsed time.
+
+    The delay before retry `n` (1-based) is a random value between `base_delay * multiplier ** (n - 1) * (1 - jitter)`
+    and `base_delay * multiplier ** (n - 1)`, capped at `max_delay`.
+
+    Attributes:
+        max_attempts (int): Maximum number of attempts, including the first one.
+        base_delay (float): Delay in seconds before the first retry.
+        max_delay (float): Upper bound of a single delay in seconds.
+        multiplier (float): Growth factor of the delay per retry.
+        jitter (float): Fraction of the delay that is randomised, 0 disables jitter and 1 is full jitter.
+        max_elapsed (float | None): No retry is started after this many seconds since the first attempt.
+        budgets (dict[str, int]): Maximum number of attempts per operation name, overriding `max_attempts`.
+        idempotent_mutations (frozenset[str]): Mutations which may be retried, see `IDEMPOTENT_MUTATIONS`.
+        attempts (int): Number of attempts made through `call`/`call_async`.
+        retries (int): Number of those attempts which were retries.
+        give_ups (int): Number of calls that still failed when the policy gave up.
+    """
+
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    base_delay: float = DEFAULT_BASE_DELAY
+    max_delay: float = DEFAULT_MAX_DELAY
+    multiplier: float = 2.0
+    jitter: float = 1.0
+    max_elapsed: float | None = DEFAULT_MAX_ELAPSED
+    budgets: dict[str, int] = field(default_factory=dict)
+    idempotent_mutations: frozenset[str] = IDEMPOTENT_MUTATIONS
+    attempts: int = field(default=0, init=False, compare=False)
+    retries: int = field(default=0, init=False, compare=False)
+    give_ups: int = field(default=0, init=False, compare=False)
+
+    @classmethod
+    def from_settings(cls, maxRetries: int, retryDelay: float) -> RetryPolicy:
+        """Build the policy matching the `maxRetries`/`retryDelay` settings of `PyXplora`.
+
+        The clients make `maxRetries + 2` attempts, the first retry waits about `retryDelay` seconds.
+        """
+        return cls(max_attempts=maxRetries + 2, base_delay=retryDelay, max_delay=max(retryDelay * 8, retryDelay))
+
+    def budget(self, operation: str | None = None) -> int:
+        """Return the maximum number of attempts of an operation."""
+        return self.budgets.get(operation or "", self.max_attempts)
+
+    def allows(self, query: str, operation: str | None = None) -> bool:
+        """Return True if the GraphQL document may be retried: all queries and the idempotent mutations."""
+        return is_query(query) or (operation or "") in self.idempotent_mutations
+
+    def backoff(self, attempt: int) -> float:
+        """Return the delay in seconds to wait after the failed attempt `attempt` (1-based)."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** max(attempt - 1, 0))
+        return delay - random.uniform(0, delay * self.jitter)
+
+    def delays(self, operation: str | None = None, start: float | None = None) -> Iterator[float]:
+        """Return the delays before each retry while the attempt budget and `max_elapsed` allow another attempt.
+
+        Take it before the first attempt and iterate it after each failed attempt: when the iterator is exhausted,
+        give up. `max_elapsed` counts from `start` (a `time.monotonic()` reading), by default from this call.
+        """
+        # taken now, not on the first `next()` after the first attempt, so `max_elapsed` counts that attempt too
+        return self._delays(operation, time.monotonic() if start is None else start)
+
+    def _delays(self, operation: str | None, start: float) -> Iterator[float]:
+        for attempt in range(1, self.budget(operation)):
+            delay = self.backoff(attempt)
+            if self.max_elapsed is not None and time.monotonic() - start + delay > self.max_elapsed:
+                return
+            yield delay
+
+    def call(
+        self,
+        fn: Callable[[], T],
+        operation: str | None = None,
+        retry_on: tuple[type[BaseException], ...] | None = None,
+        retry_if: Callable[[T], bool] | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> T:
+        """Call `fn` and retry it while it fails, sleeping between attempts.
+
+        Args:
+            fn (Callable[[], T]): The call to make.
+            operation (str, optional): The operation name, selects the attempt budget.
+            retry_on (tuple[type[BaseException], ...], optional): Exceptions to retry, defaults to `is_retryable_error`.
+            retry_if (Callable[[T], bool], optional): Retry while it returns True for the result.
+            sleep (Callable[[float], None], optional): The sleep function. Defaults to time.sleep.
+
+        Returns:
+            T: The first good result, or the last result once the policy gave up.
+
+        Raises:
+            The last exception once the policy gave up.
+        """
+        delays = self.delays(operation, time.monotonic())
+        while True:
+            self.attempts += 1
+            try:
+                result = fn()
+            except Exception as error:
+                delay = self._next(delays, error, retry_on)
+                if delay is None:
+                    raise
+            else:
+                delay = self._next(delays, result, None) if retry_if is not None and retry_if(result) else None
+                if delay is None:
+                    return result
+            _LOGGER.debug("Retrying %s in %.2fs", operation or fn, delay)
+            sleep(delay)
+
+    async def call_async(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        operation: str | None = None,
+        retry_on: tuple[type[BaseException], ...] | None = None,
+        retry_if: Callable[[T], bool] | None = None,
+    ) -> T:
+        """Await `fn()` and retry it while it fails, sleeping between attempts.
+
+        See `call` for the arguments.
+
+        Raises:
+            The last exception once the policy gave up.
+        """
+        delays = self.delays(operation, time.monotonic())
+        while True:
+            self.attempts += 1
+            try:
+                result = await fn()
+            except Exception as error:
+                delay = self._next(delays, error, retry_on)
+                if delay is None:
+                    raise
+            else:
+                delay = self._next(delays, result, None) if retry_if is not None and retry_if(result) else None
+                if delay is None:
+                    return result
+            _LOGGER.debug("Retrying %s in %.2fs", operation or fn, delay)
+            await asyncio.sleep(delay)
+
+    def _next(self, delays: Iterator[float], outcome: Any, retry_on: tuple[type[BaseException], ...] | None) -> float | None:
+        if isinstance(outcome, BaseException):
+            retryable = isinstance(outcome, retry_on) if retry_on is not None else is_retryable_error(outcome)
+            if not retryable:
+                return None
+        delay = next(delays, None)
+        if delay is None:
+            self.give_ups += 1
+        else:
+            self.retries += 1
+        return delay
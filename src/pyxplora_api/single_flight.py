@@ -0,0 +1,73 @@
+"""Request coalescing (single-flight) for concurrent identical GraphQL queries."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+import json
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Share one in-flight call between all concurrent callers using the same key.
+
+    The first caller for a key starts the call, every caller arriving while it is still running awaits the
+    same result. Once the call finished the key is released, so later callers start a fresh call.
+
+    Attributes:
+        calls (int): Number of calls actually started.
+        coalesced (int): Number of callers that joined an already running call.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future[Any]] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(operation_name: str | None, variables: dict[str, Any] | None) -> tuple[str, str]:
+        """Build the coalescing key of a GraphQL operation.
+
+        Args:
+            operation_name (str | None): The name of the operation.
+            variables (dict[str, Any] | None): The variables of the operation.
+
+        Returns:
+            tuple[str, str]: A hashable key, independent of the order of the variables.
+        """
+        return operation_name or "", json.dumps(variables or {}, sort_keys=True, default=str)
+
+    def in_flight(self) -> int:
+        """Return the number of calls currently running."""
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run `fn` once for all concurrent callers of `key` and return its result.
+
+        Cancelling one caller does not cancel the shared call for the other callers.
+
+        Args:
+            key (Hashable): The coalescing key.
+            fn (Callable[[], Awaitable[T]]): Factory of the awaitable to run.
+
+        Returns:
+            T: The result of the shared call.
+        """
+        future = self._calls.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(future)
+
+    def _release(self, key: Hashable, future: asyncio.Future[Any]) -> None:
+        if self._calls.get(key) is future:
+            del self._calls[key]
+        if not future.cancelled():
+            # mark the exception as retrieved, the callers still get it through `shield`
+            future.exception()
@@ -0,0 +1,212 @@
+"""Lifecycle of the session token: track its expiry and refresh it in the background before it runs out."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+import logging
+from time import time
+from typing import TYPE_CHECKING, Any
+
+from .auth_gate import AuthGate
+from .exception_classes import Error, LoginCooldownError
+
+if TYPE_CHECKING:
+    from .gql_handler_async import GQLHandler
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TOKEN_LIFETIME = 240
+DEFAULT_TOKEN_REFRESH_MARGIN = 30
+
+# operations issuing tokens, they must never wait for a refresh
+TOKEN_OPERATIONS = frozenset({"signInWithEmailOrPhone", "RefreshToken"})
+
+
+def parse_timestamp(value: Any) -> float | None:
+    """Return a timestamp in seconds from epoch seconds, epoch milliseconds or an ISO 8601 string."""
+    if value is None or value == "":
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        try:
+            return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    # milliseconds
+    return number / 1000 if number > 1e11 else number
+
+
+def token_times(token: dict[str, Any], lifetime: float = DEFAULT_TOKEN_LIFETIME) -> tuple[float, float]:
+    """Return the issue and expiry timestamp of a token, `lifetime` seconds after its issue if it has no `expireDate`."""
+    now = time()
+    issued_at = parse_timestamp(token.get("issueDate")) or now
+    expires_at = parse_timestamp(token.get("expireDate")) or issued_at + lifetime
+    if expires_at <= now:
+        # clocks disagree, trust the local one
+        return now, now + lifetime
+    return issued_at, expires_at
+
+
+class TokenManager:
+    """Keep the access token of a `GQLHandler` valid.
+
+    The token is renewed with the `RefreshToken` mutation `refresh_margin` seconds before it expires, a full login
+    is only made when the refresh fails. Requests sent while a refresh is running wait for it, see `ensure_valid`.
+    With a shared `handler.tokenStore` the renewal holds the lock of the account across processes and takes over a
+    token another process renewed meanwhile instead of renewing it again.
+
+    Args:
+        handler (GQLHandler): The handler whose token is managed.
+        login (Callable, optional): Coroutine function making a full login, returning the new token or None if the
+            login failed. Defaults to `handler.login_a`.
+        lifetime (float, optional): Seconds a token is valid if the server sends no `expireDate`.
+        refresh_margin (float, optional): Seconds before the expiry the token is refreshed.
+        gate (AuthGate, optional): The gate every login and refresh of the account passes.
+
+    Attributes:
+        issued_at (float): Timestamp the token was issued, 0 before the first login.
+        expires_at (float): Timestamp the token expires, 0 before the first login.
+        refreshes (int): Number of successful refreshes.
+        logins (int): Number of full logins made because a refresh failed.
+        failures (int): Number of failed refreshes.
+        adopted (int): Number of tokens taken over from another process through the token store.
+    """
+
+    def __init__(
+        self,
+        handler: GQLHandler,
+        login: Callable[[], Awaitable[Any]] | None = None,
+        lifetime: float = DEFAULT_TOKEN_LIFETIME,
+        refresh_margin: float = DEFAULT_TOKEN_REFRESH_MARGIN,
+        gate: AuthGate | None = None,
+    ) -> None:
+        self.handler = handler
+        self.gate = AuthGate() if gate is None else gate
+        self._login = login if login is not None else self._handler_login
+        self.lifetime = lifetime
+        self.refresh_margin = refresh_margin
+        self.issued_at = 0.0
+        self.expires_at = 0.0
+        self._refreshing: asyncio.Future[None] | None = None
+        self._timer: asyncio.Task[None] | None = None
+        self.refreshes = 0
+        self.logins = 0
+        self.failures = 0
+        self.adopted = 0
+
+    async def _handler_login(self) -> dict[str, Any] | None:
+        token, _ = await self.handler.login_a(None, None)
+        return token
+
+    def update(self, token: dict[str, Any] | None) -> None:
+        """Take the issue and expiry time of a token returned by `signInWithEmailOrPhone` or `RefreshToken`."""
+        if token:
+            self.issued_at, self.expires_at = token_times(token, self.lifetime)
+
+    def restore(self, issued_at: float, expires_at: float) -> None:
+        """Take the issue and expiry time of a token saved by an earlier session."""
+        self.issued_at, self.expires_at = issued_at, expires_at
+
+    def expired(self) -> bool:
+        """Return True if there is no token or it has expired."""
+        return time() >= self.expires_at
+
+    def _margin(self) -> float:
+        return min(self.refresh_margin, (self.expires_at - self.issued_at) / 2)
+
+    def start(self) -> None:
+        """Schedule the next background refresh, must be called from a running event loop."""
+        if self._timer is not None:
+            self._timer.cancel()
+        if self.expires_at:
+            self._timer = asyncio.ensure_future(self._refresh_later(self.expires_at - self._margin() - time()))
+
+    async def aclose(self) -> None:
+        """Stop the background refresh."""
+        timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+            await asyncio.gather(timer, return_exceptions=True)
+
+    async def ensure_valid(self, operation_name: str | None = None) -> None:
+        """Wait for a running refresh, or refresh the token first if it has expired.
+
+        A token within the refresh margin is refreshed in the background while the request goes on.
+        """
+        if operation_name in TOKEN_OPERATIONS or not self.expires_at:
+            return
+        if self._refreshing is not None:
+            await asyncio.shield(self._refreshing)
+        elif self.expired():
+            await self.refresh()
+        elif time() >= self.expires_at - self._margin():
+            self._start_refresh()
+
+    async def refresh(self) -> None:
+        """Refresh the token now, concurrent callers share one refresh."""
+        await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Future[None]:
+        if self._refreshing is None:
+            self._refreshing = asyncio.ensure_future(self._gated_refresh())
+            self._refreshing.add_done_callback(self._refreshed)
+        return self._refreshing
+
+    def _refreshed(self, future: asyncio.Future[None]) -> None:
+        if self._refreshing is future:
+            self._refreshing = None
+
+    async def _refresh_later(self, delay: float) -> None:
+        await asyncio.sleep(max(delay, 0))
+        self._timer = None
+        await self.refresh()
+
+    async def _gated_refresh(self) -> None:
+        try:
+            await self.gate.run(self._refresh)
+        except LoginCooldownError as error:
+            _LOGGER.debug("Token not refreshed: %s", error)
+
+    async def _refresh(self) -> bool:
+        async with self.handler.sessionLock_a():
+            shared = self.handler.sharedSession()
+            if shared is not None:
+                self.handler.restoreSession(shared)
+                self.adopted += 1
+                self.start()
+                return True
+            return await self._renew()
+
+    async def _renew(self) -> bool:
+        handler = self.handler
+        token = None
+        if handler.refreshToken:
+            try:
+                token = (await handler.refresh_token_a(handler.userId, handler.refreshToken) or {}).get("refreshToken")
+            except Error as error:
+                _LOGGER.debug("Refreshing the token failed: %s", error)
+        if token and token.get("token") and token.get("valid") is not False:
+            handler.accessToken = token["token"]
+            handler.refreshToken = token.get("refreshToken") or handler.refreshToken
+            if handler.issueToken is not None:
+                handler.issueToken = {**handler.issueToken, **token}
+            self.refreshes += 1
+            self.update(token)
+        else:
+            self.failures += 1
+            _LOGGER.debug("Token refresh rejected, logging in again")
+            try:
+                token = await self._login()
+            except Error as error:
+                _LOGGER.debug("Login after a failed refresh failed: %s", error)
+                token = None
+            if not token:
+                return False
+            self.logins += 1
+            self.update(token)
+        self.start()
+        handler.saveSession()
+        return True
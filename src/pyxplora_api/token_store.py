@@ -0,0 +1,322 @@
+"""Persistent stores for the session of an account, so a restarted process resumes without a login."""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+from time import monotonic, sleep, time
+from typing import Any
+
+from .exception_classes import TokenStoreError
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None  # type: ignore[assignment]
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_SQLITE_TIMEOUT = 5.0
+DEFAULT_LOCK_TIMEOUT = 30.0
+DEFAULT_LOCK_POLL_INTERVAL = 0.05
+
+
+def account_key(countrycode: str | None = "", phoneNumber: str | None = "", email: str | None = "") -> str:
+    """Return the key an account is stored under, a hash so phone numbers and e-mail addresses are not kept in clear.
+
+    Args:
+        countrycode (str, optional): The country code of the phone number.
+        phoneNumber (str, optional): The phone number.
+        email (str, optional): The e-mail address.
+
+    Returns:
+        str: The hex sha256 of the identity.
+    """
+    identity = f"{countrycode or ''}|{phoneNumber or ''}|{(email or '').lower()}"
+    return hashlib.sha256(identity.encode()).hexdigest()
+
+
+class ProcessLock:
+    """An advisory lock on a file, shared by all processes using the same file and reentrant for the owning thread.
+
+    Other threads of the process wait like other processes do. Waiting polls the lock, so a waiting coroutine does not
+    block the event loop and can be cancelled. If the lock cannot be taken within the timeout the caller goes on
+    without it, a hung process must not stop the others.
+    Without `fcntl` (Windows) the lock is always granted.
+
+    Args:
+        path (str): The lock file, created on first use.
+        timeout (float, optional): Seconds to wait for the lock. Defaults to DEFAULT_LOCK_TIMEOUT.
+        poll_interval (float, optional): Seconds between two attempts. Defaults to DEFAULT_LOCK_POLL_INTERVAL.
+    """
+
+    def __init__(
+        self, path: str, timeout: float = DEFAULT_LOCK_TIMEOUT, poll_interval: float = DEFAULT_LOCK_POLL_INTERVAL
+    ) -> None:
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd: int | None = None
+        # the thread holding the lock and how often it took it, changed under `_guard` only
+        self._guard = threading.Lock()
+        self._thread: int | None = None
+        self._depth = 0
+
+    @property
+    def held(self) -> bool:
+        """True while this object holds the lock."""
+        return self._depth > 0
+
+    def try_acquire(self) -> bool:
+        """Take the lock if it is free, return False if another thread or process holds it."""
+        with self._guard:
+            if self._depth:
+                if self._thread != threading.get_ident():
+                    return False
+                self._depth += 1
+                return True
+            if fcntl is not None:
+                try:
+                    fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+                except OSError as error:
+                    raise TokenStoreError(self.path, error) from error
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    os.close(fd)
+                    return False
+                self._fd = fd
+            self._thread = threading.get_ident()
+            self._depth = 1
+            return True
+
+    def release(self) -> None:
+        """Give the lock back once every acquire of the owning thread was released."""
+        with self._guard:
+            if not self._depth or self._thread != threading.get_ident():
+                return
+            self._depth -= 1
+            if not self._depth:
+                self._thread = None
+                if self._fd is not None:
+                    # closing the descriptor releases the lock
+                    os.close(self._fd)
+                    self._fd = None
+
+    @contextmanager
+    def hold(self) -> Iterator[bool]:
+        """Hold the lock for the block, yields False if it could not be taken in time."""
+        deadline = monotonic() + self.timeout
+        acquired = self._attempt()
+        while acquired is False and monotonic() < deadline:
+            sleep(self.poll_interval)
+            acquired = self._attempt()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                self.release()
+
+    @asynccontextmanager
+    async def hold_a(self) -> AsyncIterator[bool]:
+        """Like `hold`, waiting without blocking the event loop."""
+        deadline = monotonic() + self.timeout
+        acquired = self._attempt()
+        while acquired is False and monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            acquired = self._attempt()
+        try:
+            yield bool(acquired)
+        finally:
+            if acquired:
+                self.release()
+
+    def _attempt(self) -> bool | None:
+        # None if the lock file is unusable, there is nothing to wait for then
+        try:
+            return self.try_acquire()
+        except TokenStoreError as error:
+            _LOGGER.warning("Going on without the lock: %s", error)
+            return None
+
+
+class TokenStore(ABC):
+    """Base class of the session stores.
+
+    A session is the dict returned by `HandlerGQL.exportSession` with the `issuedAt` and `expiresAt` timestamps of
+    the token added. Stores hold credentials, keep them readable by the owner only. Failures of the backend are
+    raised as `TokenStoreError`.
+    """
+
+    @abstractmethod
+    def load(self, account: str) -> dict[str, Any] | None:
+        """Return the stored session of an account or None."""
+
+    @abstractmethod
+    def save(self, account: str, state: dict[str, Any]) -> None:
+        """Store the session of an account, replacing the previous one."""
+
+    @abstractmethod
+    def delete(self, account: str) -> None:
+        """Forget the session of an account."""
+
+    def lock(self, account: str) -> ProcessLock | None:
+        """Return the lock the processes sharing the store take to log in or refresh an account, None if the store
+        is not shared between processes."""
+        return None
+
+
+class FileTokenStore(TokenStore):
+    """Store sessions in a JSON file, keyed by account.
+
+    Processes sharing the file serialise their access with an advisory lock on `<path>.lock` (not available on
+    Windows), the file is replaced atomically so readers never see a partial write.
+
+    Args:
+        path (str | os.PathLike): The JSON file, created on the first save.
+    """
+
+    def __init__(self, path: str | os.PathLike[str]) -> None:
+        self.path = os.fspath(path)
+        self._lock_path = f"{self.path}.lock"
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        if fcntl is None:
+            yield
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            os.close(fd)
+
+    def lock(self, account: str) -> ProcessLock:
+        return ProcessLock(f"{self.path}.{account[:16]}.lock")
+
+    def _read(self) -> dict[str, Any]:
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except ValueError as error:
+            _LOGGER.warning("Ignoring unreadable token store %s: %s", self.path, error)
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _write(self, data: dict[str, Any]) -> None:
+        directory = os.path.dirname(self.path) or "."
+        fd, tmp = tempfile.mkstemp(prefix=".tokens-", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                json.dump(data, file, separators=(",", ":"))
+                file.flush()
+                os.fsync(file.fileno())
+            os.chmod(tmp, 0o600)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def load(self, account: str) -> dict[str, Any] | None:
+        try:
+            with self._locked(False):
+                return self._read().get(account)
+        except OSError as error:
+            raise TokenStoreError(self.path, error) from error
+
+    def save(self, account: str, state: dict[str, Any]) -> None:
+        try:
+            with self._locked(True):
+                data = self._read()
+                data[account] = state
+                self._write(data)
+        except (OSError, TypeError, ValueError) as error:
+            raise TokenStoreError(self.path, error) from error
+
+    def delete(self, account: str) -> None:
+        try:
+            with self._locked(True):
+                data = self._read()
+                if data.pop(account, None) is not None:
+                    self._write(data)
+        except OSError as error:
+            raise TokenStoreError(self.path, error) from error
+
+
+class SQLiteTokenStore(TokenStore):
+    """Store sessions in a SQLite database, one row per account.
+
+    SQLite locks the database itself, so the store can be shared by several processes. The database runs in WAL
+    mode, readers are not blocked while another process saves a session.
+
+    Args:
+        path (str | os.PathLike): The database file, created with its table on first use.
+        timeout (float, optional): Seconds to wait for a lock held by another process. Defaults to DEFAULT_SQLITE_TIMEOUT.
+    """
+
+    def __init__(self, path: str | os.PathLike[str], timeout: float = DEFAULT_SQLITE_TIMEOUT) -> None:
+        self.path = os.fspath(path)
+        self.timeout = timeout
+        self._ready = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        try:
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+        except sqlite3.Error as error:
+            raise TokenStoreError(self.path, error) from error
+        try:
+            with connection:
+                if not self._ready:
+                    connection.execute("PRAGMA journal_mode=WAL")
+                    connection.execute(
+                        "CREATE TABLE IF NOT EXISTS tokens "
+                        "(account TEXT PRIMARY KEY, state TEXT NOT NULL, updated REAL NOT NULL)"
+                    )
+                    self._ready = True
+                yield connection
+        except sqlite3.Error as error:
+            raise TokenStoreError(self.path, error) from error
+        finally:
+            connection.close()
+
+    def lock(self, account: str) -> ProcessLock:
+        return ProcessLock(f"{self.path}.{account[:16]}.lock")
+
+    def load(self, account: str) -> dict[str, Any] | None:
+        with self._connect() as connection:
+            row = connection.execute("SELECT state FROM tokens WHERE account = ?", (account,)).fetchone()
+        try:
+            return json.loads(row[0]) if row else None
+        except ValueError as error:
+            _LOGGER.warning("Ignoring unreadable session in %s: %s", self.path, error)
+            return None
+
+    def save(self, account: str, state: dict[str, Any]) -> None:
+        try:
+            encoded = json.dumps(state, separators=(",", ":"))
+        except (TypeError, ValueError) as error:
+            raise TokenStoreError(self.path, error) from error
+        with self._connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO tokens (account, state, updated) VALUES (?, ?, ?)", (account, encoded, time())
+            )
+
+    def delete(self, account: str) -> None:
+        with self._connect() as connection:
+            connection.execute("DELETE FROM tokens WHERE account = ?", (account,))
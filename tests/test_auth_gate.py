@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pyxplora_api import auth_gate
+from pyxplora_api.auth_gate import AuthGate
+from pyxplora_api.exception_classes import LoginCooldownError
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+
+
+def test_concurrent_callers_share_one_attempt_and_failures_start_a_cooldown(monkeypatch) -> None:
+    clock = [100.0]
+    monkeypatch.setattr(auth_gate, "monotonic", lambda: clock[0])
+    gate = AuthGate(cooldown=5, max_cooldown=8)
+    calls = []
+
+    async def attempt(result):
+        calls.append(result)
+        await asyncio.sleep(0)
+        return result
+
+    async def run():
+        shared = await asyncio.gather(*(gate.run(lambda: attempt("token")) for _ in range(3)))
+        assert await gate.run(lambda: attempt(None)) is None
+        with pytest.raises(LoginCooldownError) as refused:
+            await gate.run(lambda: attempt("token"))
+        assert refused.value.retry_after == 5
+        clock[0] += 5
+        await gate.run(lambda: attempt(None))
+        assert gate.retry_after() == 8
+        clock[0] += 8
+        return shared, await gate.run(lambda: attempt("again"))
+
+    shared, again = asyncio.run(run())
+
+    assert shared == ["token"] * 3
+    assert again == "again"
+    assert calls == ["token", None, None, "again"]
+    assert (gate.attempts, gate.successes, gate.failures, gate.coalesced, gate.refused) == (4, 2, 2, 2, 1)
+    assert gate.retry_after() == 0
+
+
+def test_concurrent_inits_make_one_login(monkeypatch) -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    logins = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        logins.append(operation_name)
+        await asyncio.sleep(0.001)
+        return {"data": {"signInWithEmailOrPhone": {"token": "t", "refreshToken": "r", "id": "s", "user": {"id": "u"}}}}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        tokens = await asyncio.gather(*(api._login() for _ in range(5)))
+        await api.aclose()
+        return tokens
+
+    tokens = asyncio.run(run())
+
+    assert logins == ["signInWithEmailOrPhone"]
+    assert {token["token"] for token, _ in tokens} == {"t"}
+    assert api._gql_handler.tokens.gate.coalesced == 4
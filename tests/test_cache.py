@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import asyncio
+
+from pyxplora_api import gql_queries as gq
+from pyxplora_api.cache import ResponseCache, cache_bypass, is_query, operation_name_of
+from pyxplora_api.gql_handler_async import GQLHandler
+
+
+def test_operation_helpers_read_the_document_header() -> None:
+    assert operation_name_of(gq.WATCH_Q["alarmsQ"]) == "Alarms"
+    assert operation_name_of("mutation ModifyAlarm($alarmId: String!) {}") == "ModifyAlarm"
+    assert operation_name_of("") == ""
+    assert is_query(gq.WATCH_Q["alarmsQ"]) is True
+    assert is_query("mutation X { x }") is False
+
+
+def test_ttl_policy_bypass_and_expiry(monkeypatch) -> None:
+    now = [100.0]
+    monkeypatch.setattr("pyxplora_api.cache.monotonic", lambda: now[0])
+    cache = ResponseCache(ttls={"Watches": 10, "WatchLastLocate": 0})
+    response = {"data": {"watches": []}}
+
+    cache.set("WatchLastLocate", {"uid": "w"}, {"data": {}})
+    cache.set("Watches", {"uid": "w"}, {"errors": [{"message": "no"}], "data": None})
+    assert len(cache) == 0
+
+    cache.set("Watches", {"uid": "w"}, response)
+    assert cache.get("Watches", {"uid": "w"}) is response
+    with cache_bypass():
+        assert cache.get("Watches", {"uid": "w"}) is None
+    now[0] = 111.0
+    assert cache.get("Watches", {"uid": "w"}) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lru_eviction_respects_entry_and_byte_bounds() -> None:
+    cache = ResponseCache(default_ttl=60, max_entries=2)
+    for uid in ("a", "b", "c"):
+        cache.set("Alarms", {"uid": uid}, {"data": {"alarms": [uid]}})
+    assert cache.get("Alarms", {"uid": "a"}) is None
+    assert cache.get("Alarms", {"uid": "c"}) is not None
+    assert cache.evictions == 1
+
+    cache = ResponseCache(default_ttl=60, max_bytes=60)
+    cache.set("Alarms", {"uid": "a"}, {"data": {"alarms": ["x" * 20]}})
+    cache.set("Alarms", {"uid": "b"}, {"data": {"alarms": ["y" * 20]}})
+    assert len(cache) == 1
+    assert cache.size <= 60
+
+
+def test_mutations_invalidate_reads_of_the_touched_entity() -> None:
+    cache = ResponseCache(default_ttl=60)
+    for uid in ("w1", "w2"):
+        cache.set("SafeZones", {"uid": uid}, {"data": {"safeZones": []}})
+        cache.set("Alarms", {"uid": uid}, {"data": {"alarms": []}})
+
+    assert cache.invalidate_for_mutation("AddSafeZone", {"uid": "w1"}) == 1
+    assert cache.get("SafeZones", {"uid": "w2"}) is not None
+    # ModifyAlarm only knows the alarm id, so every cached alarm list is dropped
+    assert cache.invalidate_for_mutation("ModifyAlarm", {"alarmId": "a1"}) == 2
+    assert cache.invalidate(wuid="w2") == 1
+    assert len(cache) == 0
+
+
+def test_async_handler_serves_cached_reads_until_a_mutation(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin", cache=ResponseCache(default_ttl=60))
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        if operation_name == "ModifyAlarm":
+            return {"data": {"modifyAlarm": 1}}
+        return {"data": {"alarms": []}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        await handler.getAlarmTime_a("w1")
+        await handler.getAlarmTime_a("w1")
+        with handler.bypass_cache():
+            await handler.getAlarmTime_a("w1")
+        await handler.setEnableAlarmTime_a("alarm-1")
+        await handler.getAlarmTime_a("w1")
+
+    asyncio.run(run())
+
+    assert sent == ["Alarms", "Alarms", "ModifyAlarm", "Alarms"]
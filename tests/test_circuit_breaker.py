@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pyxplora_api import circuit_breaker
+from pyxplora_api.circuit_breaker import CircuitBreaker, CircuitState, LastKnownGood
+from pyxplora_api.exception_classes import CircuitOpenError, LoginError
+from pyxplora_api.gql_handler_async import GQLHandler
+from pyxplora_api.graphql_client import GraphqlClient
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch) -> Clock:
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, "monotonic", clock)
+    return clock
+
+
+def fail() -> None:
+    raise ConnectionError("down")
+
+
+def test_circuit_opens_on_failures_and_fails_fast(clock) -> None:
+    breaker = CircuitBreaker(min_calls=4, failure_rate=0.5, open_timeout=30)
+    called = []
+
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.call(lambda: {}, lambda data: not data) == {}
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state is CircuitState.CLOSED
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+
+    assert breaker.state is CircuitState.OPEN
+    clock.now += 10
+    with pytest.raises(CircuitOpenError) as error:
+        breaker.call(lambda: called.append(True))
+    assert error.value.retry_after == pytest.approx(20)
+    assert called == []
+    assert (breaker.opened, breaker.rejected) == (1, 1)
+
+
+def test_half_open_probe_closes_or_reopens_the_circuit(clock) -> None:
+    breaker = CircuitBreaker(min_calls=1, open_timeout=5)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+
+    clock.now += 5
+    assert breaker.state is CircuitState.HALF_OPEN
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    assert breaker.state is CircuitState.OPEN
+
+    clock.now += 5
+    assert breaker.call(lambda: "ok") == "ok"
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.opened == 2
+
+
+def test_slow_calls_count_as_failures(clock) -> None:
+    breaker = CircuitBreaker(min_calls=2, slow_call_duration=1)
+
+    def slow() -> str:
+        clock.now += 2
+        return "late"
+
+    breaker.call(slow)
+    breaker.call(slow)
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_only_one_probe_passes_while_half_open(clock) -> None:
+    breaker = CircuitBreaker(min_calls=1, open_timeout=1)
+    with pytest.raises(ConnectionError):
+        breaker.call(fail)
+    clock.now += 1
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def probe() -> str:
+            await gate.wait()
+            return "ok"
+
+        first = asyncio.ensure_future(breaker.call_async(probe))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call_async(probe)
+        gate.set()
+        return await first
+
+    assert asyncio.run(run()) == "ok"
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_last_known_good_keeps_successful_responses_only() -> None:
+    stale = LastKnownGood(max_entries=1)
+    stale.set("a", {"data": {"x": 1}})
+    stale.set("b", {"errors": [{"message": "nope"}]})
+    stale.set("c", {})
+
+    assert stale.get("a") == {"data": {"x": 1}}
+    stale.set("d", {"data": {"x": 2}})
+    assert stale.get("a") is None and len(stale) == 1
+    assert stale.served == 1
+
+
+class FailingSession:
+    def post(self, endpoint: str, *, data: bytes, headers: dict):
+        raise ConnectionError("down")
+
+
+def test_client_stops_sending_while_the_circuit_is_open() -> None:
+    breaker = CircuitBreaker(min_calls=2)
+    client = GraphqlClient("https://example.test/graphql", circuit_breaker=breaker)
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await client.ha_execute_async("query", session=FailingSession())
+        with pytest.raises(CircuitOpenError):
+            await client.ha_execute_async("query", session=FailingSession())
+
+    asyncio.run(run())
+    assert breaker.rejected == 1
+
+
+def test_handler_serves_the_last_good_response_while_open(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    open_circuit = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        if open_circuit:
+            raise CircuitOpenError(30)
+        return {"data": {"alarms": [{"id": "1"}]}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        fresh = await handler.getAlarmTime_a("w1")
+        open_circuit.append(True)
+        handler.cache.clear()
+        stale = await handler.getAlarmTime_a("w1")
+        with pytest.raises(CircuitOpenError):
+            await handler.getAlarmTime_a("w2")
+        await handler.aclose()
+        return fresh, stale
+
+    fresh, stale = asyncio.run(run())
+    assert fresh == stale == {"alarms": [{"id": "1"}]}
+    assert handler.lastKnownGood.served == 1
+
+
+def test_init_raises_instead_of_recursing_without_token(monkeypatch) -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    calls = []
+
+    async def fake_login(forceLogin=False, key=None, sec=None):
+        calls.append(True)
+        return None, None
+
+    monkeypatch.setattr(api, "_login", fake_login)
+
+    with pytest.raises(LoginError):
+        asyncio.run(api.init())
+    assert calls == [True]
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+import pytest
+
+from pyxplora_api.device import DEVICE_FIELDS, DeviceSnapshot, operations_of, select_fields, sources_of
+from pyxplora_api.exception_classes import RateLimitError
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+
+
+def test_selection_resolves_fields_groups_and_sources() -> None:
+    assert select_fields() == list(DEVICE_FIELDS)
+    assert select_fields("battery") == ["watch_battery", "watch_charging"]
+    assert select_fields(["getWatchAlarm", "safeZoneLabel", "profile"]) == [
+        "getWatchAlarm",
+        "safeZoneLabel",
+        "getWatchUserIcons",
+        "getWatchUserXCoins",
+    ]
+    with pytest.raises(ValueError):
+        select_fields(["battery", "colour"])
+
+
+def test_fields_of_one_source_are_fetched_once() -> None:
+    fields = ["watch_battery", "watch_charging", "locateType", "safeZoneLabel"]
+
+    assert sources_of(fields) == ["askLocate", "location"]
+    assert operations_of(sources_of(fields)) == {"AskWatchLocate", "WatchLastLocate"}
+    # the location and the online status share one ask
+    assert sources_of(["lat", "getWatchOnlineStatus"]) == ["askLocate", "location", "onlineStatus"]
+    # the SW info is looked up by the QR code of the watch
+    assert sources_of(["getSWInfo"]) == ["watches", "swInfo"]
+    assert operations_of(sources_of(["getWatchUserIcons"])) == set()
+
+
+def test_set_devices_sends_only_the_requests_of_the_selected_fields(monkeypatch) -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    # a former device dict is taken over by the snapshot
+    api.device["w1"] = {"getWatchAlarm": ["kept"], "watch_battery": 10}
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        return {"data": {"watchLastLocate": {"battery": 80, "isCharging": True, "tm": 0}}}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        await api.setDevices(["w1"], fields="battery")
+        await api.aclose()
+
+    asyncio.run(run())
+
+    assert sent == ["WatchLastLocate", "AskWatchLocate"]
+    assert api.device["w1"] == {"getWatchAlarm": ["kept"], "watch_battery": 80, "watch_charging": True}
+
+
+def test_unknown_fields_are_refused_before_any_request() -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+
+    with pytest.raises(ValueError):
+        asyncio.run(api.setDevices(["w1"], fields="colour"))
+
+
+def test_snapshot_reads_like_the_device_dict() -> None:
+    snapshot = DeviceSnapshot("w1")
+    assert snapshot == {} and isinstance(snapshot, dict) and not hasattr(snapshot, "__dict__")
+
+    snapshot.store("watch_battery", 80, 1000.0)
+    snapshot.store("getWatchAlarm", [], 1000.0)
+
+    assert snapshot == {"getWatchAlarm": [], "watch_battery": 80}
+    assert snapshot["watch_battery"] == snapshot.watch_battery == 80
+    assert snapshot.get("lat", "unknown") == "unknown" and "lat" not in snapshot
+    with pytest.raises(KeyError):
+        snapshot["lat"]
+    assert (snapshot.source("watch_battery"), snapshot.fetched_at("watch_battery")) == ("location", 1000.0)
+    assert snapshot.fetched_at("lat") is None
+
+    assert json.loads(json.dumps(snapshot)) == {"getWatchAlarm": [], "watch_battery": 80}
+    copy = snapshot.copy()
+    copy["watch_battery"] = 10
+    assert snapshot["watch_battery"] == 80
+    del snapshot["watch_battery"]
+    assert snapshot.fetched_at("watch_battery") is None and not hasattr(snapshot, "watch_battery")
+
+
+def test_snapshot_loads_only_the_fields_read(monkeypatch) -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    api.watchs = [{"ward": {"id": "w1"}}]
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        await asyncio.sleep(0)
+        if operation_name == "Alarms":
+            return {"data": {"alarms": []}}
+        return {"data": {"watchLastLocate": {"battery": 80, "lat": "52.5", "tm": 0}}}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        device = api.getDevice("w1")
+        # readers of the same fields share one fetch
+        await asyncio.gather(device.load("watch_battery", "lat"), device.get_field("lat"), device.load("getWatchAlarm"))
+        battery = await device.get_field("watch_battery")
+        await api.aclose()
+        return device, battery
+
+    device, battery = asyncio.run(run())
+
+    assert sorted(sent) == ["Alarms", "AskWatchLocate", "WatchLastLocate"]
+    assert device == {"getWatchAlarm": [], "watch_battery": 80, "lat": "52.5"}
+    assert api.device["w1"] is device and battery == 80
+
+
+def test_get_device_does_not_add_unknown_watches() -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    api.watchs = [{"ward": {"id": "w1"}}]
+
+    assert api.getDevice("unknown") == {}
+    assert "unknown" not in api.device
+    assert api.getDevice("w1") is api.device["w1"]
+
+
+def test_get_field_raises_the_error_of_the_fetch() -> None:
+    calls = []
+
+    async def loader(fields):
+        calls.append(fields)
+        raise RateLimitError("refused")
+
+    snapshot = DeviceSnapshot("w1", loader)
+
+    async def run():
+        with pytest.raises(RateLimitError):
+            await snapshot.get_field("watch_battery")
+        # the field stays missing and is fetched again on the next read
+        with pytest.raises(RateLimitError):
+            await snapshot.get_field("watch_battery")
+
+    asyncio.run(run())
+
+    assert calls == [["watch_battery"], ["watch_battery"]] and snapshot == {}
+    with pytest.raises(KeyError):
+        asyncio.run(DeviceSnapshot("w2").get_field("lat"))
@@ -2,13 +2,17 @@ from __future__ import annotations
 
 from pyxplora_api.exception_classes import (
     ChildNoError,
+    CircuitOpenError,
     Error,
     ErrorMSG,
     FunctionError,
     HandlerException,
+    LoginCooldownError,
     LoginError,
     NoAdminError,
     PhoneOrEmailFail,
+    RateLimitError,
+    TokenStoreError,
     XTypeError,
 )
 
@@ -27,5 +31,10 @@ def test_exception_messages_are_human_readable() -> None:
 
 def test_login_and_contact_errors_accept_error_enums() -> None:
     assert str(LoginError(ErrorMSG.AUTH_FAIL)) == "Authentication failed."
+    assert str(LoginCooldownError(4.6)) == "Login paused after failed attempts, retry in 5s."
+    assert isinstance(LoginCooldownError(1), LoginError)
+    assert str(CircuitOpenError(29.6)) == "Xplora API unavailable, retry in 30s."
+    assert str(RateLimitError(2.34)) == "Rate limit reached, retry in 2.3s."
+    assert str(TokenStoreError("tokens.json", "disk full")) == "Token store tokens.json failed: disk full"
     assert str(PhoneOrEmailFail()) == "Phone Number or Email address not exist"
     assert str(PhoneOrEmailFail(ErrorMSG.PHONE_MAIL_ERR)) == "Phone Number or Email address not exist"
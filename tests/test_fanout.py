@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import asyncio
+
+from pyxplora_api.fanout import FanoutLimits, RefreshSummary, gather_bounded
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+
+GETTERS = [
+    "askWatchLocate",
+    "getWatchAlarm",
+    "loadWatchLocation",
+    "getWatchSafeZones",
+    "getSilentTime",
+    "getSWInfo",
+    "getWatchUserSteps",
+    "getWatchOnlineStatus",
+    "getWatches",
+]
+
+
+class Gauge:
+    def __init__(self) -> None:
+        self.running = 0
+        self.peak = 0
+
+    async def enter(self) -> None:
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.001)
+        self.running -= 1
+
+
+def test_gather_bounded_starts_calls_in_order_and_keeps_going_after_errors() -> None:
+    gauge = Gauge()
+    started = []
+
+    def call(index: int):
+        async def run():
+            started.append(index)
+            await gauge.enter()
+            if index == 1:
+                raise RuntimeError("boom")
+            return index
+
+        return run
+
+    results = asyncio.run(gather_bounded([call(index) for index in range(5)], 2))
+
+    assert started == [0, 1, 2, 3, 4]
+    assert gauge.peak == 2
+    assert results[0] == 0 and isinstance(results[1], RuntimeError) and results[2:] == [2, 3, 4]
+    assert asyncio.run(gather_bounded([], 2)) == []
+
+
+def make_api(monkeypatch, limits: FanoutLimits) -> tuple[PyXploraApi, dict[str, Gauge]]:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin", fanout_limits=limits)
+    gauges = {"watches": Gauge()}
+    active = set()
+
+    async def prefetch(wuids, fields=None):
+        return None
+
+    def getter(name):
+        async def get(wuid, *args, **kwargs):
+            if wuid == "broken" and name == "loadWatchLocation":
+                raise RuntimeError("offline")
+            if wuid == "slow":
+                await asyncio.sleep(1)
+            if wuid == "late" and name == "getWatchOnlineStatus":
+                await asyncio.sleep(0.02)
+            gauges.setdefault(wuid, Gauge())
+            if wuid not in active:
+                active.add(wuid)
+                gauges["watches"].peak = max(gauges["watches"].peak, len(active))
+            await gauges[wuid].enter()
+            if name == "askWatchLocate":
+                return False
+            return {"watch_battery": 80} if name == "loadWatchLocation" else name
+
+        return get
+
+    monkeypatch.setattr(api, "_prefetchWards", prefetch)
+    for name in GETTERS:
+        monkeypatch.setattr(api, name, getter(name))
+
+    original = api._setDevice
+
+    async def set_device(wuid, fields=None):
+        try:
+            await original(wuid, fields)
+        finally:
+            active.discard(wuid)
+
+    monkeypatch.setattr(api, "_setDevice", set_device)
+    return api, gauges
+
+
+def test_set_devices_bounds_watches_and_requests_per_watch(monkeypatch) -> None:
+    api, gauges = make_api(monkeypatch, FanoutLimits(max_watches=2, max_requests_per_watch=3))
+    wuids = [f"w{index}" for index in range(5)]
+
+    assert asyncio.run(api.setDevices(wuids)) == wuids
+
+    assert gauges["watches"].peak == 2
+    assert all(gauges[wuid].peak == 3 for wuid in wuids)
+    assert set(api.device) == set(wuids)
+    assert api.device["w0"]["watch_battery"] == 80
+
+
+def test_a_failing_watch_does_not_stop_the_others(monkeypatch) -> None:
+    api, _ = make_api(monkeypatch, FanoutLimits())
+    api.device["broken"] = {"watch_battery": 50}
+
+    asyncio.run(api.setDevices(["w0", "broken", "w1"]))
+
+    assert set(api.device) == {"w0", "w1", "broken"}
+    # the broken watch keeps its previous data
+    assert api.device["broken"] == {"watch_battery": 50}
+
+
+def test_requests_of_the_account_are_bounded(monkeypatch) -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin", fanout_limits=FanoutLimits(max_in_flight=2))
+    handler = api._gql_handler
+    gauge = Gauge()
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        await gauge.enter()
+        return {"data": {"alarms": []}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        await asyncio.gather(*(handler.getAlarmTime_a(f"w{index}") for index in range(6)))
+        await api.aclose()
+
+    asyncio.run(run())
+    assert gauge.peak == 2
+
+
+def test_stream_devices_yields_watches_as_they_complete(monkeypatch) -> None:
+    api, _ = make_api(monkeypatch, FanoutLimits())
+    summary = RefreshSummary()
+
+    async def run():
+        return [
+            (wuid, device["watch_battery"])
+            async for wuid, device in api.streamDevices(["late", "slow", "broken", "w0"], timeout=0.1, summary=summary)
+        ]
+
+    streamed = asyncio.run(run())
+
+    assert streamed == [("w0", 80), ("late", 80)]
+    assert summary.completed == ["w0", "late"]
+    assert summary.timed_out == ["slow"]
+    assert list(summary.failed) == ["broken"]
+    assert "slow" not in api.device
+
+
+def test_stream_devices_stops_the_refresh_when_left_early(monkeypatch) -> None:
+    api, _ = make_api(monkeypatch, FanoutLimits())
+
+    async def run():
+        stream = api.streamDevices(["w0", "slow"])
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    (wuid, _), pending = asyncio.run(run())
+
+    assert wuid == "w0"
+    assert pending == []
+
+
+def test_stream_devices_bounds_the_prefetch_by_the_watch_timeout(monkeypatch) -> None:
+    api, _ = make_api(monkeypatch, FanoutLimits())
+
+    async def slow_prefetch(wuids, fields=None):
+        await asyncio.sleep(1)
+
+    monkeypatch.setattr(api, "_prefetchWards", slow_prefetch)
+    summary = RefreshSummary()
+
+    async def run():
+        streamed = [wuid async for wuid, _ in api.streamDevices(["w0", "w1"], timeout=0.05, summary=summary)]
+        return streamed, [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+
+    streamed, pending = asyncio.run(run())
+
+    assert streamed == []
+    assert sorted(summary.timed_out) == ["w0", "w1"]
+    assert pending == []
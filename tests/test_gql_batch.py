@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pyxplora_api import gql_mutations as gm, gql_queries as gq
+from pyxplora_api.gql_batch import (
+    BatchError,
+    QueryBatcher,
+    merge_operations,
+    parse_operation,
+    split_response,
+    ward_documents,
+)
+from pyxplora_api.gql_handler_async import GQLHandler
+
+
+def test_every_watch_query_can_be_parsed() -> None:
+    for query in gq.WATCH_Q.values():
+        parsed = parse_operation(query)
+        assert parsed.kind == "query"
+        assert parsed.fields
+    with pytest.raises(BatchError):
+        parse_operation("{ anonymous }")
+
+
+def test_merge_aliases_fields_renames_variables_and_dedupes_fragments() -> None:
+    merged = merge_operations(
+        [
+            (gq.WATCH_Q["alarmsQ"], {"uid": "w1"}),
+            (gq.WATCH_Q["alarmsQ"], {"uid": "w2"}),
+            (gq.WATCH_Q["getWifisQ"], {"uid": "w1"}),
+        ]
+    )
+
+    assert merged.variables == {"uid_b0": "w1", "uid_b1": "w2", "uid_b2": "w1"}
+    assert merged.query.startswith("query Batch($uid_b0: String!")
+    assert "b0_alarms: alarms(uid: $uid_b0)" in merged.query
+    assert "b1_alarms: alarms(uid: $uid_b1)" in merged.query
+    assert merged.query.count("fragment ") == len(set(merged.query.split("fragment ")[1:]))
+
+
+def test_split_routes_data_and_errors_to_their_operation() -> None:
+    merged = merge_operations([(gq.WATCH_Q["alarmsQ"], {"uid": "w1"}), (gq.WATCH_Q["alarmsQ"], {"uid": "w2"})])
+    response = {
+        "data": {"b0_alarms": [{"id": "a"}], "b1_alarms": None},
+        "errors": [{"message": "denied", "path": ["b1_alarms"]}, {"message": "slow"}],
+    }
+
+    first, second = split_response(merged, response)
+
+    assert first == {"data": {"alarms": [{"id": "a"}]}, "errors": [{"message": "slow"}]}
+    assert second["data"] == {"alarms": None}
+    assert second["errors"] == [{"message": "denied", "path": ["alarms"]}, {"message": "slow"}]
+
+
+def test_batcher_merges_a_window_and_falls_back_when_rejected() -> None:
+    sent = []
+
+    async def send(query, variables=None, operation_name=None):
+        sent.append(operation_name)
+        if operation_name == "Batch":
+            if "uid_b0" in (variables or {}) and variables["uid_b0"] == "reject":
+                return {"errors": [{"message": "Query too complex"}], "data": None}
+            merged = merge_operations([(gq.WATCH_Q["alarmsQ"], None)] * len(variables))
+            return {"data": {f"{prefix}alarms": [variables[f"uid_{prefix[:-1]}"]] for prefix in merged.prefixes}}
+        return {"data": {"alarms": [variables["uid"]]}}
+
+    async def run():
+        batcher = QueryBatcher(send, window=0.001)
+        merged = await asyncio.gather(*(batcher.submit(gq.WATCH_Q["alarmsQ"], {"uid": uid}, "Alarms") for uid in "abc"))
+        fallback = await asyncio.gather(
+            *(batcher.submit(gq.WATCH_Q["alarmsQ"], {"uid": uid}, "Alarms") for uid in ("reject", "x"))
+        )
+        return batcher, merged, fallback
+
+    batcher, merged, fallback = asyncio.run(run())
+
+    assert [result["data"]["alarms"] for result in merged] == [["a"], ["b"], ["c"]]
+    assert [result["data"]["alarms"] for result in fallback] == [["reject"], ["x"]]
+    assert sent == ["Batch", "Batch", "Alarms", "Alarms"]
+    assert (batcher.batches, batcher.batched, batcher.fallbacks) == (1, 3, 1)
+
+
+def test_handler_batches_queries_only_when_enabled(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin", batching=True)
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        if operation_name == "Batch":
+            return {"data": {"b0_alarms": [], "b1_getWiFis": []}}
+        return {"data": {"sendChatText": True}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        return await asyncio.gather(
+            handler.getAlarmTime_a("w1"),
+            handler.getWifi_a("w1"),
+            handler.runGqlQuery_a(gm.WATCH_M["sendChatTextM"], {"uid": "w1", "text": "hi"}, "SendChatText"),
+        )
+
+    alarms, wifis, _ = asyncio.run(run())
+
+    assert sorted(sent) == ["Batch", "SendChatText"]
+    assert alarms == {"alarms": []}
+    assert wifis == {"getWiFis": []}
+
+
+def test_ward_documents_alias_per_watch_and_chunk_by_size() -> None:
+    wuids = [f"wuid-{i}" for i in range(30)]
+
+    ((chunk, merged),) = ward_documents(gq.WATCH_Q["locateQ"], wuids[:2])
+    assert chunk == wuids[:2]
+    assert merged.query.startswith("query WatchLastLocateWards($uid_w0: String!, $uid_w1: String!)")
+    assert "w1_watchLastLocate: watchLastLocate(uid: $uid_w1)" in merged.query
+    assert merged.variables == {"uid_w0": "wuid-0", "uid_w1": "wuid-1"}
+
+    documents = ward_documents(gq.WATCH_Q["locateQ"], wuids, max_document_size=2000)
+    assert len(documents) > 1
+    assert [wuid for chunk, _ in documents for wuid in chunk] == wuids
+    assert all(len(merged.query) <= 2000 for _, merged in documents)
+
+
+def test_handler_runs_ward_query_and_primes_per_watch_reads(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        return {"data": {f"w{i}_alarms": [{"uid": uid}] for i, uid in enumerate(variables.values())}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        with handler.primeScope() as primes:
+            wards = await handler.runWardQuery_a(gq.WATCH_Q["alarmsQ"], ["a", "b"], operation_name="Alarms", prime=True)
+            return wards, await handler.getAlarmTime_a("b"), primes
+
+    wards, alarms, primes = asyncio.run(run())
+
+    assert sent == ["AlarmsWards"]
+    assert wards == {"a": {"data": {"alarms": [{"uid": "a"}]}}, "b": {"data": {"alarms": [{"uid": "b"}]}}}
+    assert alarms == {"alarms": [{"uid": "b"}]}
+    # served once, the prime of "a" is dropped with the scope
+    assert list(primes) == [handler._single_flight.key("Alarms", {"uid": "a"})]
+    assert handler._primed.get() is None
+
+
+def test_overlapping_prime_scopes_keep_their_own_primes(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        await asyncio.sleep(0)
+        return {"data": {f"w{i}_alarms": [{"uid": uid}] for i, uid in enumerate(variables.values())}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def refresh(wuids):
+        with handler.primeScope() as primes:
+            await handler.runWardQuery_a(gq.WATCH_Q["alarmsQ"], wuids, operation_name="Alarms", prime=True)
+            # the other refresh finishing must not drop the primes of this one
+            await asyncio.sleep(0.01)
+            return dict(primes)
+
+    async def run():
+        return await asyncio.gather(refresh(["a", "b"]), refresh(["c", "d"]))
+
+    first, second = asyncio.run(run())
+
+    key = handler._single_flight.key
+    assert set(first) == {key("Alarms", {"uid": "a"}), key("Alarms", {"uid": "b"})}
+    assert set(second) == {key("Alarms", {"uid": "c"}), key("Alarms", {"uid": "d"})}
+
+
+def test_ward_query_primes_successful_responses_only(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        if operation_name == "AlarmsWards":
+            return {
+                "data": {"w0_alarms": [{"uid": "a"}], "w1_alarms": None},
+                "errors": [{"message": "watch offline", "path": ["w1_alarms"]}],
+            }
+        return {"data": {"alarms": [{"uid": variables["uid"]}]}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        with handler.primeScope():
+            await handler.runWardQuery_a(gq.WATCH_Q["alarmsQ"], ["a", "b"], operation_name="Alarms", prime=True)
+            handler.cache.clear()
+            return await handler.getAlarmTime_a("a"), await handler.getAlarmTime_a("b")
+
+    first, second = asyncio.run(run())
+
+    # the failed watch is read again with its own request, the good one from the prime
+    assert sent == ["AlarmsWards", "Alarms"]
+    assert first == {"alarms": [{"uid": "a"}]} and second == {"alarms": [{"uid": "b"}]}
+    assert len(handler.lastKnownGood) == 2
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import json
+
 import pytest
 
 from pyxplora_api.exception_classes import HandlerException, LoginError, NoAdminError
@@ -110,3 +112,28 @@ def test_common_query_wrappers_return_data_and_capture_variables() -> None:
         "countryCode": "",
         "phoneNumber": "",
     }
+
+
+def test_run_gql_query_reuses_the_handler_session_until_closed(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin", pool_maxsize=4)
+    posts = []
+
+    class Response:
+        def raise_for_status(self) -> None:
+            return None
+
+        content = b'{"data": {"ok": true}}'
+
+    def fake_post(endpoint, *, data, headers, timeout, **options):
+        posts.append(json.loads(data)["operationName"])
+        return Response()
+
+    monkeypatch.setattr(handler._http_session, "post", fake_post)
+    monkeypatch.setattr("pyxplora_api.graphql_client.requests.post", lambda *args, **kwargs: pytest.fail("unpooled post"))
+
+    with handler:
+        assert handler.runGqlQuery("query", {}, "One") == {"data": {"ok": True}}
+        assert handler.runGqlQuery("query", {}, "Two") == {"data": {"ok": True}}
+
+    assert posts == ["One", "Two"]
+    assert handler._http_session.get_adapter("https://api.myxplora.com")._pool_maxsize == 4
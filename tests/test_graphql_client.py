@@ -1,9 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import json
 
+import pytest
+
+from pyxplora_api import codec as codec_module, gql_mutations as gm, gql_queries as gq
+from pyxplora_api.codec import STDLIB_CODEC, get_codec
 from pyxplora_api.const import DEFAULT_TIMEOUT, DEFAULT_USER_AGENT
 from pyxplora_api.graphql_client import GraphqlClient
+from pyxplora_api.operations import REGISTRY, operation_for, request_body
 
 
 class FakeResponse:
@@ -14,8 +21,9 @@ class FakeResponse:
     def raise_for_status(self) -> None:
         self.raised = True
 
-    def json(self) -> dict:
-        return self.payload
+    @property
+    def content(self) -> bytes:
+        return json.dumps(self.payload).encode()
 
 
 class AsyncPostContext:
@@ -37,8 +45,8 @@ class AsyncResponse:
     def raise_for_status(self) -> None:
         self.raised = True
 
-    async def json(self) -> dict:
-        return self.payload
+    async def read(self) -> bytes:
+        return json.dumps(self.payload).encode() if self.payload is not None else b""
 
 
 class FakeSession:
@@ -46,32 +54,44 @@ class FakeSession:
         self.response = response
         self.calls = []
 
-    def post(self, endpoint: str, *, json: dict, headers: dict) -> AsyncPostContext:
-        self.calls.append({"endpoint": endpoint, "json": json, "headers": headers})
+    def post(self, endpoint: str, *, data: bytes, headers: dict) -> AsyncPostContext:
+        self.calls.append({"endpoint": endpoint, "json": json.loads(data), "headers": headers})
         return AsyncPostContext(self.response)
 
 
 def test_request_body_omits_empty_optional_fields() -> None:
-    body = GraphqlClient._GraphqlClient__request_body("query", {}, "")
-    assert body == {"query": "query"}
-
-    body = GraphqlClient._GraphqlClient__request_body("query", {"id": 1}, "Operation")
-    assert body == {
+    operation = operation_for("query")
+    assert json.loads(request_body(operation, {}, "")) == {"query": "query"}
+    assert json.loads(request_body(operation, {"id": 1}, "Operation")) == {
         "query": "query",
         "variables": {"id": 1},
         "operationName": "Operation",
     }
+    assert json.loads(request_body(operation, None, "Operation", include_query=False, persisted=True)) == {
+        "operationName": "Operation",
+        "extensions": {"persistedQuery": {"version": 1, "sha256Hash": hashlib.sha256(b"query").hexdigest()}},
+    }
+
+
+def test_registry_pre_encodes_every_catalog_document() -> None:
+    query = gq.WATCH_Q["chatsQ"]
+    operation = REGISTRY[query]
+    assert operation is operation_for(query)
+    assert json.loads(operation.encoded_query) == query
+    assert operation.sha256 == hashlib.sha256(query.encode()).hexdigest()
+    assert gm.SIGN_M["signInWithEmailOrPhoneM"] in REGISTRY
+    assert operation_for("query Runtime { a }") is operation_for("query Runtime { a }")
 
 
 def test_execute_posts_merged_headers_and_default_user_agent(monkeypatch) -> None:
     calls = []
     response = FakeResponse({"data": {"ok": True}})
 
-    def fake_post(endpoint: str, *, json: dict, headers: dict, timeout: int, **options):
+    def fake_post(endpoint: str, *, data: bytes, headers: dict, timeout: int, **options):
         calls.append(
             {
                 "endpoint": endpoint,
-                "json": json,
+                "json": json.loads(data),
                 "headers": headers,
                 "timeout": timeout,
                 "options": options,
@@ -96,6 +116,7 @@ def test_execute_posts_merged_headers_and_default_user_agent(monkeypatch) -> Non
                 "Authorization": "base",
                 "X-Test": "yes",
                 "user-agent": DEFAULT_USER_AGENT,
+                "Content-Type": "application/json",
             },
             "timeout": DEFAULT_TIMEOUT,
             "options": {"verify": False},
@@ -120,6 +141,124 @@ def test_ha_execute_async_uses_supplied_session_and_default_user_agent() -> None
                 "variables": {"id": 2},
                 "operationName": "Operation",
             },
-            "headers": {"Authorization": "base", "user-agent": DEFAULT_USER_AGENT},
+            "headers": {"Authorization": "base", "user-agent": DEFAULT_USER_AGENT, "Content-Type": "application/json"},
         }
     ]
+
+
+class PooledSession(FakeSession):
+    instances: list[PooledSession] = []
+
+    def __init__(self, *, connector, timeout) -> None:
+        super().__init__(AsyncResponse({"data": {"ok": True}}))
+        self.connector = connector
+        self.timeout = timeout
+        self.closed = False
+        PooledSession.instances.append(self)
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def test_execute_async_reuses_one_pooled_session_until_closed(monkeypatch) -> None:
+    PooledSession.instances = []
+    connectors = []
+    monkeypatch.setattr("pyxplora_api.graphql_client.aiohttp.ClientSession", PooledSession)
+    monkeypatch.setattr(
+        "pyxplora_api.graphql_client.aiohttp.TCPConnector",
+        lambda **options: connectors.append(options) or options,
+    )
+    client = GraphqlClient("https://example.test/graphql", limit=10, limit_per_host=2)
+
+    async def run() -> None:
+        async with client:
+            assert await client.execute_async("query", {"id": 1}, "One") == {"data": {"ok": True}}
+            assert await client.execute_async("query", {"id": 2}, "Two") == {"data": {"ok": True}}
+
+    asyncio.run(run())
+
+    assert len(PooledSession.instances) == 1
+    session = PooledSession.instances[0]
+    assert [call["json"]["variables"] for call in session.calls] == [{"id": 1}, {"id": 2}]
+    assert session.closed is True
+    assert connectors[0]["limit"] == 10
+    assert connectors[0]["limit_per_host"] == 2
+    assert connectors[0]["use_dns_cache"] is True
+
+
+def test_codec_falls_back_to_an_installed_backend(monkeypatch) -> None:
+    assert get_codec("json") is STDLIB_CODEC
+    assert get_codec(STDLIB_CODEC) is STDLIB_CODEC
+    # unknown names are refused, installed or not
+    for name in ("not-installed-codec", "pickle"):
+        with pytest.raises(ValueError):
+            get_codec(name)
+
+    real_import = codec_module.importlib.import_module
+
+    def import_module(name):
+        if name == "orjson":
+            raise ImportError(name)
+        return real_import(name)
+
+    monkeypatch.setattr(codec_module.importlib, "import_module", import_module)
+    assert get_codec("orjson").name in ("ujson", "json")
+    monkeypatch.undo()
+    assert GraphqlClient("https://example.test/graphql", codec="json").codec is STDLIB_CODEC
+
+    codec = get_codec()
+    body = {"query": "query Chats { chatsNew }", "variables": {"text": "Grüße 😄", "big": 2**70}}
+    assert json.loads(codec.dumps(body)) == body
+    assert codec.loads(codec.dumps(body)) == body
+    with pytest.raises(ValueError):
+        codec.loads(b"<html>")
+
+
+def test_execute_async_returns_empty_result_for_invalid_body() -> None:
+    response = AsyncResponse(None)
+    response.read = lambda: asyncio.sleep(0, b"<html>")
+    client = GraphqlClient("https://example.test/graphql")
+
+    assert asyncio.run(client.ha_execute_async("query", session=FakeSession(response))) == {}
+
+
+class ScriptedSession(FakeSession):
+    def __init__(self, *payloads: dict) -> None:
+        super().__init__(AsyncResponse({}))
+        self.payloads = list(payloads)
+
+    def post(self, endpoint: str, *, data: bytes, headers: dict) -> AsyncPostContext:
+        super().post(endpoint, data=data, headers=headers)
+        return AsyncPostContext(AsyncResponse(self.payloads.pop(0)))
+
+
+def test_persisted_queries_send_the_hash_and_register_unknown_documents() -> None:
+    query = gq.WATCH_Q["chatsQ"]
+    not_found = {"errors": [{"message": "PersistedQueryNotFound"}]}
+    session = ScriptedSession(not_found, {"data": {"ok": 1}}, {"data": {"ok": 2}})
+    client = GraphqlClient("https://example.test/graphql", persisted_queries=True)
+
+    async def run():
+        return [await client.ha_execute_async(query, {"uid": "w1"}, "Chats", session=session) for _ in range(2)]
+
+    assert asyncio.run(run()) == [{"data": {"ok": 1}}, {"data": {"ok": 2}}]
+    bodies = [call["json"] for call in session.calls]
+    assert ["query" in body for body in bodies] == [False, True, False]
+    assert all(body["extensions"]["persistedQuery"]["sha256Hash"] == REGISTRY[query].sha256 for body in bodies)
+    assert client.bytes_sent < 3 * len(query)
+
+
+def test_persisted_queries_are_turned_off_when_unsupported(monkeypatch) -> None:
+    payloads = [{"errors": [{"message": "x", "extensions": {"code": "PERSISTED_QUERY_NOT_SUPPORTED"}}]}, {"data": {}}]
+    calls = []
+
+    def fake_post(endpoint, *, data, headers, timeout, **options):
+        calls.append(json.loads(data))
+        return FakeResponse(payloads.pop(0))
+
+    monkeypatch.setattr("pyxplora_api.graphql_client.requests.post", fake_post)
+    client = GraphqlClient("https://example.test/graphql", persisted_queries=True)
+
+    assert client.execute("query Q { q }", None, "Q") == {"data": {}}
+    assert client.persisted_queries is False
+    assert calls[1] == {"query": "query Q { q }", "operationName": "Q"}
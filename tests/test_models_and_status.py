@@ -4,6 +4,11 @@ from pyxplora_api.model import (
     Chats,
     ChatsNew,
     Data,
+    FastChatsNew,
+    FastData,
+    FastSimpleChat,
+    FastSmallChat,
+    FastUser,
     SimpleChat,
     SmallChat,
     SmallChatList,
@@ -73,6 +78,29 @@ def test_dataclass_defaults_and_serialization_round_trip() -> None:
     assert SmallChatList.from_dict(small_list.to_dict()).small_chat_list[0].msgId == "msg"
 
 
+def test_fast_models_decode_like_the_dataclass_models() -> None:
+    raw = {
+        "id": 5,
+        "msgId": "msg-1",
+        "readFlag": "1",
+        "type": "TEXT",
+        "sender": {"id": "u1", "name": "Parent", "unknown": True},
+        "receiver": None,
+        "data": {"tm": "bad", "text": 5, "battery": "80", "lat": 3, "emoticon_id": 1001, "delete_flag": "1"},
+        "create": "1700000000",
+    }
+
+    assert FastSimpleChat.from_dict(raw).to_dict() == SimpleChat.from_dict(raw).to_dict()
+    assert FastSimpleChat.from_dict({}).to_dict() == SimpleChat.from_dict({}).to_dict()
+    assert FastChatsNew.from_dict({"list": [raw, {}]}).to_dict() == ChatsNew.from_dict({"list": [raw, {}]}).to_dict()
+    assert FastSmallChat.from_dict({"msgId": "m"}).to_dict() == SmallChat.from_dict({"msgId": "m"}).to_dict()
+    chat = FastSimpleChat.from_dict(raw)
+    assert (chat.id, chat.readFlag, chat.data.tm, chat.data.battery, chat.data.lat) == ("5", 1, None, 80, 3.0)
+    assert not hasattr(chat, "__dict__")
+    for fast_cls, model_cls in ((FastUser, User), (FastData, Data), (FastSimpleChat, SimpleChat), (FastSmallChat, SmallChat)):
+        assert fast_cls.__slots__ == tuple(model_cls.__dataclass_fields__)
+
+
 def test_selected_status_enum_values_are_stable() -> None:
     assert NormalStatus.ENABLE.value == "ENABLE"
     assert WatchOnlineStatus.OFFLINE.value == "OFFLINE"
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+
+from pyxplora_api.orchestrator import AccountManager
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+
+
+def make_manager(monkeypatch, **kwargs) -> tuple[AccountManager, list]:
+    manager = AccountManager(**kwargs)
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        await asyncio.sleep(0)
+        if operation_name == "Countries":
+            return {"data": {"countries": [{"name": "Germany"}]}}
+        return {"data": {"alarms": []}}
+
+    monkeypatch.setattr(manager.gql_client, "execute_async", fake_execute)
+    for name in "abc":
+        manager.add(name, "49", f"15{name}", "secret", "de-DE", "Europe/Berlin")
+    return manager, sent
+
+
+def test_accounts_keep_their_own_state() -> None:
+    first = PyXploraApi("49", "1", "secret", "de-DE", "Europe/Berlin")
+    second = PyXploraApi("49", "2", "secret", "de-DE", "Europe/Berlin")
+
+    first.device["wuid-1"] = {"battery": 10}
+    first.watchs.append({"ward": {"id": "wuid-1"}})
+    first._gql_handler.errors.append({"function": "login"})
+
+    assert second.device == {} and second.watchs == [] and second._gql_handler.errors == []
+    assert first._gql_handler is not second._gql_handler
+
+
+def test_accounts_share_the_client_and_account_independent_responses(monkeypatch) -> None:
+    manager, sent = make_manager(monkeypatch)
+
+    clients = {manager[name]._gql_handler._gql_client for name in manager}
+
+    async def run():
+        countries = await manager.run(lambda api: api._gql_handler.countries_a())
+        alarms = await manager.run(lambda api: api._gql_handler.getAlarmTime_a("w1"))
+        await manager.aclose()
+        return countries, alarms
+
+    countries, alarms = asyncio.run(run())
+
+    assert clients == {manager.gql_client}
+
+    assert countries == {name: {"countries": [{"name": "Germany"}]} for name in "abc"}
+    assert alarms == {name: {"alarms": []} for name in "abc"}
+    # countries are fetched once for all accounts, alarms per account
+    assert sent.count("Countries") == 1
+    assert sent.count("Alarms") == 3
+    assert len(manager) == 0
+
+
+def test_jobs_are_bounded_and_rotate_between_runs(monkeypatch) -> None:
+    manager, _ = make_manager(monkeypatch, max_concurrency=1)
+    order = []
+    running = []
+
+    async def job(api):
+        running.append(api)
+        assert len(running) == 1
+        order.append(next(name for name in manager if manager[name] is api))
+        await asyncio.sleep(0)
+        running.remove(api)
+        if len(order) == 2:
+            raise RuntimeError("boom")
+        return len(order)
+
+    async def run():
+        first = await manager.run(job)
+        await manager.run(job)
+        await manager.run(job, names=["c", "a", "x"])
+        await manager.aclose()
+        return first
+
+    first = asyncio.run(run())
+
+    assert order == ["a", "b", "c", "b", "c", "a", "c", "a"]
+    assert first["a"] == 1 and isinstance(first["b"], RuntimeError) and first["c"] == 3
+    assert (manager.runs, manager.failures) == (8, 1)
+
+
+def test_close_keeps_a_client_handed_in(monkeypatch) -> None:
+    closed = []
+    manager, _ = make_manager(monkeypatch)
+    shared = AccountManager(gql_client=manager.gql_client)
+
+    async def fake_aclose():
+        closed.append(True)
+
+    monkeypatch.setattr(manager.gql_client, "aclose", fake_aclose)
+    asyncio.run(shared.aclose())
+    assert closed == []
+    asyncio.run(manager.aclose())
+    assert closed == [True]
@@ -9,9 +9,16 @@ import pyxplora_api.gql_queries as gql_queries
 def test_all_public_modules_import() -> None:
     modules = [
         "pyxplora_api",
+        "pyxplora_api.auth_gate",
+        "pyxplora_api.cache",
+        "pyxplora_api.circuit_breaker",
+        "pyxplora_api.codec",
         "pyxplora_api.const",
         "pyxplora_api.const_version",
+        "pyxplora_api.device",
         "pyxplora_api.exception_classes",
+        "pyxplora_api.fanout",
+        "pyxplora_api.gql_batch",
         "pyxplora_api.gql_handler",
         "pyxplora_api.gql_handler_async",
         "pyxplora_api.gql_mutations",
@@ -19,10 +26,18 @@ def test_all_public_modules_import() -> None:
         "pyxplora_api.graphql_client",
         "pyxplora_api.handler_gql",
         "pyxplora_api.model",
+        "pyxplora_api.operations",
+        "pyxplora_api.orchestrator",
         "pyxplora_api.pyxplora",
         "pyxplora_api.pyxplora_api",
         "pyxplora_api.pyxplora_api_async",
+        "pyxplora_api.rate_limit",
+        "pyxplora_api.read_receipts",
+        "pyxplora_api.retry",
+        "pyxplora_api.single_flight",
         "pyxplora_api.status",
+        "pyxplora_api.token_manager",
+        "pyxplora_api.token_store",
     ]
 
     for module_name in modules:
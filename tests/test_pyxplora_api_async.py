@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import asyncio
+
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+
+
+def make_api() -> PyXploraApi:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    api.watchs = [{"ward": {"id": "wuid-1"}}, {"ward": {"id": "wuid-2"}}, {"ward": {"id": "wuid-3"}}]
+    return api
+
+
+def test_stream_watch_locations_yields_watches_as_they_report(monkeypatch) -> None:
+    api = make_api()
+    # wuid-1 reports after the first poll, wuid-2 after the second, wuid-3 never
+    reports = {"wuid-1": [100, 200], "wuid-2": [100, 100, 300], "wuid-3": [100]}
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        if operation_name == "AskWatchLocate":
+            return {"data": {"askWatchLocate": True}}
+        data = {}
+        for name, wuid in variables.items():
+            alias = name.split("_")[-1]
+            tms = reports[wuid]
+            tm = tms.pop(0) if len(tms) > 1 else tms[0]
+            data[f"{alias}_watchLastLocate"] = {"tm": tm, "lat": wuid, "battery": 50}
+        return {"data": data}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        return [
+            (wuid, location["watch_last_location"]["tm"])
+            async for wuid, location in api.streamWatchLocations(timeout=0.05, poll_interval=0.001, max_poll_interval=0.01)
+        ]
+
+    streamed = asyncio.run(run())
+
+    assert streamed[:2] == [("wuid-1", 200), ("wuid-2", 300)]
+    assert streamed[2] == ("wuid-3", 100)
+    assert sent.count("AskWatchLocate") == 3
+    assert set(sent) == {"AskWatchLocate", "WatchLastLocateWards"}
+
+
+def test_load_watch_location_parses_the_last_locate() -> None:
+    api = make_api()
+
+    assert api._parseWatchLocation({}) == {}
+    location = api._parseWatchLocation({"watchLastLocate": {"tm": 0, "lat": "52.5", "isCharging": True}})
+    assert location["lat"] == "52.5"
+    assert location["watch_charging"] is True
+    assert location["locateType"] == "UNKNOWN"
+
+    api._parseWatchLocation({"message": "Authentication failed."})
+    assert api.inter_error == {"message": "Authentication failed."}
+
+
+def test_load_watch_location_polls_until_the_watch_reported(monkeypatch) -> None:
+    api = make_api()
+    # the watch reports on the third poll
+    reports = [100, 100, 100, 200]
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        if operation_name == "AskWatchLocate":
+            return {"data": {"askWatchLocate": True}}
+        tm = reports.pop(0) if len(reports) > 1 else reports[0]
+        return {"data": {"watchLastLocate": {"tm": tm, "battery": 50}}}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        return await api.loadWatchLocation("wuid-1", timeout=1, poll_interval=0.001, max_poll_interval=0.01)
+
+    location = asyncio.run(run())
+
+    assert location["watch_last_location"]["tm"] == 200
+    # the polls are not served from the cache
+    assert sent == ["WatchLastLocate", "AskWatchLocate", "WatchLastLocate", "WatchLastLocate", "WatchLastLocate"]
+
+
+def test_load_watch_location_does_not_wait_by_default(monkeypatch) -> None:
+    api = make_api()
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        if operation_name == "AskWatchLocate":
+            return {"data": {"askWatchLocate": True}}
+        return {"data": {"watchLastLocate": {"tm": 100, "battery": 50}}}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        return await api.getWatchBattery("wuid-1")
+
+    assert asyncio.run(run()) == 50
+    assert sent == ["AskWatchLocate", "WatchLastLocate"]
+
+
+def test_load_watch_location_keeps_the_last_location_of_a_silent_watch(monkeypatch) -> None:
+    api = make_api()
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        if operation_name == "AskWatchLocate":
+            return {"data": {"askWatchLocate": True}}
+        return {"data": {"watchLastLocate": {"tm": 100, "battery": 50}}}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        return await api.loadWatchLocation("wuid-1", timeout=0.02, poll_interval=0.001, max_poll_interval=0.005)
+
+    location = asyncio.run(run())
+
+    assert location["watch_last_location"]["tm"] == 100
+    assert sent[:2] == ["WatchLastLocate", "AskWatchLocate"] and len(sent) > 3
+
+
+def test_iter_watch_chats_pages_by_msg_id_cursor(monkeypatch) -> None:
+    api = make_api()
+    history = [{"msgId": f"m{i}", "type": "TEXT", "data": {"text": str(i)}} for i in range(5)]
+    cursors = []
+
+    async def fake_chats(wuid, offset=0, limit=0, msg=""):
+        cursors.append(msg)
+        start = next((i for i, chat in enumerate(history) if chat["msgId"] == msg), 0)
+        return {"chatsNew": {"list": history[start : start + limit]}}
+
+    monkeypatch.setattr(api._gql_handler, "chats_a", fake_chats)
+
+    async def run():
+        return [chat.msgId async for chat in api.iterWatchChats("wuid-1", page_size=2)]
+
+    assert asyncio.run(run()) == ["m0", "m1", "m2", "m3", "m4"]
+    assert cursors == ["", "m1", "m2", "m3", "m4"]
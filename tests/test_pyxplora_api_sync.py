@@ -294,3 +294,19 @@ def test_admin_and_passthrough_helpers() -> None:
     assert api.checkEmailOrPhoneExist(type="EMAIL", email="user@example.test") is True
     assert api.deleteMessageFromApp("wuid-1", "msg-1") is True
     assert api.get_chat_voice("wuid-1", "msg-1") == b"voice"
+
+
+def test_iter_watch_chats_pages_by_msg_id_cursor(monkeypatch) -> None:
+    api = make_api()
+    history = [{"msgId": f"m{i}", "type": "TEXT"} for i in range(3)]
+    cursors = []
+
+    def fake_chats(wuid, offset=0, limit=0, msg=""):
+        cursors.append(msg)
+        start = next((i for i, chat in enumerate(history) if chat["msgId"] == msg), 0)
+        return {"chatsNew": {"list": history[start : start + limit]}}
+
+    monkeypatch.setattr(api._gql_handler, "chats", fake_chats, raising=False)
+
+    assert [chat.msgId for chat in api.iterWatchChats("wuid-1", page_size=2)] == ["m0", "m1", "m2"]
+    assert cursors == ["", "m1", "m2"]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import time
+
 import pytest
 
 from pyxplora_api.exception_classes import ChildNoError, XTypeError
@@ -45,6 +47,8 @@ def test_connection_and_logoff_state() -> None:
     assert client._issueToken is None
     client.dtIssueToken = 0
     assert client._hasTokenExpired() is True
+    client.dtIssueToken = int(time.time()) - client.tokenExpiresAfter + 10
+    assert client._hasTokenExpired() is False
 
 
 def test_user_accessors_return_values_and_defaults() -> None:
@@ -124,3 +128,14 @@ def test_get_device_and_helper_time() -> None:
     assert PyXplora._helperTime("0") == "00:00"
     assert PyXplora._helperTime("75") == "01:15"
     assert PyXplora._helperTime("1440") == "24:00"
+
+
+def test_delay_sleeps_instead_of_spinning(monkeypatch) -> None:
+    slept = []
+    monkeypatch.setattr("pyxplora_api.pyxplora.sleep", slept.append)
+
+    PyXplora.delay(1.5)
+    PyXplora.delay(-1)
+
+    assert slept == [1.5, 0]
+    assert make_client().retryPolicy.budget() == PyXplora.maxRetries + 2
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+from email.utils import formatdate
+import time
+
+import aiohttp
+import pytest
+
+from pyxplora_api.exception_classes import RateLimitError
+from pyxplora_api.gql_handler_async import GQLHandler
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+from pyxplora_api.graphql_client import GraphqlClient
+from pyxplora_api.rate_limit import RateLimiter, parse_retry_after
+
+
+def test_parse_retry_after_accepts_seconds_and_http_dates() -> None:
+    assert parse_retry_after("3") == 3
+    assert parse_retry_after("-1") == 0
+    assert 8 < parse_retry_after(formatdate(time.time() + 10, usegmt=True)) <= 10
+    assert parse_retry_after("later") is None
+    assert parse_retry_after(None) is None
+
+
+def test_buckets_queue_requests_in_order_and_refuse_long_waits() -> None:
+    limiter = RateLimiter(global_rate=10, global_burst=2, account_rate=1000, account_burst=1000, max_wait=0.25)
+
+    waits = [limiter.reserve("a") for _ in range(4)]
+
+    assert waits[:2] == [0, 0]
+    assert waits[2] == pytest.approx(0.1, abs=0.01)
+    assert waits[3] == pytest.approx(0.2, abs=0.01)
+    with pytest.raises(RateLimitError) as error:
+        limiter.reserve("a")
+    assert error.value.retry_after == pytest.approx(0.3, abs=0.01)
+    assert (limiter.throttled, limiter.rejected) == (2, 1)
+    assert limiter.throttled_time == pytest.approx(0.3, abs=0.02)
+
+
+def test_accounts_and_expensive_operations_have_their_own_buckets() -> None:
+    limiter = RateLimiter(account_rate=1, account_burst=1, operation_limits={"AskWatchLocate": (0.5, 1)}, max_wait=5)
+
+    assert limiter.reserve("a", "Alarms") == 0
+    assert limiter.reserve("b", "AskWatchLocate") == 0
+    assert limiter.reserve("a", "Alarms") == pytest.approx(1, abs=0.01)
+    # the second locate of b waits for its operation bucket, not only for its account bucket
+    assert limiter.reserve("b", "AskWatchLocate") == pytest.approx(2, abs=0.01)
+
+
+def test_retry_after_pauses_all_requests() -> None:
+    limiter = RateLimiter(max_wait=1)
+    limiter.retry_after(0.5)
+
+    assert limiter.reserve("a") == pytest.approx(0.5, abs=0.01)
+    limiter.retry_after(5)
+    with pytest.raises(RateLimitError):
+        limiter.reserve("b")
+    assert limiter.metrics()["retry_afters"] == 2
+
+
+class ThrottledResponse:
+    status = 429
+    headers = {"Retry-After": "2"}
+
+    def raise_for_status(self) -> None:
+        raise aiohttp.ClientResponseError(None, (), status=429)
+
+    async def read(self) -> bytes:
+        return b""
+
+    async def __aenter__(self) -> ThrottledResponse:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        return None
+
+
+class ThrottledSession:
+    def post(self, endpoint: str, *, data: bytes, headers: dict) -> ThrottledResponse:
+        return ThrottledResponse()
+
+
+def test_client_reports_retry_after_to_the_limiter() -> None:
+    limiter = RateLimiter()
+    client = GraphqlClient("https://example.test/graphql", rate_limiter=limiter)
+
+    assert asyncio.run(client.ha_execute_async("query", session=ThrottledSession())) == {}
+    assert limiter.retry_afters == 1
+    assert limiter.reserve("a") == pytest.approx(2, abs=0.05)
+
+
+def test_handler_waits_for_the_limiter_before_sending(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    handler.rateLimiter = RateLimiter(global_rate=50, global_burst=1)
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(time.monotonic())
+        return {"data": {"alarms": []}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        await asyncio.gather(*(handler.getAlarmTime_a(uid) for uid in "abc"))
+        await handler.aclose()
+
+    asyncio.run(run())
+
+    assert len(sent) == 3
+    assert sent[2] - sent[0] >= 0.035
+    assert handler.rateLimiter.throttled == 2
+
+
+def test_default_limits_fit_a_full_refresh_of_an_account() -> None:
+    limiter = RateLimiter()
+
+    assert [limiter.reserve("a", "AskWatchLocate") for _ in range(10)] == [0] * 10
+    assert limiter.reserve("a", "AskWatchLocate") <= limiter.max_wait
+
+
+def test_refused_requests_are_not_turned_into_empty_data(monkeypatch) -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin", rate_limiter=RateLimiter(max_wait=0))
+    api.rateLimiter.retry_after(60)
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        return {"data": {"alarms": []}}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        try:
+            with pytest.raises(RateLimitError):
+                await api.getWatchAlarm("w1")
+            with pytest.raises(RateLimitError):
+                await api.setDevices(["w1"], fields="alarms")
+        finally:
+            await api.aclose()
+
+    asyncio.run(run())
+    assert "w1" not in api.device
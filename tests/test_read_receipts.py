@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import asyncio
+
+from pyxplora_api.gql_handler_async import GQLHandler
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+from pyxplora_api.read_receipts import ReadReceiptQueue
+
+
+def test_queue_coalesces_per_watch_and_bounds_concurrency() -> None:
+    batches = []
+    running = []
+
+    async def send(receipts):
+        running.append(1)
+        assert len(running) <= 2
+        await asyncio.sleep(0.001)
+        batches.append(receipts)
+        running.pop()
+        if ("w4", "boom", "") in receipts:
+            raise RuntimeError("boom")
+
+    async def run():
+        queue = ReadReceiptQueue(send, window=10, max_batch_size=3, max_concurrency=2)
+        for msg_id in ("m1", "m2", "m1"):
+            queue.mark("w1", msg_id, f"id-{msg_id}")
+        queue.mark("w2", "m1", "id-x")
+        for i in range(4):
+            queue.mark("w3", f"n{i}")
+        queue.mark("w4", "boom")
+        await queue.aclose()
+        return queue
+
+    queue = asyncio.run(run())
+
+    assert batches[0] == [("w1", "m1", "id-m1"), ("w1", "m2", "id-m2"), ("w2", "m1", "id-x")]
+    assert sorted(receipt for batch in batches[1:] for receipt in batch) == [
+        ("w3", "n0", ""),
+        ("w3", "n1", ""),
+        ("w3", "n2", ""),
+        ("w3", "n3", ""),
+        ("w4", "boom", ""),
+    ]
+    assert (queue.marked, queue.coalesced, queue.sent, queue.failed) == (9, 1, 6, 2)
+    assert len(queue) == 0
+
+
+def test_handler_sends_receipts_as_one_aliased_mutation(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append((operation_name, variables))
+        return {"data": {"r0_setReadChatMsg": True, "r1_setReadChatMsg": True}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    results = asyncio.run(handler.setReadChatMsgs_a([("w1", "m1", "i1"), ("w2", "m2", "i2")]))
+
+    assert results == [{"setReadChatMsg": True}, {"setReadChatMsg": True}]
+    assert sent == [
+        ("setReadChatMsgs", {"uid_r0": "w1", "msgId_r0": "m1", "id_r0": "i1", "uid_r1": "w2", "msgId_r1": "m2", "id_r1": "i2"})
+    ]
+
+
+def test_get_watch_chats_returns_before_receipts_are_sent(monkeypatch) -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    chats = [{"id": f"i{i}", "msgId": f"m{i}", "type": "TEXT", "data": {"emoticon_id": 1001}} for i in range(3)]
+    sent = []
+
+    async def fake_chats(wuid, offset=0, limit=0, msg="", asObject=False):
+        return {"chatsNew": {"list": chats}}
+
+    async def fake_receipts(receipts):
+        sent.append(receipts)
+
+    monkeypatch.setattr(api._gql_handler, "chats_a", fake_chats)
+    monkeypatch.setattr(api._gql_handler, "setReadChatMsgs_a", fake_receipts)
+
+    async def run():
+        result = await api.getWatchChatsRaw("w1")
+        before = list(sent)
+        await api.aclose()
+        return result, before
+
+    result, before = asyncio.run(run())
+
+    assert len(result["list"]) == 3
+    assert before == []
+    assert sent == [[("w1", "m0", "i0"), ("w1", "m1", "i1"), ("w1", "m2", "i2")]]
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import aiohttp
+import pytest
+import requests
+
+from pyxplora_api import gql_mutations as gm, gql_queries as gq
+from pyxplora_api.exception_classes import Error
+from pyxplora_api.gql_handler_async import GQLHandler
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+from pyxplora_api.retry import RetryPolicy, is_retryable_error, is_retryable_response
+
+
+def test_backoff_grows_exponentially_up_to_the_cap() -> None:
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=0)
+
+    assert [policy.backoff(attempt) for attempt in range(1, 6)] == [1, 2, 4, 5, 5]
+
+    jittered = RetryPolicy(base_delay=4, jitter=0.5)
+    assert all(2 <= jittered.backoff(1) <= 4 for _ in range(50))
+
+
+def test_from_settings_and_operation_budgets() -> None:
+    policy = RetryPolicy.from_settings(maxRetries=3, retryDelay=2)
+    policy.budgets["AskWatchLocate"] = 1
+
+    assert policy.budget() == 5
+    assert policy.base_delay == 2
+    assert list(policy.delays("AskWatchLocate")) == []
+    assert len(list(policy.delays())) == 4
+
+
+def test_max_elapsed_stops_the_delays() -> None:
+    policy = RetryPolicy(max_attempts=10, base_delay=1, jitter=0, max_elapsed=3.5)
+
+    assert list(policy.delays()) == [1, 2]
+
+
+def test_max_elapsed_counts_the_first_attempt() -> None:
+    policy = RetryPolicy(max_attempts=5, base_delay=0.001, max_delay=0.001, jitter=0, max_elapsed=0.05)
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.06)
+        raise OSError("timed out")
+
+    async def slow_async():
+        calls.append(1)
+        await asyncio.sleep(0.06)
+        raise OSError("timed out")
+
+    with pytest.raises(OSError):
+        policy.call(slow, retry_on=(OSError,))
+    with pytest.raises(OSError):
+        asyncio.run(policy.call_async(slow_async, retry_on=(OSError,)))
+
+    # the first attempt alone used up the budget
+    assert len(calls) == 2
+
+
+def test_call_sleeps_between_attempts_and_reraises_when_exhausted() -> None:
+    policy = RetryPolicy(max_attempts=3, base_delay=0.5, jitter=0)
+    slept = []
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise Error("try again")
+        return "ok"
+
+    assert policy.call(flaky, retry_on=(Error,), sleep=slept.append) == "ok"
+    assert slept == [0.5, 1.0]
+
+    with pytest.raises(Error):
+        policy.call(lambda: (_ for _ in ()).throw(Error("down")), retry_on=(Error,), sleep=slept.append)
+    with pytest.raises(ValueError):
+        policy.call(lambda: (_ for _ in ()).throw(ValueError("bug")), sleep=slept.append)
+
+
+def test_call_async_retries_with_asyncio_sleep() -> None:
+    policy = RetryPolicy(max_attempts=2, base_delay=0, jitter=0)
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Error("try again")
+        return "ok"
+
+    assert asyncio.run(policy.call_async(flaky, retry_on=(Error,))) == "ok"
+    assert len(calls) == 2
+
+
+def test_classification_of_errors_and_operations() -> None:
+    assert is_retryable_error(aiohttp.ClientConnectionError())
+    assert is_retryable_error(asyncio.TimeoutError())
+    response = requests.Response()
+    response.status_code = 503
+    assert is_retryable_error(requests.HTTPError(response=response))
+    response.status_code = 400
+    assert not is_retryable_error(requests.HTTPError(response=response))
+    assert not is_retryable_error(Error("bad input"))
+    assert is_retryable_response({}) and not is_retryable_response({"data": None, "errors": []})
+
+    policy = RetryPolicy()
+    assert policy.allows(gq.WATCH_Q["alarmsQ"], "Alarms")
+    assert policy.allows(gm.WATCH_M["modifyAlarmM"], "ModifyAlarm")
+    assert not policy.allows(gm.WATCH_M["sendChatTextM"], "SendChatText")
+
+
+def test_handler_retries_failed_queries_and_counts_give_ups(monkeypatch) -> None:
+    policy = RetryPolicy(max_attempts=3, base_delay=0, jitter=0)
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin", retry_policy=policy)
+    responses = {"Alarms": [{}, {"data": {"alarms": []}}], "SendChatText": [{}]}
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        queue = responses.get(operation_name)
+        return queue.pop(0) if queue else {}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        alarms = await handler.getAlarmTime_a("w1")
+        await handler.runGqlQuery_a(gm.WATCH_M["sendChatTextM"], {"uid": "w1", "text": "hi"}, "SendChatText")
+        zones = await handler.safeZones_a("w1")
+        return alarms, zones
+
+    alarms, zones = asyncio.run(run())
+
+    assert alarms == {"alarms": []}
+    assert zones == {}
+    assert sent == ["Alarms", "Alarms", "SendChatText", "SafeZones", "SafeZones", "SafeZones"]
+    assert (policy.attempts, policy.retries, policy.give_ups) == (5, 3, 1)
+
+
+def test_api_does_not_retry_legitimately_empty_results(monkeypatch) -> None:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        return {"data": {"alarms": [], "silentTimes": []}}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        return await api.getWatchAlarm("w1"), await api.getSilentTime("w1")
+
+    assert asyncio.run(run()) == ([], [])
+    assert sent == ["Alarms", "SlientTimes"]
+    assert api._gql_handler.retry_policy is api.retryPolicy
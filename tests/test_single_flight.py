@@ -0,0 +1,67 @@
+from __future__ import annotations
+
+import asyncio
+
+from pyxplora_api import gql_mutations as gm, gql_queries as gq
+from pyxplora_api.gql_handler_async import GQLHandler
+from pyxplora_api.single_flight import SingleFlight
+
+
+def test_key_ignores_variable_order() -> None:
+    assert SingleFlight.key("Op", {"a": 1, "b": 2}) == SingleFlight.key("Op", {"b": 2, "a": 1})
+    assert SingleFlight.key("Op", None) == SingleFlight.key("Op", {})
+    assert SingleFlight.key("Op", {"a": 1}) != SingleFlight.key("Other", {"a": 1})
+
+
+def test_concurrent_callers_share_one_call_and_errors() -> None:
+    flight = SingleFlight()
+    started = []
+
+    async def work(value):
+        started.append(value)
+        await asyncio.sleep(0)
+        if value == "boom":
+            raise ValueError(value)
+        return value
+
+    async def run():
+        results = await asyncio.gather(*(flight.do("k", lambda: work("ok")) for _ in range(3)))
+        errors = await asyncio.gather(*(flight.do("e", lambda: work("boom")) for _ in range(2)), return_exceptions=True)
+        again = await flight.do("k", lambda: work("again"))
+        return results, errors, again
+
+    results, errors, again = asyncio.run(run())
+
+    assert results == ["ok", "ok", "ok"]
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert again == "again"
+    assert started == ["ok", "boom", "again"]
+    assert flight.calls == 3
+    assert flight.coalesced == 3
+    assert flight.in_flight() == 0
+
+
+def test_handler_coalesces_queries_but_not_mutations(monkeypatch) -> None:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        await asyncio.sleep(0)
+        return {"data": {"askWatchLocate": True}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+
+    async def run():
+        await asyncio.gather(*(handler.askWatchLocate_a("wuid-1") for _ in range(6)), handler.askWatchLocate_a("wuid-2"))
+        await asyncio.gather(
+            *(
+                handler.runGqlQuery_a(gm.WATCH_M["sendChatTextM"], {"uid": "wuid-1", "text": "hi"}, "SendChatText")
+                for _ in range(2)
+            )
+        )
+
+    asyncio.run(run())
+
+    assert sent == ["AskWatchLocate", "AskWatchLocate", "SendChatText", "SendChatText"]
+    assert gq.WATCH_Q["askLocateQ"].startswith("query")
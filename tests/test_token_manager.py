@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from pyxplora_api import gql_queries as gq
+from pyxplora_api.gql_handler_async import GQLHandler
+from pyxplora_api.token_manager import parse_timestamp
+
+
+def test_parse_timestamp_accepts_seconds_milliseconds_and_iso() -> None:
+    assert parse_timestamp(1700000000) == 1700000000
+    assert parse_timestamp("1700000000000") == 1700000000
+    assert parse_timestamp("2023-11-14T22:13:20Z") == 1700000000
+    assert parse_timestamp(None) is None
+    assert parse_timestamp("soon") is None
+
+
+def make_handler(monkeypatch, refresh: dict | None):
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    sent = []
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append((operation_name, headers["H-BackDoor-Authorization"].split(":")[0]))
+        await asyncio.sleep(0)
+        if operation_name == "signInWithEmailOrPhone":
+            login = sum(name == operation_name for name, _ in sent)
+            now = time.time()
+            token = {"token": f"login-{login}", "refreshToken": "r1", "issueDate": now, "expireDate": now + 300}
+            return {"data": {"signInWithEmailOrPhone": {**token, "id": "s", "user": {"id": "u"}}}}
+        if operation_name == "RefreshToken":
+            return {"data": {"refreshToken": refresh}}
+        return {"data": {"alarms": []}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+    return handler, sent
+
+
+def test_expired_token_is_refreshed_once_while_requests_wait(monkeypatch) -> None:
+    refresh = {"token": "refreshed", "refreshToken": "r2", "expireDate": time.time() + 600, "valid": True}
+    handler, sent = make_handler(monkeypatch, refresh)
+
+    async def run():
+        await handler.login_a(None, None)
+        handler.tokens.expires_at = time.time() - 1
+        await asyncio.gather(*(handler.runGqlQuery_a(gq.WATCH_Q["alarmsQ"], {"uid": uid}, "Alarms") for uid in "abc"))
+        await handler.aclose()
+
+    asyncio.run(run())
+
+    assert [name for name, _ in sent] == ["signInWithEmailOrPhone", "RefreshToken", "Alarms", "Alarms", "Alarms"]
+    assert {auth for name, auth in sent if name == "Alarms"} == {"Bearer refreshed"}
+    assert handler.refreshToken == "r2"
+    assert handler.tokens.expires_at == refresh["expireDate"]
+    assert (handler.tokens.refreshes, handler.tokens.logins) == (1, 0)
+
+
+def test_failed_refresh_falls_back_to_login(monkeypatch) -> None:
+    handler, sent = make_handler(monkeypatch, None)
+
+    async def run():
+        await handler.login_a(None, None)
+        await handler.tokens.refresh()
+        await handler.aclose()
+
+    asyncio.run(run())
+
+    assert [name for name, _ in sent] == ["signInWithEmailOrPhone", "RefreshToken", "signInWithEmailOrPhone"]
+    assert handler.accessToken == "login-2"
+    assert (handler.tokens.refreshes, handler.tokens.failures, handler.tokens.logins) == (0, 1, 1)
+
+
+def test_rejected_token_is_renewed_and_the_request_sent_again(monkeypatch) -> None:
+    handler, sent = make_handler(monkeypatch, {"token": "refreshed", "valid": True})
+    rejected = []
+
+    async def run():
+        await handler.login_a(None, None)
+        original = handler._post_a
+
+        async def post(query, variables=None, operation_name=None):
+            data = await original(query, variables, operation_name)
+            if operation_name == "Alarms" and not rejected:
+                rejected.append(True)
+                return {"errors": [{"message": "Authentication failed."}], "data": None}
+            return data
+
+        handler._post_a = post
+        result = await handler.getAlarmTime_a("w1")
+        await handler.aclose()
+        return result
+
+    assert asyncio.run(run()) == {"alarms": []}
+    assert [name for name, _ in sent] == ["signInWithEmailOrPhone", "Alarms", "RefreshToken", "Alarms"]
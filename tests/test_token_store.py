@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from pyxplora_api.exception_classes import TokenStoreError
+from pyxplora_api.gql_handler import GQLHandler as SyncGQLHandler
+from pyxplora_api.gql_handler_async import GQLHandler
+from pyxplora_api.pyxplora_api_async import PyXploraApi
+from pyxplora_api.token_store import FileTokenStore, SQLiteTokenStore, TokenStore, account_key
+
+
+@pytest.mark.parametrize("backend", [FileTokenStore, SQLiteTokenStore])
+def test_store_round_trips_sessions_per_account(tmp_path, backend) -> None:
+    store = backend(tmp_path / "tokens")
+    first, second = account_key("49", "15123456789"), account_key(email="Kid@Example.com")
+
+    assert store.load(first) is None
+    store.save(first, {"accessToken": "a1", "issueToken": {"w360": {"token": "k"}}})
+    store.save(second, {"accessToken": "b1"})
+    store.save(first, {"accessToken": "a2"})
+
+    assert store.load(first) == {"accessToken": "a2"}
+    assert store.load(second) == {"accessToken": "b1"}
+    store.delete(first)
+    assert store.load(first) is None
+    assert store.load(second) == {"accessToken": "b1"}
+
+
+def test_account_key_hashes_the_identity() -> None:
+    assert account_key(email="Kid@Example.com") == account_key(email="kid@example.com")
+    assert account_key("49", "15123456789") != account_key("43", "15123456789")
+    assert "15123456789" not in account_key("49", "15123456789")
+
+
+def test_file_store_is_private_and_reports_failures(tmp_path) -> None:
+    store = FileTokenStore(tmp_path / "tokens.json")
+    store.save("a", {"accessToken": "t"})
+
+    assert os.stat(store.path).st_mode & 0o777 == 0o600
+    with pytest.raises(TokenStoreError):
+        store.save("a", {"accessToken": object()})
+    assert store.load("a") == {"accessToken": "t"}
+
+
+def make_api(monkeypatch, store, sent: list, refresh: dict | None = None) -> PyXploraApi:
+    api = PyXploraApi("49", "15123456789", "secret", "de-DE", "Europe/Berlin", token_store=store)
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append(operation_name)
+        if operation_name == "signInWithEmailOrPhone":
+            now = time.time()
+            user = {"id": "u", "children": [{"ward": {"id": "wuid-1", "phoneNumber": "1"}}]}
+            token = {"id": "s", "token": "login", "refreshToken": "r1", "issueDate": now, "expireDate": now + 300}
+            return {"data": {"signInWithEmailOrPhone": {**token, "user": user, "w360": {"token": "k", "secret": "s"}}}}
+        if operation_name == "RefreshToken":
+            return {"data": {"refreshToken": refresh}}
+        return {"data": {}}
+
+    monkeypatch.setattr(api._gql_handler._gql_client, "execute_async", fake_execute)
+    return api
+
+
+def test_restart_resumes_the_saved_session_without_login(monkeypatch, tmp_path) -> None:
+    store = SQLiteTokenStore(tmp_path / "tokens.db")
+    sent: list = []
+
+    async def run(api):
+        await api.init()
+        await api.aclose()
+        return api
+
+    first = asyncio.run(run(make_api(monkeypatch, store, sent)))
+    restarted = asyncio.run(run(make_api(monkeypatch, store, sent)))
+
+    assert sent == ["signInWithEmailOrPhone"]
+    assert restarted.getWatchUserIDs() == ["wuid-1"]
+    assert restarted._gql_handler.accessToken == "login"
+    assert restarted._gql_handler.refreshToken == "r1"
+    assert restarted._gql_handler.tokens.expires_at == first._gql_handler.tokens.expires_at
+    # the w360 key and secret the first process switched to are resumed as well
+    assert (restarted._gql_handler._API_KEY, restarted._gql_handler._API_SECRET) == ("k", "s")
+
+
+def test_restart_refreshes_an_expired_saved_session(monkeypatch, tmp_path) -> None:
+    store = FileTokenStore(tmp_path / "tokens.json")
+    key = account_key("49", "15123456789")
+    sent: list = []
+    refresh = {"token": "refreshed", "refreshToken": "r2", "expireDate": time.time() + 600, "valid": True}
+
+    async def run(api):
+        await api.init()
+        await api.aclose()
+
+    asyncio.run(run(make_api(monkeypatch, store, sent)))
+    store.save(key, {**store.load(key), "expiresAt": time.time() - 1})
+    asyncio.run(run(make_api(monkeypatch, store, sent, refresh)))
+
+    assert sent == ["signInWithEmailOrPhone", "RefreshToken"]
+    saved = store.load(key)
+    assert (saved["accessToken"], saved["refreshToken"]) == ("refreshed", "r2")
+    assert saved["expiresAt"] == refresh["expireDate"]
+
+
+@pytest.mark.parametrize("backend", [FileTokenStore, SQLiteTokenStore])
+def test_store_raises_token_store_error_for_unserialisable_sessions(tmp_path, backend) -> None:
+    store = backend(tmp_path / "tokens")
+
+    with pytest.raises(TokenStoreError):
+        store.save("account", {"accessToken": object()})
+
+
+def test_incomplete_store_fails_when_created() -> None:
+    class LoadOnly(TokenStore):
+        def load(self, account):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnly()
+
+
+def test_process_lock_is_exclusive_and_reentrant(tmp_path) -> None:
+    store = FileTokenStore(tmp_path / "tokens.json")
+    first, second = store.lock("account"), store.lock("account")
+    second.timeout = 0
+
+    assert first.try_acquire() and first.try_acquire()
+    with second.hold() as acquired:
+        assert acquired is False
+    first.release()
+    assert first.held and not second.try_acquire()
+    first.release()
+    with second.hold() as acquired:
+        assert acquired and second.held
+    assert not second.held
+
+
+def test_process_lock_is_reentrant_for_the_owning_thread_only(tmp_path) -> None:
+    lock = FileTokenStore(tmp_path / "tokens.json").lock("account")
+    other = []
+
+    assert lock.try_acquire()
+    thread = threading.Thread(target=lambda: other.extend([lock.try_acquire(), lock.release()]))
+    thread.start()
+    thread.join()
+
+    # the other thread neither got the lock nor released it
+    assert other[0] is False and lock.held
+    lock.release()
+    assert not lock.held
+
+
+def make_handler(monkeypatch, store, sent: list, name: str) -> GQLHandler:
+    handler = GQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    handler.tokenStore = store
+
+    async def fake_execute(query, variables=None, operation_name=None, headers=None):
+        sent.append((name, operation_name))
+        now = time.time()
+        if operation_name == "signInWithEmailOrPhone":
+            token = {"id": "s", "token": f"login-{name}", "refreshToken": "r1", "issueDate": now, "expireDate": now + 300}
+            return {"data": {"signInWithEmailOrPhone": {**token, "user": {"id": "u"}}}}
+        token = {"token": f"refresh-{name}", "refreshToken": "r2", "expireDate": now + 600, "valid": True}
+        return {"data": {"refreshToken": token}}
+
+    monkeypatch.setattr(handler._gql_client, "execute_async", fake_execute)
+    return handler
+
+
+def test_processes_share_logins_and_refreshes(monkeypatch, tmp_path) -> None:
+    store = SQLiteTokenStore(tmp_path / "tokens.db")
+    sent: list = []
+    one, two = make_handler(monkeypatch, store, sent, "one"), make_handler(monkeypatch, store, sent, "two")
+
+    async def run():
+        await one.login_a(None, None)
+        await two.login_a(None, None)
+        await one.tokens.refresh()
+        await two.tokens.refresh()
+        await one.aclose()
+        await two.aclose()
+
+    asyncio.run(run())
+
+    # the second handler neither logs in nor refreshes, it takes over the token of the first
+    assert sent == [("one", "signInWithEmailOrPhone"), ("one", "RefreshToken")]
+    assert two.accessToken == one.accessToken == "refresh-one"
+    assert two.refreshToken == "r2"
+    assert two.tokens.expires_at == one.tokens.expires_at
+    assert (one.tokens.refreshes, two.tokens.adopted) == (1, 1)
+    assert store.load(account_key("49", "15123456789"))["accessToken"] == "refresh-one"
+
+
+def test_sync_login_takes_over_a_shared_session(monkeypatch, tmp_path) -> None:
+    store = FileTokenStore(tmp_path / "tokens.json")
+    sent: list = []
+    asyncio.run(make_handler(monkeypatch, store, sent, "async").login_a(None, None))
+    handler = SyncGQLHandler("49", "15123456789", "secret", "de-DE", "Europe/Berlin")
+    handler.tokenStore = store
+    monkeypatch.setattr(handler, "runGqlQuery", lambda *args: pytest.fail("logged in again"))
+
+    assert handler.login()["token"] == "login-async"
+    assert handler.accessToken == "login-async"
+    handler.close()